@@ -0,0 +1,154 @@
+import re
+import threading
+import time
+from news_cache import IncrementalRefresher, Snapshot
+from analysis_bridge import start_trace
+
+
+class NewsSource:
+    """One scraper with its own refresh interval, timeout and latest articles"""
+
+    def __init__(self, name, scraper, interval=300, timeout=120, window=30):
+        self.name = name
+        self.refresher = IncrementalRefresher(scraper, window=window)
+        self.interval = interval
+        self.timeout = timeout
+        self.articles = []
+        self.next_due = 0
+        self.last_duration = None
+        self.last_success = None
+        self.last_error = None
+        self.timed_out = False
+        self.on_late_result = None
+        self._thread = None
+        self._finished = True
+        self._lock = threading.Lock()
+
+    @property
+    def refreshing(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start_refresh(self):
+        """Refresh in a background thread; returns the thread, or None if one is already running"""
+        if self.refreshing:
+            return None
+        self.next_due = time.time() + self.interval
+        self._finished = False
+        self._thread = threading.Thread(target=self._refresh, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def _refresh(self):
+        start = time.perf_counter()
+        # Background refreshes are traced at TRACE_SAMPLE_RATE like requests
+        with start_trace('refresh', source=self.name) as trace:
+            try:
+                # Previous articles of this source only, so other sources never cause re-fetches
+                self.articles = self.refresher(Snapshot(self.articles, 0, 0))
+                self.last_success = time.time()
+                self.last_error = None
+            except Exception as e:
+                # Keep serving the previous articles of a failing source
+                self.last_error = str(e)
+                print(f"Error refreshing {self.name}: {e}")
+            trace.set(articles=len(self.articles), error=self.last_error)
+        self.last_duration = round(time.perf_counter() - start, 3)
+        with self._lock:
+            self._finished = True
+            late, self.timed_out = self.timed_out, False
+        # The merge already went ahead without us; ask for another one
+        if late and self.on_late_result:
+            self.on_late_result()
+
+    def mark_timed_out(self):
+        """Flag a refresh the merge stopped waiting for; False if it has just finished"""
+        with self._lock:
+            if self._finished:
+                return False
+            self.timed_out = True
+            return True
+
+    def status(self):
+        return {
+            'article_count': len(self.articles),
+            'refreshing': self.refreshing,
+            'timed_out': self.timed_out,
+            'last_refresh_duration': self.last_duration,
+            'last_success': self.last_success,
+            'last_error': self.last_error,
+            'next_refresh_in': max(0, round(self.next_due - time.time(), 1)),
+            'last_refresh_stats': self.refresher.last_stats,
+        }
+
+
+def _story_key(article):
+    """Normalised headline used to spot the same story on different sites"""
+    return ' '.join(re.findall(r'[a-z0-9]+', article['title'].lower()))
+
+
+class NewsAggregator:
+    """
+    Refresh callable for NewsCache that combines several sources.
+    Every call starts the sources that are due, each in its own thread,
+    waits for each at most its timeout, and merges the latest articles of
+    all sources. A slow source finishes in the background and is picked up
+    by a later merge; a failing source keeps its previous articles.
+    """
+
+    def __init__(self, sources, on_late_result=None):
+        self.sources = list(sources)
+        for source in self.sources:
+            source.on_late_result = on_late_result
+
+    def seed(self, articles):
+        """Hand restored snapshot articles back to their sources"""
+        for source in self.sources:
+            source.articles = [article for article in articles if article.get('source') == source.name]
+
+    def request_full_refresh(self):
+        """Make every source due on the next call"""
+        for source in self.sources:
+            source.next_due = 0
+
+    @property
+    def last_stats(self):
+        return {source.name: source.refresher.last_stats for source in self.sources}
+
+    def __call__(self, snapshot):
+        now = time.time()
+        started = []
+        for source in self.sources:
+            if source.next_due <= now:
+                thread = source.start_refresh()
+                if thread:
+                    started.append((source, thread, now + source.timeout))
+
+        for source, thread, deadline in started:
+            thread.join(max(0, deadline - time.time()))
+            if source.mark_timed_out():
+                print(f"{source.name} refresh exceeded {source.timeout}s, merging without waiting for it")
+
+        return self.merge()
+
+    def merge(self):
+        """Interleave the sources' articles, dropping cross-source duplicates"""
+        merged = []
+        seen_ids = set()
+        seen_stories = set()
+        lists = [list(source.articles) for source in self.sources]
+        for row in range(max((len(articles) for articles in lists), default=0)):
+            for articles in lists:
+                if row >= len(articles):
+                    continue
+                article = articles[row]
+                key = article.get('id') or article['url']
+                story = _story_key(article)
+                if key in seen_ids or story in seen_stories:
+                    continue
+                seen_ids.add(key)
+                seen_stories.add(story)
+                merged.append(article)
+        return merged
+
+    def status(self):
+        return {source.name: source.status() for source in self.sources}
@@ -0,0 +1,105 @@
+import os
+import sys
+from contextlib import nullcontext
+from dataclasses import asdict
+from pathlib import Path
+
+# python_api modules are imported in-process from here
+PYTHON_API_DIR = Path(os.environ.get('PYTHON_API_DIR', Path(__file__).resolve().parents[3] / 'python_api'))
+if str(PYTHON_API_DIR) not in sys.path:
+    sys.path.insert(0, str(PYTHON_API_DIR))
+
+try:
+    # One HTML parser for the summarizer and the scrapers
+    from page_parser import HTMLParser, available_backends
+except ImportError:
+    # Without python_api, pages are parsed with Python's built-in html.parser
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    def available_backends():
+        return ['html.parser']
+
+    class HTMLParser:
+        backend = 'html.parser'
+
+        def __init__(self, backend=None):
+            pass
+
+        def parse(self, content, parse_only=None):
+            return BeautifulSoup(content, self.backend, parse_only=parse_only)
+
+        def parse_head(self, content):
+            return self.parse(content, parse_only=SoupStrainer('meta'))
+
+try:
+    import sampling_profiler
+    import tracing
+    from tracing import bind, span, start_trace
+except ImportError:
+    # Without python_api there is nothing to trace or profile
+    sampling_profiler = tracing = None
+
+    class _Untraced(nullcontext):
+        def set(self, **attrs):
+            pass
+
+    def bind(func):
+        return func
+
+    def span(name, **attrs):
+        return _Untraced()
+
+    def start_trace(name, request_id=None, sampled=None, **attrs):
+        return _Untraced()
+
+# Article fields written by ArticleAnalyzer
+ANALYSIS_FIELDS = ('summary', 'bias_analysis')
+
+
+class ArticleAnalyzer:
+    """
+    Runs the python_api extractive summarizer and bias analyzer as library
+    calls, so articles carry their summary and bias analysis from ingest
+    instead of every viewer asking /extractive_summary and /analyze for them.
+    """
+
+    def __init__(self, num_sentences=3, analysis_types=('all',)):
+        from summarizer import NewsScraperSummarizer
+        from bias_analysis import BiasDetector, overall_bias_score
+        self.summarizer = NewsScraperSummarizer()
+        self.detector = BiasDetector()
+        self.overall_bias_score = overall_bias_score
+        self.num_sentences = num_sentences
+        self.analysis_types = list(analysis_types)
+
+    def analyze(self, text):
+        """Summary and bias analysis of an article text, shaped like the on-demand endpoints"""
+        with span('bias_analysis', words=len(text.split())):
+            results = self.detector.analyze(text, self.analysis_types)
+        return {
+            'summary': self.summarizer.extractive_summarize(text, self.num_sentences),
+            'bias_analysis': {
+                'overall_bias_score': round(self.overall_bias_score(results), 3),
+                'bias_results': [asdict(result) for result in results],
+                'word_count': len(text.split()),
+            },
+        }
+
+
+def load_summarizer():
+    """NewsScraperSummarizer, or None when the python_api dependencies or NLTK data are missing"""
+    try:
+        from summarizer import NewsScraperSummarizer
+        return NewsScraperSummarizer()
+    except Exception as e:
+        print(f"Could not load the python_api summarizer from {PYTHON_API_DIR}: {e}")
+        return None
+
+
+def load_analyzer(**kwargs):
+    """ArticleAnalyzer, or None when the python_api dependencies or NLTK data are missing"""
+    try:
+        return ArticleAnalyzer(**kwargs)
+    except Exception as e:
+        print(f"Ingest-time analysis disabled, could not load python_api from {PYTHON_API_DIR}: {e}")
+        return None
@@ -1,65 +1,339 @@
-from flask import Flask, jsonify
+import os
+import time
+from pathlib import Path
+from flask import Flask, jsonify, request, Response, stream_with_context
 from flask_cors import CORS
+from werkzeug.datastructures import MultiDict
 from indianexpress_scraper import IndianExpressScraper
-import threading
-import time
+from thehindu_scraper import TheHinduScraper
+from news_cache import NewsCache
+from aggregator import NewsAggregator, NewsSource
+from story_clusters import StoryClusters
+from analysis_bridge import ANALYSIS_FIELDS, load_analyzer, load_summarizer, sampling_profiler, tracing
+from article_index import ArticleIndex, Query, QueryError
+from response_cache import ViewCache, project
+from event_stream import EventLog, diff_snapshots, stream_events
+from snapshot_store import SnapshotStore
+from search_index import Analyzer, SearchIndex, SearchQuery
+from bias_store import BiasStore, TrendQuery
+from trending import TrendingTopics, TrendingQuery
+from http_archive import replay_session
 
 app = Flask(__name__)
 CORS(app)
+# Request IDs, sampled traces (TRACE_SAMPLE_RATE) and GET /debug/traces
+if tracing:
+    tracing.install_flask(app)
+# GET /debug/profile, off unless PROFILE_TOKEN is set
+if sampling_profiler:
+    sampling_profiler.install_flask(app)
 
-# Global variable to store cached articles
-cached_articles = []
-last_update = 0
-cache_duration = 300  # 5 minutes
+cache_duration = 300  # 5 minutes, the default refresh interval of each source
+min_manual_refresh_interval = 30  # seconds between refreshes triggered through the API
+snapshot_path = os.environ.get('NEWS_SNAPSHOT_PATH', str(Path(__file__).parent / 'data' / 'news_snapshot.json.gz'))
+bias_store_path = os.environ.get('NEWS_BIAS_STORE_PATH', str(Path(__file__).parent / 'data' / 'bias_store'))
+# Serve every scraper request from a recorded archive (see http_archive.py) instead of the live sites
+replay_archive = os.environ.get('NEWS_REPLAY_ARCHIVE')
 
-def update_cache():
-    """Update the cached articles"""
-    global cached_articles, last_update
-    try:
-        scraper = IndianExpressScraper()
-        articles = scraper.scrape_latest_news(30)
-        cached_articles = articles
-        last_update = time.time()
-        print(f"Cache updated with {len(articles)} articles from Indian Express")
-    except Exception as e:
-        print(f"Error updating cache: {e}")
+# Near-duplicate stories across sections and sources are analysed once per cluster
+story_clusters = StoryClusters()
+
+# Summaries and bias analyses are computed once per story at ingest rather than
+# per view; NEWS_INGEST_ANALYSIS=0 leaves them to the on-demand endpoints
+analyzer = load_analyzer() if os.environ.get('NEWS_INGEST_ANALYSIS', '1') != '0' else None
+
+def scraper_session():
+    return replay_session(replay_archive) if replay_archive else None
+
+# Each source refreshes on its own schedule, in parallel, only scraping headlines
+# that are new or changed; a slow or failing source never holds up the others
+sources = [
+    NewsSource('Indian Express', IndianExpressScraper(session=scraper_session(), clusters=story_clusters,
+                                                      analyzer=analyzer),
+               interval=cache_duration, timeout=120, window=30),
+    NewsSource('The Hindu', TheHinduScraper(session=scraper_session(), clusters=story_clusters, analyzer=analyzer),
+               interval=cache_duration, timeout=120, window=30),
+]
+refresh_tick = min(source.interval for source in sources)
+
+# Articles are served from the current snapshot while a background thread refreshes it
+news_cache = NewsCache(None, max_age=refresh_tick)
+aggregator = NewsAggregator(sources, on_late_result=news_cache.refresh_async)
+news_cache.fetch_articles = aggregator
+
+# Fields for list views, which do not need the 2 KB full_text of every article
+LIST_FIELDS = 'id,title,description,url,image,author,publishedAt,source,category,bias_score,bias_types,cluster_id,summary'
+
+# Status fields that change while a snapshot is being served; they go in headers
+# so that the pre-serialized body stays valid for the snapshot's lifetime
+LIVE_STATUS_FIELDS = ('snapshot_age', 'stale', 'refreshing')
+
+def render_news(snapshot, query):
+    """Build the /api/news payload for a query against a snapshot"""
+    articles, total, next_cursor = snapshot.index.query(query)
+    status = news_cache.status(snapshot)
+    return {
+        'articles': [project(article, query.fields) for article in articles],
+        'total': total,
+        'next_cursor': next_cursor,
+        'last_updated': snapshot.created_at,
+        'cache': {key: value for key, value in status.items() if key not in LIVE_STATUS_FIELDS}
+    }
+
+def prepare_snapshot(snapshot):
+    """Build the indexes and serialize the common views once per snapshot"""
+    snapshot.index = ArticleIndex(snapshot.articles)
+    snapshot.views = ViewCache()
+    common = [MultiDict(), MultiDict({'fields': LIST_FIELDS})]
+    common += [MultiDict({'category': category, 'fields': LIST_FIELDS}) for category in snapshot.index.by_category]
+    for args in common:
+        query = Query(args)
+        snapshot.views.get(query.key(), lambda: render_news(snapshot, query))
+
+news_cache.add_preparer(prepare_snapshot)
+
+# Search and trending analyze text with the python_api summarizer's
+# preprocess_text; without python_api both are unavailable
+summarizer = analyzer.summarizer if analyzer else load_summarizer()
+text_analyzer = Analyzer(summarizer) if summarizer else None
+
+# Full-text index kept up to date with every snapshot; articles that leave the
+# live window stay searchable for a few days
+search_index = SearchIndex(text_analyzer, stored_fields=LIST_FIELDS.split(',')) if text_analyzer else None
+
+def index_snapshot(snapshot):
+    search_index.sync(snapshot.articles)
+
+if search_index:
+    news_cache.add_preparer(index_snapshot)
+
+# Article additions, updates and removals, replayable through Last-Event-ID
+event_log = EventLog(max_events=1000)
+
+def publish_events(snapshot, previous):
+    """Turn each new snapshot into change events for /api/news/stream"""
+    changes = diff_snapshots(previous, snapshot, LIST_FIELDS.split(','))
+    for event_type, data in changes:
+        event_log.append(event_type, data)
+    event_log.append('snapshot', {'version': snapshot.version, 'total': len(snapshot.articles),
+                                  'changes': len(changes)})
+
+news_cache.add_listener(publish_events)
+
+# Every published snapshot is saved so a restart can serve it straight away
+snapshot_store = SnapshotStore(snapshot_path)
+
+def persist_snapshot(snapshot, previous):
+    snapshot_store.save(snapshot)
+
+news_cache.add_listener(persist_snapshot)
+
+# Bias results of every article ever published, for /api/trends
+bias_store = BiasStore(bias_store_path)
+
+def record_bias(snapshot, previous):
+    bias_store.append(article for article in snapshot.articles if 'bias_score' in article)
+
+news_cache.add_listener(record_bias)
+
+# Decayed term and bigram counts of newly published articles, for /api/trending
+trending = TrendingTopics(terms=text_analyzer.terms) if text_analyzer else None
+
+def count_trending(snapshot, previous):
+    trending.update(article for article in snapshot.articles if article.get('id') not in previous.index.positions)
+
+if trending:
+    news_cache.add_listener(count_trending)
+
+def restore_snapshot():
+    """Load the last saved snapshot, if any, before the first refresh"""
+    saved = snapshot_store.load()
+    if saved:
+        news_cache.restore(saved['articles'], saved['version'], saved['created_at'])
+        aggregator.seed(saved['articles'])
+        story_clusters.seed(saved['articles'], ('bias_score', 'bias_types') + ANALYSIS_FIELDS)
+        if trending:
+            trending.update(saved['articles'], now=saved['created_at'])
+
+def accepts_gzip():
+    return request.accept_encodings.quality('gzip') > 0
 
 @app.route('/api/news', methods=['GET'])
 def get_news():
-    """Get latest news articles"""
-    global cached_articles, last_update
-    
-    # Update cache if it's expired or empty
-    if time.time() - last_update > cache_duration or not cached_articles:
-        update_cache()
-    
+    """
+    Get latest news articles.
+    Optional filters: category, source, bias_type (comma separated for any-of),
+    date_from / date_to (YYYY-MM-DD), min_bias / max_bias; sorting with
+    sort (publishedAt, bias_score, title) and order (asc, desc); pagination
+    with limit and the next_cursor of the previous page; projection with
+    fields (comma separated article fields).
+    """
+    snapshot = news_cache.get()
+    try:
+        query = Query(request.args)
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Same snapshot and same query means the same body; skip all the work
+    use_gzip = accepts_gzip()
+    etag = query.etag(snapshot.version) + ('-gz' if use_gzip else '')
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        try:
+            body = snapshot.views.get(query.key(), lambda: render_news(snapshot, query))
+        except QueryError as e:
+            return jsonify({'error': str(e)}), 400
+        response = app.response_class(body.gzip if use_gzip else body.raw, mimetype='application/json')
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+
+    status = news_cache.status(snapshot)
+    response.set_etag(etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['X-Snapshot-Version'] = str(snapshot.version)
+    response.headers['X-Snapshot-Age'] = str(status['snapshot_age'])
+    response.headers['X-Snapshot-Stale'] = str(status['stale']).lower()
+    response.headers['X-Refreshing'] = str(status['refreshing']).lower()
+    return response
+
+@app.route('/api/news/facets', methods=['GET'])
+def get_facets():
+    """Article counts per category, source and bias type"""
+    snapshot = news_cache.get()
+    return jsonify({'facets': snapshot.index.facets(), 'version': snapshot.version})
+
+@app.route('/api/news/<article_id>/analysis', methods=['GET'])
+def get_analysis(article_id):
+    """
+    Summary and bias analysis computed at ingest. 404 means the article is not
+    in the store (or was not analysed); use /extractive_summary and /analyze.
+    """
+    snapshot = news_cache.get()
+    pos = snapshot.index.positions.get(article_id)
+    article = snapshot.articles[pos] if pos is not None else None
+    if not article or not all(field in article for field in ANALYSIS_FIELDS):
+        return jsonify({'error': 'No stored analysis for this article'}), 404
+    return jsonify({'id': article_id, 'version': snapshot.version,
+                    **{field: article[field] for field in ANALYSIS_FIELDS}})
+
+@app.route('/api/search', methods=['GET'])
+def search_news():
+    """
+    Full-text search over titles, descriptions and article text, ranked by BM25.
+    Takes q, and limit plus the next_cursor of the previous page for pagination.
+    """
+    if not search_index:
+        return jsonify({'error': 'Search needs the python_api summarizer'}), 503
+    try:
+        query = SearchQuery(request.args)
+        results, total, next_cursor = search_index.query(query)
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
     return jsonify({
-        'articles': cached_articles,
-        'total': len(cached_articles),
-        'last_updated': last_update
+        'query': query.q,
+        'results': results,
+        'total': total,
+        'next_cursor': next_cursor
     })
 
-@app.route('/api/news/refresh', methods=['POST'])
-def refresh_news():
-    """Manually refresh the news cache"""
-    update_cache()
+@app.route('/api/trends', methods=['GET'])
+def get_trends():
+    """
+    Bias score history from the bias store: count, mean and percentiles of
+    bias_score, bias type counts and mean BiasDetector scores per interval
+    (day, week or total). Optional group_by (source or category), source and
+    category filters (comma separated) and from / to dates (YYYY-MM-DD).
+    """
+    try:
+        query = TrendQuery(request.args)
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
     return jsonify({
-        'message': 'News refreshed successfully',
-        'total': len(cached_articles)
+        'group_by': query.group_by,
+        'interval': query.interval,
+        'series': bias_store.trends(query),
+        'rows': bias_store.rows
     })
 
+@app.route('/api/trending', methods=['GET'])
+def get_trending():
+    """
+    Trending terms and bigrams of recently published articles, by decayed
+    article count over window (1h, 6h or 24h half-life). Optional kind
+    (term, bigram), sort (count, burst), limit and min_count.
+    """
+    if not trending:
+        return jsonify({'error': 'Trending needs the python_api summarizer'}), 503
+    try:
+        query = TrendingQuery(request.args)
+    except QueryError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({
+        'window': query.window,
+        'topics': trending.top(query),
+        'updated_at': trending.updated_at
+    })
+
+@app.route('/api/news/stream', methods=['GET'])
+def stream_news():
+    """
+    Server-Sent Events stream of article changes: 'added', 'updated' and
+    'removed' events, then a 'snapshot' event per refresh. Reconnecting
+    clients resume from Last-Event-ID; a 'reset' event means the missed
+    events are gone and /api/news should be reloaded.
+    """
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_id = int(last_id) if last_id else None
+    except ValueError:
+        return jsonify({'error': 'Last-Event-ID must be an integer'}), 400
+
+    response = Response(stream_with_context(stream_events(event_log, last_id)), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/news/refresh', methods=['POST'])
+def refresh_news():
+    """Ask for a refresh; callers share one background refresh and get changes via the stream"""
+    if news_cache.refreshing:
+        return jsonify({'message': 'Refresh already in progress', 'cache': news_cache.status()}), 202
+
+    since_last = time.time() - (news_cache.last_refresh_started or 0)
+    if since_last < min_manual_refresh_interval:
+        retry_after = int(min_manual_refresh_interval - since_last) + 1
+        response = jsonify({'error': 'News was refreshed recently', 'retry_after': retry_after})
+        response.status_code = 429
+        response.headers['Retry-After'] = str(retry_after)
+        return response
+
+    aggregator.request_full_refresh()
+    news_cache.refresh_async()
+    return jsonify({'message': 'Refresh started', 'cache': news_cache.status()}), 202
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
+    snapshot = news_cache.snapshot
     return jsonify({
         'status': 'healthy',
-        'articles_cached': len(cached_articles),
-        'last_update': last_update
+        'articles_cached': len(snapshot.articles),
+        'last_update': snapshot.created_at,
+        'cache': news_cache.status(snapshot),
+        'sources': aggregator.status(),
+        'search': search_index.stats() if search_index else None,
+        'clusters': story_clusters.stats(),
+        'bias_store': bias_store.stats(),
+        'trending': trending.stats() if trending else None,
+        'tracing': tracing.tracer.stats() if tracing else None
     })
 
 if __name__ == '__main__':
-    # Initial cache update
-    update_cache()
-    
-    # Start the Flask server
-    app.run(host='0.0.0.0', port=5000, debug=True) 
\ No newline at end of file
+    # Serve the saved snapshot immediately; the background refresh catches up
+    restore_snapshot()
+    news_cache.start(refresh_tick)
+
+    # Start the Flask server (the reloader would start a second refresher)
+    app.run(host='0.0.0.0', port=int(os.environ.get('NEWS_API_PORT', 5000)),
+            debug=os.environ.get('FLASK_DEBUG', '1') != '0', use_reloader=False)
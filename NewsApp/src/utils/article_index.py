@@ -0,0 +1,193 @@
+import hashlib
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+
+SORT_FIELDS = ('publishedAt', 'bias_score', 'title')
+MAX_PAGE_SIZE = 100
+
+# Bias scores are bucketed to one decimal place, 0.0 - 1.0
+BIAS_BUCKETS = 10
+
+
+class QueryError(ValueError):
+    """Raised for invalid query parameters"""
+
+
+def _bucket(score):
+    return min(int((score or 0.0) * BIAS_BUCKETS), BIAS_BUCKETS)
+
+
+def _sort_key(article, field):
+    value = article.get(field)
+    if field == 'bias_score':
+        return value or 0.0
+    return value or ''
+
+
+class ArticleIndex:
+    """
+    Secondary indexes over one snapshot's articles, built once per refresh.
+    Postings are article positions in the snapshot, kept in ascending order.
+    """
+
+    def __init__(self, articles):
+        self.articles = tuple(articles)
+        self.by_category = defaultdict(list)
+        self.by_source = defaultdict(list)
+        self.by_bias_type = defaultdict(list)
+        self.by_date = defaultdict(list)
+        self.by_bias_bucket = defaultdict(list)
+        self.positions = {}
+
+        for pos, article in enumerate(self.articles):
+            self.by_category[(article.get('category') or '').lower()].append(pos)
+            self.by_source[(article.get('source') or '').lower()].append(pos)
+            for bias_type in article.get('bias_types') or []:
+                self.by_bias_type[bias_type.lower()].append(pos)
+            self.by_date[article.get('publishedAt') or ''].append(pos)
+            self.by_bias_bucket[_bucket(article.get('bias_score'))].append(pos)
+            if article.get('id'):
+                self.positions[article['id']] = pos
+        self.dates = sorted(self.by_date)
+
+        # Precomputed orderings for every sort field
+        self.orders = {None: list(range(len(self.articles)))}
+        for field in SORT_FIELDS:
+            self.orders[field] = sorted(range(len(self.articles)),
+                                        key=lambda pos: (_sort_key(self.articles[pos], field), pos))
+
+    def facets(self):
+        """Counts per category, source and bias type"""
+        return {
+            'category': {key: len(value) for key, value in self.by_category.items() if key},
+            'source': {key: len(value) for key, value in self.by_source.items() if key},
+            'bias_type': {key: len(value) for key, value in self.by_bias_type.items()},
+        }
+
+    def _any_of(self, index, values):
+        matched = set()
+        for value in values:
+            matched.update(index.get(value.lower(), ()))
+        return matched
+
+    def _date_range(self, date_from, date_to):
+        lo = bisect_left(self.dates, date_from) if date_from else 0
+        hi = bisect_right(self.dates, date_to) if date_to else len(self.dates)
+        matched = set()
+        for date in self.dates[lo:hi]:
+            matched.update(self.by_date[date])
+        return matched
+
+    def _bias_range(self, min_bias, max_bias):
+        lo = _bucket(min_bias) if min_bias is not None else 0
+        hi = _bucket(max_bias) if max_bias is not None else BIAS_BUCKETS
+        matched = set()
+        for bucket in range(lo, hi + 1):
+            for pos in self.by_bias_bucket.get(bucket, ()):
+                score = self.articles[pos].get('bias_score') or 0.0
+                # Only the edge buckets need the exact comparison
+                if (min_bias is None or score >= min_bias) and (max_bias is None or score <= max_bias):
+                    matched.add(pos)
+        return matched
+
+    def query(self, params):
+        """
+        Filter, sort and paginate the snapshot.
+        params is a Query; returns (articles, total_matching, next_cursor).
+        """
+        candidates = None
+        filters = [
+            (params.category, lambda: self._any_of(self.by_category, params.category)),
+            (params.source, lambda: self._any_of(self.by_source, params.source)),
+            (params.bias_type, lambda: self._any_of(self.by_bias_type, params.bias_type)),
+            (params.date_from or params.date_to, lambda: self._date_range(params.date_from, params.date_to)),
+            (params.min_bias is not None or params.max_bias is not None,
+             lambda: self._bias_range(params.min_bias, params.max_bias)),
+        ]
+        for active, lookup in filters:
+            if active:
+                matched = lookup()
+                candidates = matched if candidates is None else candidates & matched
+                if not candidates:
+                    return [], 0, None
+
+        order = self.orders[params.sort]
+        if params.order == 'desc':
+            order = order[::-1]
+        if candidates is not None:
+            order = [pos for pos in order if pos in candidates]
+
+        start = 0
+        if params.cursor:
+            if params.cursor not in self.positions:
+                raise QueryError('Unknown or expired cursor')
+            cursor_pos = self.positions[params.cursor]
+            try:
+                start = order.index(cursor_pos) + 1
+            except ValueError:
+                raise QueryError('Cursor does not belong to this query')
+
+        end = len(order) if params.limit is None else start + params.limit
+        page = order[start:end]
+        next_cursor = self.articles[page[-1]].get('id') if page and end < len(order) else None
+        return [self.articles[pos] for pos in page], len(order), next_cursor
+
+
+class Query:
+    """Validated /api/news query parameters"""
+
+    FIELDS = ('category', 'source', 'bias_type', 'date_from', 'date_to', 'min_bias', 'max_bias',
+              'sort', 'order', 'limit', 'cursor', 'fields')
+
+    def __init__(self, args):
+        def many(name, lower=True):
+            values = []
+            for value in args.getlist(name):
+                values.extend(part.strip() for part in value.split(',') if part.strip())
+            return sorted({value.lower() for value in values} if lower else set(values))
+
+        def number(name, cast, low, high):
+            value = args.get(name)
+            if value in (None, ''):
+                return None
+            try:
+                value = cast(value)
+            except ValueError:
+                raise QueryError(f"'{name}' must be a number")
+            if not low <= value <= high:
+                raise QueryError(f"'{name}' must be between {low} and {high}")
+            return value
+
+        self.category = many('category')
+        self.source = many('source')
+        self.bias_type = many('bias_type')
+        self.date_from = args.get('date_from') or None
+        self.date_to = args.get('date_to') or None
+        self.min_bias = number('min_bias', float, 0.0, 1.0)
+        self.max_bias = number('max_bias', float, 0.0, 1.0)
+        self.sort = args.get('sort') or None
+        if self.sort not in (None,) + SORT_FIELDS:
+            raise QueryError(f"'sort' must be one of {', '.join(SORT_FIELDS)}")
+        self.order = args.get('order', 'asc' if self.sort in (None, 'title') else 'desc')
+        if self.order not in ('asc', 'desc'):
+            raise QueryError("'order' must be 'asc' or 'desc'")
+        self.limit = number('limit', int, 1, MAX_PAGE_SIZE)
+        self.cursor = args.get('cursor') or None
+        # Article fields to return, e.g. everything but full_text for list views
+        self.fields = many('fields', lower=False)
+
+    def key(self):
+        """Canonical string form, identical for equivalent queries"""
+        parts = []
+        for name in self.FIELDS:
+            value = getattr(self, name)
+            if isinstance(value, list):
+                value = ','.join(value)
+            if value not in (None, ''):
+                parts.append(f"{name}={value}")
+        return '&'.join(parts)
+
+    def etag(self, version):
+        """Strong (unquoted) ETag for this query against a snapshot version"""
+        digest = hashlib.sha1(self.key().encode('utf-8')).hexdigest()[:12]
+        return f'v{version}-{digest}'
@@ -0,0 +1,79 @@
+"""
+Benchmark the HTML parser backends over recorded pages.
+
+Usage:
+    python bench_html_parser.py PAGES [--repeat 5]
+
+PAGES is a directory of saved article/homepage HTML files (*.html) or an
+archive recorded with http_archive.py (*.jsonl.gz). For every
+installed backend the script reports the mean parse time and the peak
+memory allocated while parsing, for whole pages and for the head-only
+parse used when only the meta tags are read.
+"""
+import argparse
+import time
+import tracemalloc
+from pathlib import Path
+from analysis_bridge import HTMLParser, available_backends
+from http_archive import archived_pages
+from scraper_pipeline import extract_meta
+
+
+def load_pages(pages):
+    """Read the recorded pages as raw bytes"""
+    if str(pages).endswith('.gz'):
+        return [body for _, body in archived_pages(pages)]
+    return [path.read_bytes() for path in sorted(Path(pages).glob('*.html'))]
+
+
+def measure(parse, pages, repeat):
+    """Return (mean seconds per page, peak bytes) for a parse function"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            parse(page)
+    elapsed = (time.perf_counter() - start) / (repeat * len(pages))
+
+    peak = 0
+    for page in pages:
+        tracemalloc.start()
+        parse(page)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def run_benchmark(pages, repeat=5):
+    """Benchmark every installed backend and return one result row per backend and mode"""
+    results = []
+    for backend in available_backends():
+        parser = HTMLParser(backend)
+        modes = {
+            'full': parser.parse,
+            'meta': lambda page: extract_meta(parser.parse_head(page)),
+        }
+        for mode, parse in modes.items():
+            elapsed, peak = measure(parse, pages, repeat)
+            results.append({
+                'backend': backend,
+                'mode': mode,
+                'ms_per_page': round(elapsed * 1000, 2),
+                'peak_kb': round(peak / 1024, 1),
+            })
+    return results
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description='Benchmark HTML parser backends')
+    arg_parser.add_argument('pages', help='Directory of *.html pages or a recorded *.jsonl.gz archive')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='Timing repetitions per page')
+    args = arg_parser.parse_args()
+
+    pages = load_pages(args.pages)
+    if not pages:
+        raise SystemExit(f"No pages found in {args.pages}")
+
+    print(f"Benchmarking {len(pages)} pages, {args.repeat} repetitions")
+    print(f"{'backend':<12} {'mode':<6} {'ms/page':>10} {'peak KB':>10}")
+    for row in run_benchmark(pages, args.repeat):
+        print(f"{row['backend']:<12} {row['mode']:<6} {row['ms_per_page']:>10} {row['peak_kb']:>10}")
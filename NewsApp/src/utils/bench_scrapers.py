@@ -0,0 +1,120 @@
+"""
+Offline scraper benchmark over a recorded HTTP archive.
+
+Usage:
+    python http_archive.py record ie.jsonl.gz --source indianexpress --limit 20
+    python bench_scrapers.py ie.jsonl.gz --scraper indianexpress --latency 0.05
+
+Replays the archive through each scraper (and optionally the summarization
+service's scrape_article) and reports articles per second, requests per
+article and time spent in HTML extraction. No network access is needed.
+"""
+import argparse
+import functools
+import os
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+from http_archive import replay_session, load_archive
+
+PYTHON_API_DIR = Path(os.environ.get('PYTHON_API_DIR', Path(__file__).resolve().parents[3] / 'python_api'))
+
+
+def _timed(func, totals):
+    """Wrap a pipeline stage so the time spent in it is added to totals['seconds']"""
+    @functools.wraps(func)
+    def wrapper(item):
+        start = time.perf_counter()
+        try:
+            return func(item)
+        finally:
+            totals['seconds'] += time.perf_counter() - start
+    return wrapper
+
+
+def _make_pipeline(name, session, discovery):
+    from scraper_pipeline import ScraperPipeline
+    if name == 'thehindu':
+        from thehindu_scraper import THE_HINDU as config
+    else:
+        from indianexpress_scraper import INDIAN_EXPRESS as config
+    # The politeness delay only makes sense against the live site
+    return ScraperPipeline(replace(config, fetch_delay=0), session=session, discovery=discovery)
+
+
+def bench_pipeline(name, archive, limit, discovery, **replay_options):
+    session = replay_session(archive, **replay_options)
+    pipeline = _make_pipeline(name, session, discovery)
+    extraction = {'seconds': 0.0}
+    pipeline.extract = _timed(pipeline.extract, extraction)
+
+    start = time.perf_counter()
+    articles = pipeline.scrape_latest_news(limit)
+    elapsed = time.perf_counter() - start
+    return _result(name, len(articles), elapsed, session.replayer, extraction['seconds'])
+
+
+def bench_scrape_article(archive, limit, **replay_options):
+    sys.path.insert(0, str(PYTHON_API_DIR))
+    from summarizer import NewsScraperSummarizer
+
+    session = replay_session(archive, **replay_options)
+    summarizer = NewsScraperSummarizer(session=session)
+    urls = [url for url, record in load_archive(archive).items() if record['status'] == 200][:limit]
+
+    articles = 0
+    start = time.perf_counter()
+    for url in urls:
+        if summarizer.scrape_article(url):
+            articles += 1
+    elapsed = time.perf_counter() - start
+    # scrape_article fetches and extracts in one call, so report the whole call
+    return _result('scrape_article', articles, elapsed, session.replayer, elapsed)
+
+
+def _result(name, articles, elapsed, replayer, extraction_seconds):
+    return {
+        'scraper': name,
+        'articles': articles,
+        'seconds': round(elapsed, 3),
+        'articles_per_sec': round(articles / elapsed, 2) if elapsed else 0.0,
+        'requests_per_article': round(replayer.request_count / articles, 2) if articles else None,
+        'extract_ms_per_article': round(extraction_seconds * 1000 / articles, 2) if articles else None,
+        'injected_errors': replayer.error_count,
+    }
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description='Benchmark scrapers against a recorded HTTP archive')
+    arg_parser.add_argument('archive', help='Archive written by http_archive.py record')
+    arg_parser.add_argument('--scraper', action='append', choices=['indianexpress', 'thehindu', 'scrape_article'],
+                            help='Scraper to benchmark (repeatable, default indianexpress and thehindu)')
+    arg_parser.add_argument('--discovery', choices=['homepage', 'feed'], default='homepage')
+    arg_parser.add_argument('--limit', type=int, default=20)
+    arg_parser.add_argument('--runs', type=int, default=3)
+    arg_parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every replayed response')
+    arg_parser.add_argument('--jitter', type=float, default=0.0, help='Extra random latency, up to this many seconds')
+    arg_parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests that fail')
+    arg_parser.add_argument('--error-status', type=int, default=None,
+                            help='HTTP status for injected errors (default: connection error)')
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+
+    replay_options = {
+        'latency': args.latency,
+        'jitter': args.jitter,
+        'error_rate': args.error_rate,
+        'error_status': args.error_status,
+        'seed': args.seed,
+    }
+    print(f"{'scraper':<16} {'run':>3} {'articles':>8} {'art/s':>8} {'req/art':>8} {'extract ms':>10} {'errors':>6}")
+    for name in args.scraper or ['indianexpress', 'thehindu']:
+        for run in range(1, args.runs + 1):
+            if name == 'scrape_article':
+                row = bench_scrape_article(args.archive, args.limit, **replay_options)
+            else:
+                row = bench_pipeline(name, args.archive, args.limit, args.discovery, **replay_options)
+            print(f"{row['scraper']:<16} {run:>3} {row['articles']:>8} {row['articles_per_sec']:>8} "
+                  f"{str(row['requests_per_article']):>8} {str(row['extract_ms_per_article']):>10} "
+                  f"{row['injected_errors']:>6}")
@@ -26,25 +26,59 @@ BIAS_KEYWORDS = {
 # Flatten all keywords for quick search
 ALL_BIAS_KEYWORDS = [(typ, kw) for typ, kws in BIAS_KEYWORDS.items() for kw in kws]
 
+# Bias types of each keyword ('communal' is both Political and Religious)
+KEYWORD_TYPES = {}
+for _typ, _kw in ALL_BIAS_KEYWORDS:
+    KEYWORD_TYPES.setdefault(_kw, []).append(_typ)
 
-def detect_bias(text):
+
+def _prefix_keywords(keyword):
+    """Shorter keywords that also match wherever keyword matches, e.g. 'muslim' in 'muslim appeasement'"""
+    return [other for other in KEYWORD_TYPES
+            if other != keyword and keyword.startswith(other) and re.match(re.escape(other) + r'\b', keyword)]
+
+
+# All keywords in one pattern, longest first so the longest keyword starting at a
+# position wins. The lookahead consumes nothing, so keywords starting inside
+# another match are still found; shorter ones starting at the same position
+# come from PREFIX_KEYWORDS.
+KEYWORD_PATTERN = re.compile(
+    r'\b(?=(' + '|'.join(re.escape(kw) for kw in sorted(KEYWORD_TYPES, key=len, reverse=True)) + r')\b)')
+PREFIX_KEYWORDS = {kw: _prefix_keywords(kw) for kw in KEYWORD_TYPES}
+
+
+def find_bias_keywords(text):
     """
-    Detects bias in the given text. Returns a bias_score (0-1) and a list of bias_types found.
+    Scan the text once and return the bias keywords it contains as a list of
+    dicts with type, keyword, count and offsets (into the lowercased text).
     """
     if not text or not isinstance(text, str):
-        return 0.0, []
-    text_lower = text.lower()
-    found_types = set()
-    found_keywords = 0
-    for bias_type, keyword in ALL_BIAS_KEYWORDS:
-        # Use word boundaries for whole word match
-        if re.search(r'\b' + re.escape(keyword) + r'\b', text_lower):
-            found_types.add(bias_type)
-            found_keywords += 1
+        return []
+    offsets = {}
+    for match in KEYWORD_PATTERN.finditer(text.lower()):
+        keyword = match.group(1)
+        offsets.setdefault(keyword, []).append(match.start())
+        for prefix in PREFIX_KEYWORDS[keyword]:
+            offsets.setdefault(prefix, []).append(match.start())
+    return [{'type': bias_type, 'keyword': keyword, 'count': len(offsets[keyword]), 'offsets': offsets[keyword]}
+            for bias_type, keyword in ALL_BIAS_KEYWORDS if keyword in offsets]
+
+
+def score_matches(matches):
+    """Bias score (0-1) and sorted bias types for the result of find_bias_keywords"""
+    found_types = {match['type'] for match in matches}
     # Score: fraction of unique types found, weighted by keyword count
-    bias_score = min(1.0, (len(found_types) + found_keywords / 10) / (len(BIAS_KEYWORDS) + 1))
+    bias_score = min(1.0, (len(found_types) + len(matches) / 10) / (len(BIAS_KEYWORDS) + 1))
     return round(bias_score, 2), sorted(found_types)
 
+
+def detect_bias(text):
+    """
+    Detects bias in the given text. Returns a bias_score (0-1) and a list of bias_types found.
+    """
+    return score_matches(find_bias_keywords(text))
+
+
 # Example usage
 if __name__ == "__main__":
     sample = "The left-wing media slammed the government in a shocking expose."
@@ -0,0 +1,413 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+
+import numpy as np
+
+from article_index import QueryError
+
+# BiasDetector (python_api) detectors whose confidences are kept
+DETECTORS = ('gender', 'confirmation', 'racial', 'loaded_language', 'sentiment')
+
+COLUMNS = OrderedDict([
+    ('key', 'u8'),          # article id hash, for de-duplication
+    ('fetched_at', 'i8'),   # unix seconds
+    ('day', 'i4'),          # publication day, days since 1970-01-01
+    ('source', 'u2'),       # dictionary code
+    ('category', 'u2'),     # dictionary code
+    ('bias_score', 'f4'),   # detect_bias score
+    ('bias_types', 'u2'),   # bitmask over the bias type dictionary
+    ('overall_bias_score', 'f4'),  # BiasDetector overall score, NaN if not analysed
+] + [(f'confidence_{name}', 'f4') for name in DETECTORS])
+
+# bias_score is rounded to two decimals, so 101 bins give exact percentiles
+SCORE_BINS = 101
+SCORE_VALUES = np.arange(SCORE_BINS) / (SCORE_BINS - 1)
+EPOCH = date(1970, 1, 1)
+MAX_TYPES = 16
+# Publication days further than this before the fetch (or after it) are taken as wrong
+MAX_AGE_DAYS = 365
+# Feed categories are free text; once there are this many, new ones are stored as ''
+MAX_CATEGORIES = 1000
+
+# Aggregates kept per (day, source, category) cell: name, shape of one cell, dtype
+ROLLUP_FIELDS = (
+    ('hist', (SCORE_BINS,), np.int32),
+    ('types', (MAX_TYPES,), np.int32),
+    ('overall_sum', (), np.float64),
+    ('overall_count', (), np.int32),
+    ('confidence_sum', (len(DETECTORS),), np.float64),
+    ('confidence_count', (len(DETECTORS),), np.int32),
+)
+ROLLUP_NAMES = tuple(name for name, _, _ in ROLLUP_FIELDS)
+
+
+def _day_number(value, fallback):
+    try:
+        return (date.fromisoformat(str(value)[:10]) - EPOCH).days
+    except ValueError:
+        return fallback
+
+
+def plausible_days(day, fetched_at):
+    """
+    Publication days, with those more than MAX_AGE_DAYS before the fetch day
+    or after the next day replaced by the fetch day, so that an article
+    dated 1970 or 9999 is not reported decades away from its neighbours.
+    """
+    fetched_day = (fetched_at // 86400).astype(day.dtype)
+    wrong = (day < fetched_day - MAX_AGE_DAYS) | (day > fetched_day + 1)
+    return np.where(wrong, fetched_day, day)
+
+
+def _key(article):
+    ident = article.get('id') or article.get('url') or ''
+    return int(hashlib.sha1(ident.encode('utf-8')).hexdigest()[:16], 16)
+
+
+class DailyRollup:
+    """
+    Per day, source and category aggregates of the whole store: a histogram
+    of bias_score, bias type counts and sums/counts of the BiasDetector
+    scores. Only cells that have rows are kept, one row of aggregates each,
+    in arrays whose capacity doubles as cells are added, so memory follows
+    the number of occupied cells however many days and categories there are.
+    Kept up to date on every append, so queries never scan rows.
+    """
+
+    def __init__(self, capacity=1024):
+        # (day, source, category) key -> cell row
+        self.cells = {}
+        self.size = 0
+        self.day = np.zeros(capacity, dtype=np.int32)
+        self.source = np.zeros(capacity, dtype=np.int32)
+        self.category = np.zeros(capacity, dtype=np.int32)
+        for name, shape, dtype in ROLLUP_FIELDS:
+            setattr(self, name, np.zeros((capacity,) + shape, dtype=dtype))
+
+    @property
+    def days(self):
+        """Number of distinct days with rows"""
+        return len(np.unique(self.day[:self.size]))
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in ('day', 'source', 'category') + ROLLUP_NAMES)
+
+    def _reserve(self, size):
+        capacity = len(self.day)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name in ('day', 'source', 'category') + ROLLUP_NAMES:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def _cells(self, day, source, category):
+        """Cell row of each (day, source, category), adding the cells not seen yet"""
+        keys = (day.astype(np.int64) << 32) | (source.astype(np.int64) << 16) | category.astype(np.int64)
+        unique, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        unique = unique.tolist()
+        added = [i for i, key in enumerate(unique) if key not in self.cells]
+        if added:
+            self._reserve(self.size + len(added))
+            rows = np.arange(self.size, self.size + len(added))
+            at = first[added]
+            self.day[rows], self.source[rows], self.category[rows] = day[at], source[at], category[at]
+            self.cells.update(zip((unique[i] for i in added), rows.tolist()))
+            self.size += len(added)
+        return np.array([self.cells[key] for key in unique], dtype=np.int64)[inverse]
+
+    def add(self, columns):
+        """Add rows given as a dict of column arrays; costs time proportional to the rows, not the rollup"""
+        if not len(columns['day']):
+            return
+        cell = self._cells(columns['day'], columns['source'], columns['category'])
+
+        score_bin = np.clip(np.rint(columns['bias_score'] * (SCORE_BINS - 1)), 0, SCORE_BINS - 1).astype(np.int64)
+        np.add.at(self.hist, (cell, score_bin), 1)
+
+        bits = (columns['bias_types'][:, None] >> np.arange(MAX_TYPES)) & 1
+        rows, type_codes = np.nonzero(bits)
+        np.add.at(self.types, (cell[rows], type_codes), 1)
+
+        overall = columns['overall_bias_score']
+        known = ~np.isnan(overall)
+        np.add.at(self.overall_sum, cell[known], overall[known])
+        np.add.at(self.overall_count, cell[known], 1)
+
+        for k, name in enumerate(DETECTORS):
+            values = columns[f'confidence_{name}']
+            known = ~np.isnan(values)
+            np.add.at(self.confidence_sum, (cell[known], k), values[known])
+            np.add.at(self.confidence_count, (cell[known], k), 1)
+
+
+class BiasStore:
+    """
+    Append-only columnar store of per-article bias results.
+    Each column is a NumPy array in its own memory-mapped file; sources,
+    categories and bias types are dictionary-encoded. meta.json holds the
+    row count and the dictionaries and is replaced atomically after the
+    columns are flushed, so rows only become visible once fully written.
+    """
+
+    def __init__(self, path, initial_capacity=4096, dedupe_window=10000):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.meta_path = os.path.join(path, 'meta.json')
+        self.rows = 0
+        self.sources = []
+        self.categories = []
+        self.bias_types = []
+        self.version = 0
+        self._lock = threading.Lock()
+        self._columns = {}
+        self._capacity = 0
+        self._recent_keys = OrderedDict()
+        self.dedupe_window = dedupe_window
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            self.rows = meta['rows']
+            self.sources = meta['sources']
+            self.categories = meta['categories']
+            self.bias_types = meta['bias_types']
+        self._open(max(initial_capacity, self.rows))
+        for key in self.column('key')[-dedupe_window:].tolist():
+            self._recent_keys[key] = None
+
+        self.rollup = DailyRollup()
+        columns = {name: self.column(name) for name in COLUMNS}
+        # Rows written before days were checked may carry any date
+        columns['day'] = plausible_days(columns['day'], columns['fetched_at'])
+        self.rollup.add(columns)
+
+    def _open(self, capacity):
+        """(Re)map every column file with room for capacity rows"""
+        for column in self._columns.values():
+            column.flush()
+        self._columns = {}
+        for name, dtype in COLUMNS.items():
+            file_path = os.path.join(self.path, f'{name}.bin')
+            size = capacity * np.dtype(dtype).itemsize
+            with open(file_path, 'ab') as f:
+                if f.tell() < size:
+                    f.truncate(size)
+            self._columns[name] = np.memmap(file_path, dtype=dtype, mode='r+', shape=(capacity,))
+        self._capacity = capacity
+
+    def column(self, name):
+        """Read-only view of the committed rows of a column"""
+        view = self._columns[name][:self.rows].view()
+        view.flags.writeable = False
+        return view
+
+    def _code(self, dictionary, value):
+        try:
+            return dictionary.index(value)
+        except ValueError:
+            dictionary.append(value)
+            return len(dictionary) - 1
+
+    def _save_meta(self):
+        tmp_path = self.meta_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'rows': self.rows, 'sources': self.sources, 'categories': self.categories,
+                       'bias_types': self.bias_types, 'columns': dict(COLUMNS)}, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def append(self, articles, now=None):
+        """Store bias results of articles not stored yet; returns the number of rows added"""
+        now = int(now or time.time())
+        # UTC day, like the fetch days plausible_days compares against
+        today = now // 86400
+        with self._lock:
+            records = []
+            for article in articles:
+                key = _key(article)
+                if key in self._recent_keys:
+                    continue
+                self._recent_keys[key] = None
+                if len(self._recent_keys) > self.dedupe_window:
+                    self._recent_keys.popitem(last=False)
+                records.append((key, article))
+            if not records:
+                return 0
+
+            n = len(records)
+            new = {name: np.zeros(n, dtype=dtype) for name, dtype in COLUMNS.items()}
+            for name in new:
+                if name == 'overall_bias_score' or name.startswith('confidence_'):
+                    new[name][:] = np.nan
+            for i, (key, article) in enumerate(records):
+                new['key'][i] = key
+                new['fetched_at'][i] = int(article.get('fetched_at') or now)
+                new['day'][i] = _day_number(article.get('publishedAt'), today)
+                new['source'][i] = self._code(self.sources, article.get('source') or '')
+                category = article.get('category') or ''
+                if len(self.categories) >= MAX_CATEGORIES and category not in self.categories:
+                    category = ''
+                new['category'][i] = self._code(self.categories, category)
+                new['bias_score'][i] = article.get('bias_score') or 0.0
+                mask = 0
+                for bias_type in article.get('bias_types') or []:
+                    code = self._code(self.bias_types, bias_type)
+                    if code < MAX_TYPES:
+                        mask |= 1 << code
+                new['bias_types'][i] = mask
+                analysis = article.get('bias_analysis') or {}
+                if 'overall_bias_score' in analysis:
+                    new['overall_bias_score'][i] = analysis['overall_bias_score']
+                for result in analysis.get('bias_results') or []:
+                    if result.get('bias_type') in DETECTORS:
+                        new[f"confidence_{result['bias_type']}"][i] = result.get('confidence', np.nan)
+            new['day'] = plausible_days(new['day'], new['fetched_at'])
+
+            if self.rows + n > self._capacity:
+                self._open(max(self._capacity * 2, self.rows + n))
+            for name, values in new.items():
+                self._columns[name][self.rows:self.rows + n] = values
+                self._columns[name].flush()
+            self.rows += n
+            self._save_meta()
+            self.rollup.add(new)
+            self.version += 1
+            return n
+
+    def trends(self, params):
+        """Windowed aggregates for a TrendQuery, computed from the daily rollups"""
+        with self._lock:
+            rollup = self.rollup
+            size = rollup.size
+            if not size:
+                return []
+            day = rollup.day[:size]
+            first = max(params.start, int(day.min())) if params.start is not None else int(day.min())
+            last = min(params.end, int(day.max())) if params.end is not None else int(day.max())
+            if first > last:
+                return []
+            source_codes = self._codes(self.sources, params.sources)
+            category_codes = self._codes(self.categories, params.categories)
+            rows = np.flatnonzero((day >= first) & (day <= last)
+                                  & np.isin(rollup.source[:size], source_codes)
+                                  & np.isin(rollup.category[:size], category_codes))
+            if not len(rows):
+                return []
+            day = day[rows]
+            codes = {'source': rollup.source[rows], 'category': rollup.category[rows]}
+            arrays = {name: getattr(rollup, name)[rows] for name in ROLLUP_NAMES}
+            bias_types = list(self.bias_types)
+            labels = {'source': list(self.sources), 'category': list(self.categories)}
+
+        # Group: cells of the same group and interval are summed
+        if params.group_by:
+            group = codes[params.group_by]
+            groups = labels[params.group_by]
+        else:
+            group = np.zeros(len(rows), dtype=np.int32)
+            groups = ['all']
+
+        # Bucket days into intervals, each dated by its first day in the range
+        if params.interval == 'total':
+            bucket = np.full(len(rows), first)
+        elif params.interval == 'week':
+            bucket = np.maximum((day + 3) // 7 * 7 - 3, first)  # weeks starting on Monday
+        else:
+            bucket = day
+        points, point = np.unique(np.stack([group, bucket], axis=1), axis=0, return_inverse=True)
+        point = point.reshape(-1)
+        for name, values in arrays.items():
+            summed = np.zeros((len(points),) + values.shape[1:], dtype=values.dtype)
+            np.add.at(summed, point, values)
+            arrays[name] = summed
+
+        hist = arrays['hist']
+        count = hist.sum(axis=-1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = (hist * SCORE_VALUES).sum(axis=-1) / count
+            cumulative = hist.cumsum(axis=-1)
+            percentiles = {f'p{q}': SCORE_VALUES[np.argmax(cumulative >= (q / 100) * count[..., None], axis=-1)]
+                           for q in (50, 90, 99)}
+            overall = arrays['overall_sum'] / arrays['overall_count']
+            confidence = arrays['confidence_sum'] / arrays['confidence_count']
+
+        # Plain lists from here on; indexing NumPy scalars one by one is slow
+        bias_types = bias_types[:MAX_TYPES]
+        count, mean = count.tolist(), np.round(mean, 4).tolist()
+        percentiles = {name: values.tolist() for name, values in percentiles.items()}
+        type_counts = arrays['types'][:, :len(bias_types)].tolist()
+        overall_count, overall = arrays['overall_count'].tolist(), np.round(overall, 4).tolist()
+        confidence_count, confidence = arrays['confidence_count'].tolist(), np.round(confidence, 4).tolist()
+
+        # Points come sorted by group, then date
+        series = []
+        for p, (g, day) in enumerate(points.tolist()):
+            if not count[p]:
+                continue
+            point = {
+                'date': (EPOCH + timedelta(days=day)).isoformat(),
+                'count': count[p],
+                'mean_bias_score': mean[p],
+                **{name: values[p] for name, values in percentiles.items()},
+                'bias_types': {name: n for name, n in zip(bias_types, type_counts[p]) if n},
+            }
+            if overall_count[p]:
+                point['mean_overall_bias_score'] = overall[p]
+                point['detectors'] = {name: value for name, n, value in
+                                      zip(DETECTORS, confidence_count[p], confidence[p]) if n}
+            if not series or series[-1]['group'] != groups[g]:
+                series.append({'group': groups[g], 'points': []})
+            series[-1]['points'].append(point)
+        return series
+
+    def _codes(self, dictionary, wanted):
+        if not wanted:
+            return np.arange(len(dictionary))
+        wanted = {value.lower() for value in wanted}
+        return np.array([code for code, value in enumerate(dictionary) if value.lower() in wanted], dtype=np.int64)
+
+    def stats(self):
+        return {'rows': self.rows, 'sources': len(self.sources), 'categories': len(self.categories),
+                'days': self.rollup.days, 'rollup_cells': self.rollup.size, 'rollup_bytes': self.rollup.nbytes}
+
+
+class TrendQuery:
+    """Validated /api/trends query parameters"""
+
+    GROUPS = ('source', 'category')
+    INTERVALS = ('day', 'week', 'total')
+
+    def __init__(self, args):
+        def day(name):
+            value = args.get(name)
+            if not value:
+                return None
+            try:
+                return (date.fromisoformat(value) - EPOCH).days
+            except ValueError:
+                raise QueryError(f"'{name}' must be a date (YYYY-MM-DD)")
+
+        def many(name):
+            values = []
+            for value in args.getlist(name):
+                values.extend(part.strip() for part in value.split(',') if part.strip())
+            return values
+
+        self.start = day('from')
+        self.end = day('to')
+        self.group_by = args.get('group_by') or None
+        if self.group_by not in (None,) + self.GROUPS:
+            raise QueryError(f"'group_by' must be one of {', '.join(self.GROUPS)}")
+        self.interval = args.get('interval', 'day')
+        if self.interval not in self.INTERVALS:
+            raise QueryError(f"'interval' must be one of {', '.join(self.INTERVALS)}")
+        self.sources = many('source')
+        self.categories = many('category')
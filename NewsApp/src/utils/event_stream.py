@@ -0,0 +1,96 @@
+import json
+import threading
+from collections import deque
+from response_cache import project
+
+
+class EventLog:
+    """
+    Bounded in-memory log of article change events.
+    Event ids increase by one, so a client reconnecting with Last-Event-ID
+    can be replayed everything it missed as long as it is still in the log.
+    """
+
+    def __init__(self, max_events=1000):
+        self.events = deque(maxlen=max_events)
+        self.last_id = 0
+        self._changed = threading.Condition()
+
+    def append(self, event_type, data):
+        with self._changed:
+            self.last_id += 1
+            self.events.append((self.last_id, event_type, json.dumps(data, separators=(',', ':'))))
+            self._changed.notify_all()
+            return self.last_id
+
+    def since(self, last_id):
+        """
+        Events after last_id. Returns None when events after last_id have
+        already been dropped from the log (or last_id is unknown) and the
+        client has to resync.
+        """
+        with self._changed:
+            if last_id > self.last_id:
+                # Id from before a restart
+                return None
+            if not self.events or last_id == self.last_id:
+                return []
+            oldest = self.events[0][0]
+            if last_id < oldest - 1:
+                return None
+            return [event for event in self.events if event[0] > last_id]
+
+    def wait(self, last_id, timeout):
+        """Block until there are events after last_id or timeout passes"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.last_id > last_id, timeout)
+        return self.since(last_id)
+
+
+def diff_snapshots(previous, snapshot, fields=None):
+    """List (event_type, data) changes between two snapshots, keyed by article id"""
+    old = {article.get('id') or article['url']: article for article in previous.articles}
+    new = {article.get('id') or article['url']: article for article in snapshot.articles}
+    changes = []
+    for key, article in new.items():
+        if key not in old:
+            changes.append(('added', project(article, fields)))
+        elif article is not old[key] and article != old[key]:
+            changes.append(('updated', project(article, fields)))
+    for key in old:
+        if key not in new:
+            changes.append(('removed', {'id': key}))
+    return changes
+
+
+def format_event(event_id, event_type, data):
+    """Encode one Server-Sent Events message"""
+    return f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n"
+
+
+def stream_events(log, last_id=None, keepalive=15):
+    """
+    Generator of SSE messages for one client.
+    Without last_id only new events are sent; with it, missed events are
+    replayed first, or a 'reset' event is sent if they are no longer held.
+    """
+    if last_id is None:
+        last_id = log.last_id
+    yield "retry: 5000\n\n"
+    while True:
+        events = log.since(last_id)
+        if events is None:
+            # Too far behind: tell the client to reload /api/news and carry on from now
+            last_id = log.last_id
+            yield format_event(last_id, 'reset', json.dumps({'last_event_id': last_id}))
+            continue
+        if not events:
+            events = log.wait(last_id, keepalive)
+            if events is None:
+                continue
+        if not events:
+            yield ": keepalive\n\n"
+            continue
+        for event_id, event_type, data in events:
+            yield format_event(event_id, event_type, data)
+            last_id = event_id
@@ -0,0 +1,150 @@
+import html
+import re
+import requests
+from email.utils import parsedate_to_datetime
+from xml.etree.ElementTree import XMLPullParser, ParseError
+
+# Namespaces used by Atom feeds and Google News sitemaps
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+SITEMAP_NS = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+NEWS_NS = '{http://www.google.com/schemas/sitemap-news/0.9}'
+MEDIA_NS = '{http://search.yahoo.com/mrss/}'
+DC_NS = '{http://purl.org/dc/elements/1.1/}'
+
+ENTRY_TAGS = {'item', ATOM_NS + 'entry', SITEMAP_NS + 'url'}
+
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def _clean_text(value):
+    """Strip markup and entities from feed text"""
+    if not value:
+        return None
+    value = _TAG_RE.sub(' ', html.unescape(value))
+    value = re.sub(r'\s+', ' ', value).strip()
+    return value or None
+
+
+def _parse_date(value):
+    """Normalise RFC 822 (RSS) and ISO 8601 (Atom, sitemaps) dates to YYYY-MM-DD"""
+    if not value:
+        return None
+    value = value.strip()
+    if re.match(r'\d{4}-\d{2}-\d{2}', value):
+        return value[:10]
+    try:
+        return parsedate_to_datetime(value).strftime('%Y-%m-%d')
+    except (TypeError, ValueError):
+        return None
+
+
+def _find_text(elem, *paths):
+    """Return the text of the first matching child"""
+    for path in paths:
+        child = elem.find(path)
+        if child is not None and child.text and child.text.strip():
+            return child.text.strip()
+    return None
+
+
+def _rss_entry(item):
+    image = None
+    for path in (MEDIA_NS + 'content', MEDIA_NS + 'thumbnail', 'enclosure'):
+        child = item.find(path)
+        if child is not None and child.get('url'):
+            image = child.get('url')
+            break
+    return {
+        'title': _clean_text(_find_text(item, 'title')),
+        'url': _find_text(item, 'link', 'guid'),
+        'description': _clean_text(_find_text(item, 'description')),
+        'publishedAt': _parse_date(_find_text(item, 'pubDate', DC_NS + 'date')),
+        'category': _clean_text(_find_text(item, 'category')),
+        'author': _clean_text(_find_text(item, DC_NS + 'creator', 'author')),
+        'image': image,
+    }
+
+
+def _atom_entry(entry):
+    url = None
+    for link in entry.findall(ATOM_NS + 'link'):
+        if link.get('rel', 'alternate') == 'alternate' and link.get('href'):
+            url = link.get('href')
+            break
+    category = entry.find(ATOM_NS + 'category')
+    return {
+        'title': _clean_text(_find_text(entry, ATOM_NS + 'title')),
+        'url': url,
+        'description': _clean_text(_find_text(entry, ATOM_NS + 'summary', ATOM_NS + 'content')),
+        'publishedAt': _parse_date(_find_text(entry, ATOM_NS + 'published', ATOM_NS + 'updated')),
+        'category': category.get('term') if category is not None else None,
+        'author': _clean_text(_find_text(entry, f'{ATOM_NS}author/{ATOM_NS}name')),
+        'image': None,
+    }
+
+
+def _sitemap_entry(url_elem):
+    news = url_elem.find(NEWS_NS + 'news')
+    if news is None:
+        return None
+    keywords = _find_text(news, NEWS_NS + 'keywords')
+    image = url_elem.find('{http://www.google.com/schemas/sitemap-image/1.1}image/'
+                          '{http://www.google.com/schemas/sitemap-image/1.1}loc')
+    return {
+        'title': _clean_text(_find_text(news, NEWS_NS + 'title')),
+        'url': _find_text(url_elem, SITEMAP_NS + 'loc'),
+        'description': None,
+        'publishedAt': _parse_date(_find_text(news, NEWS_NS + 'publication_date')),
+        'category': keywords.split(',')[0].strip() if keywords else None,
+        'author': None,
+        'image': image.text.strip() if image is not None and image.text else None,
+    }
+
+
+def parse_feed_entries(chunks):
+    """
+    Stream entries out of an RSS, Atom or news sitemap document.
+    chunks is any iterable of bytes; each finished entry is yielded as soon
+    as its closing tag is seen and then dropped from the tree.
+    """
+    parser = XMLPullParser(events=('end',))
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            if elem.tag not in ENTRY_TAGS:
+                continue
+            if elem.tag == 'item':
+                entry = _rss_entry(elem)
+            elif elem.tag == ATOM_NS + 'entry':
+                entry = _atom_entry(elem)
+            else:
+                entry = _sitemap_entry(elem)
+            elem.clear()
+            if entry and entry['title'] and entry['url']:
+                yield entry
+
+
+def discover_from_feeds(feed_urls, headers, limit=20, session=None, timeout=10):
+    """
+    Read article entries from the first feed in feed_urls that yields any.
+    The download is streamed and abandoned as soon as limit entries are read.
+    """
+    http = session or requests
+    for feed_url in feed_urls:
+        entries = []
+        seen = set()
+        try:
+            with http.get(feed_url, headers=headers, timeout=timeout, stream=True) as response:
+                response.raise_for_status()
+                for entry in parse_feed_entries(response.iter_content(chunk_size=16384)):
+                    if entry['url'] in seen:
+                        continue
+                    seen.add(entry['url'])
+                    entries.append(entry)
+                    if len(entries) >= limit:
+                        break
+        except (requests.RequestException, ParseError) as e:
+            print(f"Error reading feed {feed_url}: {e}")
+        if entries:
+            return entries
+    return []
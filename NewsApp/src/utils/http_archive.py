@@ -0,0 +1,178 @@
+"""
+Record and replay HTTP traffic for offline scraper runs.
+
+Recording:
+    python http_archive.py record pages.jsonl.gz --source indianexpress --limit 10
+
+The archive is a gzip-compressed JSON-lines file with one response per
+line. Replaying mounts a transport adapter on a requests.Session that
+serves responses from the archive, with optional latency and injected
+errors, so scrapers can be run and benchmarked without network access.
+"""
+import argparse
+import base64
+import gzip
+import json
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.response import HTTPResponse
+from io import BytesIO
+
+# Response headers worth keeping; hop-by-hop and encoding headers are dropped
+# because bodies are stored decoded.
+KEPT_HEADERS = ('Content-Type', 'Last-Modified', 'ETag', 'Location')
+
+
+def load_archive(path):
+    """Read an archive into a {url: record} dict"""
+    records = {}
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                records[record['url']] = record
+    return records
+
+
+def save_archive(path, records):
+    """Write records (an iterable of dicts) to an archive"""
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+
+
+def archived_pages(path):
+    """Yield (url, body bytes) for every successful HTML response in an archive"""
+    for url, record in load_archive(path).items():
+        if record['status'] == 200 and 'html' in record['headers'].get('Content-Type', 'text/html'):
+            yield url, base64.b64decode(record['body'])
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Transport adapter that performs real requests and keeps a copy of every response"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.records = []
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        body = response.content
+        record = {
+            'url': request.url,
+            'method': request.method,
+            'status': response.status_code,
+            'headers': {k: response.headers[k] for k in KEPT_HEADERS if k in response.headers},
+            'body': base64.b64encode(body).decode('ascii'),
+            'elapsed_ms': round(response.elapsed.total_seconds() * 1000, 1),
+        }
+        with self._lock:
+            self.records.append(record)
+        return response
+
+    def save(self, path):
+        save_archive(path, self.records)
+        print(f"Recorded {len(self.records)} responses to {path}")
+
+
+class ReplayAdapter(HTTPAdapter):
+    """
+    Transport adapter that answers requests from an archive.
+    latency adds a fixed delay (plus up to jitter seconds) per request;
+    error_rate is the fraction of requests that fail, either with a
+    connection error or, if error_status is set, with that HTTP status.
+    Unknown URLs get a 404.
+    """
+
+    def __init__(self, records, latency=0.0, jitter=0.0, error_rate=0.0, error_status=None, seed=None):
+        super().__init__()
+        self.records = records
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.request_count = 0
+        self.error_count = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        with self._lock:
+            self.request_count += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            fail = self.error_rate and self._random.random() < self.error_rate
+            if fail:
+                self.error_count += 1
+        if delay:
+            time.sleep(delay)
+
+        if fail and self.error_status is None:
+            raise requests.ConnectionError(f"Injected connection error for {request.url}", request=request)
+
+        record = self.records.get(request.url)
+        if fail:
+            status, headers, body = self.error_status, {}, b''
+        elif record is None:
+            status, headers, body = 404, {}, b''
+        else:
+            status, headers, body = record['status'], record['headers'], base64.b64decode(record['body'])
+        return self._build_response(request, status, headers, body)
+
+    def _build_response(self, request, status, headers, body):
+        raw = HTTPResponse(body=BytesIO(body), headers=headers, status=status,
+                           preload_content=False, decode_content=False)
+        response = self.build_response(request, raw)
+        response.headers = CaseInsensitiveDict(headers)
+        return response
+
+    def reset_counters(self):
+        with self._lock:
+            self.request_count = 0
+            self.error_count = 0
+
+
+def recording_session():
+    """Session that records every response; call session.recorder.save(path) afterwards"""
+    session = requests.Session()
+    session.recorder = RecordingAdapter()
+    session.mount('http://', session.recorder)
+    session.mount('https://', session.recorder)
+    return session
+
+
+def replay_session(archive_path, **options):
+    """Session served entirely from an archive; options are passed to ReplayAdapter"""
+    session = requests.Session()
+    session.replayer = ReplayAdapter(load_archive(archive_path), **options)
+    session.mount('http://', session.replayer)
+    session.mount('https://', session.replayer)
+    return session
+
+
+def _scraper_for(source, session, discovery):
+    if source == 'thehindu':
+        from thehindu_scraper import TheHinduScraper
+        return TheHinduScraper(discovery=discovery, session=session)
+    from indianexpress_scraper import IndianExpressScraper
+    return IndianExpressScraper(discovery=discovery, session=session)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description='Record a scraping run to an HTTP archive')
+    subparsers = arg_parser.add_subparsers(dest='command', required=True)
+    record = subparsers.add_parser('record', help='Run a scraper against the live site and record responses')
+    record.add_argument('archive', help='Output archive path (*.jsonl.gz)')
+    record.add_argument('--source', choices=['indianexpress', 'thehindu'], default='indianexpress')
+    record.add_argument('--discovery', choices=['homepage', 'feed'], default='homepage')
+    record.add_argument('--limit', type=int, default=10)
+    args = arg_parser.parse_args()
+
+    session = recording_session()
+    articles = _scraper_for(args.source, session, args.discovery).scrape_latest_news(args.limit)
+    print(f"Scraped {len(articles)} articles")
+    session.recorder.save(args.archive)
@@ -0,0 +1,235 @@
+import hashlib
+import threading
+import time
+from itertools import islice
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that never change which article a URL points to
+TRACKING_PARAMS = ('utm_', 'ref', 'fbclid', 'gclid', 'amp')
+
+
+def canonical_url(url):
+    """Normalise an article URL so the same story always maps to the same key"""
+    parts = urlsplit(url.strip())
+    query = [(k, v) for k, v in parse_qsl(parts.query) if not k.lower().startswith(TRACKING_PARAMS)]
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower() or 'https', parts.netloc.lower(), path, urlencode(query), ''))
+
+
+def article_id(url):
+    """Short stable identifier derived from the canonical URL"""
+    return hashlib.sha1(canonical_url(url).encode('utf-8')).hexdigest()[:16]
+
+
+def content_hash(item):
+    """Hash of the listing fields that change when a story is updated"""
+    parts = [item.get('title') or '', item.get('description') or '', item.get('publishedAt') or '']
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+class Snapshot:
+    """Immutable set of articles published by one refresh"""
+
+    def __init__(self, articles, version, created_at):
+        self.articles = tuple(articles)
+        self.version = version
+        self.created_at = created_at
+
+    def age(self, now=None):
+        if not self.created_at:
+            return None
+        return (now or time.time()) - self.created_at
+
+
+class NewsCache:
+    """
+    Stale-while-revalidate article cache.
+    Readers always get the current snapshot without waiting; a single
+    background refresh (never more than one at a time) replaces it by
+    swapping the snapshot reference once the new articles are ready.
+    """
+
+    def __init__(self, fetch_articles, max_age=300):
+        # Called with the current snapshot, returns the articles for the next one
+        self.fetch_articles = fetch_articles
+        self.max_age = max_age
+        self.snapshot = Snapshot([], 0, 0)
+        self.last_error = None
+        self.last_refresh_duration = None
+        self.last_refresh_started = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        # Run on every new snapshot before it becomes visible (build indexes, ...)
+        self._preparers = []
+        # Run after a new snapshot has been published, with the previous one
+        self._listeners = []
+
+    def add_preparer(self, prepare):
+        """Register prepare(snapshot); it is applied to the current snapshot straight away"""
+        self._preparers.append(prepare)
+        prepare(self.snapshot)
+
+    def add_listener(self, listener):
+        """Register listener(snapshot, previous) to be told about published snapshots"""
+        self._listeners.append(listener)
+
+    @property
+    def refreshing(self):
+        return self._refresh_lock.locked()
+
+    def get(self):
+        """Return the current snapshot, kicking off a background refresh if it is stale"""
+        snapshot = self.snapshot
+        age = snapshot.age()
+        if age is None or age > self.max_age:
+            self.refresh_async()
+        return snapshot
+
+    def refresh(self, wait=False):
+        """
+        Run one refresh in the calling thread. If a refresh is already running,
+        return False straight away, or once it finishes when wait is True.
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            if wait:
+                with self._refresh_lock:
+                    pass
+            return False
+        try:
+            self.last_refresh_started = time.time()
+            start = time.perf_counter()
+            try:
+                articles = self.fetch_articles(self.snapshot)
+                self.publish(articles)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Error updating cache: {e}")
+            self.last_refresh_duration = round(time.perf_counter() - start, 3)
+            return True
+        finally:
+            self._refresh_lock.release()
+
+    def refresh_async(self):
+        """Start a refresh in a background thread unless one is already running"""
+        if self.refreshing:
+            return False
+        threading.Thread(target=self.refresh, daemon=True).start()
+        return True
+
+    def restore(self, articles, version, created_at):
+        """Install a previously saved snapshot without notifying listeners"""
+        snapshot = Snapshot(articles, version, created_at)
+        for prepare in self._preparers:
+            prepare(snapshot)
+        self.snapshot = snapshot
+        print(f"Restored snapshot v{version} with {len(snapshot.articles)} articles")
+        return snapshot
+
+    def publish(self, articles):
+        """Atomically replace the current snapshot"""
+        previous = self.snapshot
+        snapshot = Snapshot(articles, previous.version + 1, time.time())
+        for prepare in self._preparers:
+            prepare(snapshot)
+        self.snapshot = snapshot
+        print(f"Cache updated with {len(snapshot.articles)} articles")
+        for listener in self._listeners:
+            try:
+                listener(snapshot, previous)
+            except Exception as e:
+                print(f"Error in snapshot listener {getattr(listener, '__name__', listener)}: {e}")
+        return snapshot
+
+    def start(self, interval=None):
+        """Refresh now and then every interval seconds in a daemon thread"""
+        interval = interval or self.max_age
+
+        def run():
+            while not self._stop.is_set():
+                self.refresh()
+                self._stop.wait(interval)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self, snapshot=None):
+        """Metadata describing a snapshot and the refresher"""
+        snapshot = snapshot or self.snapshot
+        age = snapshot.age()
+        return {
+            'version': snapshot.version,
+            'snapshot_age': round(age, 1) if age is not None else None,
+            'stale': age is None or age > self.max_age,
+            'refreshing': self.refreshing,
+            'last_refresh_duration': self.last_refresh_duration,
+            'last_error': self.last_error,
+            'last_refresh_stats': getattr(self.fetch_articles, 'last_stats', None),
+        }
+
+
+class IncrementalRefresher:
+    """
+    Refresh strategy that only scrapes what changed.
+    Each refresh discovers the current headline set, keeps cached articles
+    whose canonical URL and content hash are unchanged, runs only new or
+    changed headlines through the scraper's fetch/extract/enrich stages, and
+    drops articles that are no longer listed or older than max_article_age.
+    """
+
+    def __init__(self, scraper, window=30, max_article_age=6 * 3600):
+        self.scraper = scraper
+        self.window = window
+        self.max_article_age = max_article_age
+        self.last_stats = None
+
+    def __call__(self, snapshot):
+        now = time.time()
+        cached = {article['id']: article for article in snapshot.articles if 'id' in article}
+
+        listed = []
+        pending = []
+        hashes = {}
+        for candidate in islice(self.scraper.discover(self.window), self.window * 2):
+            key = article_id(candidate['url'])
+            if key in hashes:
+                continue
+            listed.append(key)
+            hashes[key] = content_hash(candidate)
+            existing = cached.get(key)
+            fresh = existing and now - existing.get('fetched_at', 0) <= self.max_article_age
+            if not (fresh and existing.get('content_hash') == hashes[key]):
+                pending.append(candidate)
+            if len(listed) >= self.window:
+                break
+
+        updated = {}
+        for article in self.scraper.process(pending):
+            key = article_id(article['url'])
+            article['id'] = key
+            article['content_hash'] = hashes.get(key)
+            article['fetched_at'] = now
+            updated[key] = article
+
+        articles = []
+        for key in listed:
+            # A failed re-fetch keeps the previous version rather than dropping the story
+            article = updated.get(key) or cached.get(key)
+            if article:
+                articles.append(article)
+
+        self.last_stats = {
+            'listed': len(listed),
+            'fetched': len(pending),
+            'added': sum(1 for key in updated if key not in cached),
+            'changed': sum(1 for key in updated if key in cached),
+            'kept': sum(1 for key in listed if key in cached and key not in updated),
+            'evicted': sum(1 for key in cached if key not in listed),
+        }
+        print(f"Incremental refresh: {self.last_stats}")
+        return articles
@@ -0,0 +1,54 @@
+import gzip
+import json
+import threading
+from collections import OrderedDict
+
+
+class EncodedBody:
+    """A response body serialized once, kept both plain and gzip-compressed"""
+
+    __slots__ = ('raw', 'gzip')
+
+    def __init__(self, payload):
+        self.raw = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        # mtime=0 keeps the compressed bytes identical for identical payloads
+        self.gzip = gzip.compress(self.raw, compresslevel=6, mtime=0)
+
+
+class ViewCache:
+    """
+    Encoded response bodies for one snapshot, keyed by normalised query.
+    Common views are rendered when the snapshot is published; anything else
+    is rendered on first request and kept (LRU, bounded) until the snapshot
+    is replaced.
+    """
+
+    def __init__(self, max_views=128):
+        self.max_views = max_views
+        self._views = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, render):
+        """Return the EncodedBody for key, rendering it with render() on a miss"""
+        with self._lock:
+            body = self._views.get(key)
+            if body is not None:
+                self._views.move_to_end(key)
+                return body
+        # Render outside the lock; a concurrent miss on the same key just does the work twice
+        body = EncodedBody(render())
+        with self._lock:
+            self._views[key] = body
+            while len(self._views) > self.max_views:
+                self._views.popitem(last=False)
+        return body
+
+    def __len__(self):
+        return len(self._views)
+
+
+def project(article, fields):
+    """Keep only the requested fields of an article"""
+    if not fields:
+        return article
+    return {field: article[field] for field in fields if field in article}
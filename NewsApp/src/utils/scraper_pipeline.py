@@ -0,0 +1,419 @@
+import queue
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+import requests
+from bias_detector import detect_bias
+from feed_discovery import discover_from_feeds
+from news_cache import article_id
+from analysis_bridge import ANALYSIS_FIELDS, HTMLParser, bind, span
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+TEXT_NOT_AVAILABLE = 'Full article text not available'
+
+# End-of-stream marker passed between stages
+_DONE = object()
+
+
+def meta_content(soup, **attrs):
+    """Return the content of the first <meta> tag matching attrs, or None"""
+    elem = soup.find('meta', attrs=attrs)
+    if elem and elem.get('content'):
+        return elem['content']
+    return None
+
+
+# Article field -> attributes of the <meta> tag holding it
+DEFAULT_META_FIELDS = {
+    'description': {'name': 'description'},
+    'publishedAt': {'property': 'article:published_time'},
+    'category': {'property': 'article:section'},
+}
+
+
+def extract_meta(soup, meta_fields=None):
+    """Read article fields (by default description, published date and section) from the meta tags"""
+    meta = {}
+    for field, attrs in (meta_fields or DEFAULT_META_FIELDS).items():
+        meta[field] = meta_content(soup, **attrs)
+    if meta.get('publishedAt'):
+        meta['publishedAt'] = meta['publishedAt'][:10]
+    return meta
+
+
+@dataclass
+class SiteConfig:
+    """Declarative description of how to scrape one news site"""
+    name: str
+    base_url: str
+    feed_urls: List[str] = field(default_factory=list)
+
+    # Homepage discovery: CSS selectors matching article <a> tags, in priority order
+    listing_selectors: List[str] = field(default_factory=list)
+    # Looked up in the link's enclosing block to get a teaser description
+    listing_description_selector: Optional[str] = None
+    # Links must contain this domain / any of url_include, and none of url_exclude
+    allowed_domain: Optional[str] = None
+    url_include: List[str] = field(default_factory=list)
+    url_exclude: List[str] = field(default_factory=list)
+    min_title_length: int = 10
+    max_title_length: int = 200
+
+    # Article page extraction
+    meta_fields: Dict[str, Dict[str, str]] = field(default_factory=lambda: dict(DEFAULT_META_FIELDS))
+    author_selectors: List[str] = field(default_factory=list)
+    content_selectors: List[str] = field(default_factory=list)
+    min_paragraph_length: int = 20
+    fallback_paragraph_length: int = 50
+    max_text_length: int = 2000
+    description_from_first_paragraph: bool = False
+    # Drop the article when its page cannot be fetched instead of keeping the teaser
+    require_article_page: bool = False
+
+    # Enrichment
+    default_author: Optional[str] = None
+    default_category: str = 'General'
+    # Keyword fallback used when neither the listing nor the page names a category
+    categories: Dict[str, List[str]] = field(default_factory=dict)
+    detect_bias: bool = True
+
+    # Politeness and concurrency
+    fetch_delay: float = 0.5
+    fetch_workers: int = 4
+    timeout: int = 10
+    queue_size: int = 8
+
+
+class ScraperPipeline:
+    """
+    Generic discover -> fetch -> extract -> enrich scraper driven by a SiteConfig.
+    Stages run in their own threads connected by bounded queues, so discovery
+    stalls when fetching falls behind and articles come out as soon as each
+    one is enriched.
+    """
+
+    def __init__(self, config, parser_backend=None, discovery='homepage', full_text=True, session=None,
+                 clusters=None, analyzer=None):
+        self.config = config
+        self.parser = HTMLParser(parser_backend)
+        # 'homepage' parses the homepage, 'feed' reads the RSS feed / news sitemap
+        self.discovery = discovery
+        # True parses whole article pages; 'meta' downloads them but parses only the
+        # <head> meta tags; False (feed mode) does not download them at all
+        self.full_text = full_text
+        self.session = session or requests.Session()
+        self.base_url = config.base_url
+        self.feed_urls = list(config.feed_urls)
+        self.headers = {'User-Agent': USER_AGENT}
+        # Optional StoryClusters shared between scrapers; near-duplicates reuse the analysis
+        self.clusters = clusters
+        # Optional analysis_bridge.ArticleAnalyzer adding summary and bias_analysis at ingest
+        self.analyzer = analyzer
+
+    def scrape_latest_news(self, limit=20):
+        """Scrape up to limit articles and return them as a list"""
+        try:
+            return list(self.stream(limit))
+        except Exception as e:
+            print(f"Error scraping {self.config.name}: {e}")
+            return []
+
+    def scrape_page(self, page_url, limit=20):
+        """Scrape the articles linked from a specific listing page"""
+        try:
+            return list(self.process(self._discover_page(page_url), limit))
+        except Exception as e:
+            print(f"Error scraping page {page_url}: {e}")
+            return []
+
+    def stream(self, limit=20):
+        """Yield articles one by one as soon as they are ready"""
+        return self.process(self.discover(limit), limit)
+
+    # Stages
+
+    def discover(self, limit=20):
+        """Yield article candidates (title, url and whatever the listing tells us)"""
+        if self.discovery == 'feed':
+            entries = discover_from_feeds(self.feed_urls, self.headers, limit, session=self.session,
+                                          timeout=self.config.timeout)
+            if entries:
+                yield from entries
+                return
+            print(f"No feed entries found for {self.config.name}, falling back to homepage")
+        yield from self._discover_page(self.base_url)
+
+    def fetch(self, item):
+        """Download the article page"""
+        try:
+            time.sleep(self.config.fetch_delay)
+            response = self.session.get(item['url'], headers=self.headers, timeout=self.config.timeout)
+            response.raise_for_status()
+            item['_content'] = response.content
+        except Exception as e:
+            print(f"Error fetching article {item['url']}: {e}")
+            if self.config.require_article_page:
+                return None
+            item['_content'] = None
+        return item
+
+    def extract(self, item):
+        """Fill in metadata and full text from the downloaded page"""
+        content = item.pop('_content', None)
+        if content is None:
+            item['full_text'] = TEXT_NOT_AVAILABLE
+            return item
+        if self.full_text == 'meta':
+            soup = self.parser.parse_head(content)
+        else:
+            soup = self.parser.parse(content)
+
+        # Listing/feed values win over page values
+        for key, value in extract_meta(soup, self.config.meta_fields).items():
+            if not item.get(key) and value:
+                item[key] = value
+        if self.full_text == 'meta':
+            item['full_text'] = TEXT_NOT_AVAILABLE
+            return item
+        if not item.get('description') and self.config.description_from_first_paragraph:
+            p = soup.find('p')
+            if p:
+                item['description'] = p.get_text(strip=True)
+        if not item.get('author'):
+            for selector in self.config.author_selectors:
+                author_elem = soup.select_one(selector)
+                if author_elem and author_elem.get_text(strip=True):
+                    item['author'] = author_elem.get_text(strip=True)
+                    break
+
+        item['full_text'] = self.extract_text(soup)
+        return item
+
+    def enrich(self, item):
+        """Apply defaults, categorise, score bias and analyse, producing the final article dict"""
+        config = self.config
+        title = item['title']
+        description = item.get('description')
+        full_text = item.get('full_text', '')
+
+        article = {
+            'title': title,
+            'description': description or 'No description available',
+            'full_text': full_text,
+            'url': item['url'],
+            'image': item.get('image') or '',
+            'author': item.get('author') or config.default_author or config.name,
+            'publishedAt': item.get('publishedAt') or datetime.now().strftime('%Y-%m-%d'),
+            'source': config.name,
+            'category': item.get('category') or self.categorize(title, description),
+        }
+        has_text = full_text and full_text != TEXT_NOT_AVAILABLE
+        cluster = None
+        if self.clusters is not None:
+            cluster = self.clusters.assign(article_id(item['url']), full_text if has_text else '')
+            article['cluster_id'] = cluster.id
+        if config.detect_bias:
+            shared = self.clusters.shared_results(cluster, ('bias_score', 'bias_types')) if cluster else None
+            if shared:
+                article['bias_score'], article['bias_types'] = shared
+            else:
+                article['bias_score'], article['bias_types'] = detect_bias(full_text if has_text else (description or title))
+                if cluster:
+                    cluster.results.update(bias_score=article['bias_score'], bias_types=article['bias_types'])
+        if self.analyzer and has_text:
+            shared = self.clusters.shared_results(cluster, ANALYSIS_FIELDS) if cluster else None
+            if shared:
+                article.update(zip(ANALYSIS_FIELDS, shared))
+            else:
+                try:
+                    article.update(self.analyzer.analyze(full_text))
+                    if cluster:
+                        cluster.results.update((name, article[name]) for name in ANALYSIS_FIELDS)
+                except Exception as e:
+                    # The on-demand endpoints remain available for this article
+                    print(f"Error analysing article {item['url']}: {e}")
+        return article
+
+    def process(self, candidates, limit=None):
+        """Run candidates through the remaining stages, yielding finished articles"""
+        if self.full_text:
+            stages = [(self.fetch, self.config.fetch_workers), (self.extract, 1), (self.enrich, 1)]
+        else:
+            stages = [(self.enrich, 1)]
+        return self._run(candidates, stages, limit)
+
+    # Helpers
+
+    def _discover_page(self, page_url):
+        response = self.session.get(page_url, headers=self.headers, timeout=self.config.timeout)
+        response.raise_for_status()
+        soup = self.parser.parse(response.content)
+
+        seen_urls = set()
+        seen_titles = set()
+        for selector in self.config.listing_selectors:
+            for link in soup.select(selector):
+                candidate = self._candidate_from_link(link)
+                if not candidate:
+                    continue
+                if candidate['url'] in seen_urls or candidate['title'] in seen_titles:
+                    continue
+                seen_urls.add(candidate['url'])
+                seen_titles.add(candidate['title'])
+                yield candidate
+
+    def _candidate_from_link(self, link):
+        config = self.config
+        href = link.get('href')
+        title = link.get_text(strip=True) or link.get('title', '')
+        if not href or href.startswith('#') or href.startswith('javascript:'):
+            return None
+        if len(title) < config.min_title_length or len(title) > config.max_title_length:
+            return None
+
+        url = urljoin(self.base_url, href)
+        lowered = url.lower()
+        if config.allowed_domain and config.allowed_domain not in lowered:
+            return None
+        if config.url_include and not any(part in lowered for part in config.url_include):
+            return None
+        if any(part in lowered for part in config.url_exclude):
+            return None
+
+        candidate = {'title': title, 'url': url}
+        parent = link.find_parent(['article', 'div', 'section'])
+        if parent is not None:
+            if config.listing_description_selector:
+                desc_elem = parent.select_one(config.listing_description_selector)
+                if desc_elem:
+                    candidate['description'] = desc_elem.get_text(strip=True)
+            img_elem = parent.find('img')
+            if img_elem:
+                image = img_elem.get('src') or img_elem.get('data-src')
+                if image:
+                    candidate['image'] = urljoin(self.base_url, image)
+        return candidate
+
+    def extract_text(self, soup):
+        """Pull the article body out of a parsed page"""
+        config = self.config
+        try:
+            article_text = ''
+            for selector in config.content_selectors:
+                content = soup.select_one(selector)
+                if content:
+                    for p in content.find_all(['p', 'div'], recursive=True):
+                        text = p.get_text(strip=True)
+                        if text and len(text) > config.min_paragraph_length:
+                            article_text += text + '\n\n'
+                    if article_text:
+                        break
+            if not article_text:
+                # Fallback: longer <p> tags anywhere on the page
+                for p in soup.find_all('p'):
+                    text = p.get_text(strip=True)
+                    if text and len(text) > config.fallback_paragraph_length:
+                        article_text += text + '\n\n'
+            if article_text:
+                article_text = re.sub(r'\s+', ' ', article_text).strip()
+                if len(article_text) > config.max_text_length:
+                    article_text = article_text[:config.max_text_length] + '...'
+            return article_text or TEXT_NOT_AVAILABLE
+        except Exception as e:
+            print(f"Error extracting full text: {e}")
+            return TEXT_NOT_AVAILABLE
+
+    def categorize(self, title, description):
+        """Keyword-based category used when the site does not provide one"""
+        text = (title + ' ' + (description or '')).lower()
+        for category, keywords in self.config.categories.items():
+            if any(keyword in text for keyword in keywords):
+                return category
+        return self.config.default_category
+
+    def _run(self, source, stages, limit):
+        stop = threading.Event()
+        queues = [queue.Queue(maxsize=self.config.queue_size) for _ in range(len(stages) + 1)]
+
+        # Stage threads join the caller's trace, if any
+        threads = [threading.Thread(target=bind(self._feed), args=(source, queues[0], stop), daemon=True)]
+        for (func, workers), in_q, out_q in zip(stages, queues, queues[1:]):
+            remaining = [workers]
+            lock = threading.Lock()
+            for _ in range(workers):
+                threads.append(threading.Thread(
+                    target=bind(self._work), args=(func, in_q, out_q, stop, remaining, lock), daemon=True
+                ))
+        for thread in threads:
+            thread.start()
+
+        produced = 0
+        try:
+            while limit is None or produced < limit:
+                article = _get(queues[-1], stop)
+                if article is _DONE:
+                    break
+                produced += 1
+                yield article
+        finally:
+            # Stops discovery and in-flight stages when the consumer is done
+            stop.set()
+
+    def _feed(self, source, out_q, stop):
+        with span('scrape.discover', site=self.config.name) as discover:
+            found = 0
+            try:
+                for item in source:
+                    if not _put(out_q, item, stop):
+                        return
+                    found += 1
+            except Exception as e:
+                print(f"Error discovering {self.config.name} articles: {e}")
+            discover.set(found=found)
+        _put(out_q, _DONE, stop)
+
+    def _work(self, func, in_q, out_q, stop, remaining, lock):
+        while not stop.is_set():
+            item = _get(in_q, stop)
+            if item is _DONE:
+                # Let sibling workers see the end of the stream too
+                _put(in_q, _DONE, stop)
+                break
+            try:
+                with span(f'scrape.{func.__name__}', url=item.get('url')):
+                    result = func(item)
+            except Exception as e:
+                print(f"Error in {func.__name__} for {item.get('url')}: {e}")
+                result = None
+            if result is not None and not _put(out_q, result, stop):
+                return
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            _put(out_q, _DONE, stop)
+
+
+def _put(q, item, stop):
+    """Blocking put that gives up once the pipeline is stopped"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q, stop):
+    """Blocking get that returns _DONE once the pipeline is stopped"""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _DONE
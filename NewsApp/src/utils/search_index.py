@@ -0,0 +1,275 @@
+import hashlib
+import math
+import threading
+import time
+from array import array
+from collections import Counter
+
+from analysis_bridge import load_summarizer
+from article_index import QueryError, MAX_PAGE_SIZE
+from response_cache import project
+from scraper_pipeline import TEXT_NOT_AVAILABLE
+
+# Term frequency weight of each indexed field; a match in the title counts three times
+FIELD_WEIGHTS = (('title', 3), ('description', 2), ('full_text', 1))
+DEFAULT_PAGE_SIZE = 20
+
+
+class Analyzer:
+    """
+    The summarizer's preprocess_text (NLTK word_tokenize, English stopwords,
+    Porter stems) with digits kept, so numbers such as years stay
+    searchable. Documents and queries are analyzed the same way.
+    """
+
+    def __init__(self, summarizer=None):
+        self.summarizer = summarizer or load_summarizer()
+        if self.summarizer is None:
+            raise RuntimeError('Text analysis needs the python_api summarizer')
+
+    def terms(self, text):
+        return self.summarizer.preprocess_text(text, keep_digits=True)
+
+
+def _encode(buf, value):
+    """Append an unsigned integer as a varint (7 bits per byte)"""
+    while value >= 0x80:
+        buf.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _decode(buf):
+    """Yield the (doc, tf) pairs of a posting list of varint (doc gap, tf) pairs"""
+    doc = 0
+    gap = None
+    value = shift = 0
+    for byte in buf:
+        value |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        if gap is None:
+            gap = value
+        else:
+            doc += gap
+            yield doc, value
+            gap = None
+        value = shift = 0
+
+
+def _signature(article):
+    """Hash of the indexed text, to tell whether an article has to be re-indexed"""
+    parts = [article.get(field) or '' for field, _ in FIELD_WEIGHTS]
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+class _Document:
+    __slots__ = ('key', 'article', 'length', 'terms', 'signature', 'last_seen')
+
+
+class SearchIndex:
+    """
+    Incremental BM25 inverted index over title, description and full_text.
+    Documents get increasing numbers, so each posting list is stored as a
+    bytearray of varint-encoded (doc number gap, term frequency) pairs and
+    new documents are appended at the end. Removed documents are skipped
+    at query time and their postings are compacted away in batches.
+    Articles stay searchable for `retention` seconds after they were last
+    seen in a snapshot, so the index covers more than the live window.
+    """
+
+    def __init__(self, analyzer=None, stored_fields=None, retention=3 * 24 * 3600,
+                 max_documents=20000, k1=1.2, b=0.75):
+        self.analyzer = analyzer or Analyzer()
+        self.stored_fields = stored_fields
+        self.retention = retention
+        self.max_documents = max_documents
+        self.k1 = k1
+        self.b = b
+        self.vocab = {}
+        self.postings = []
+        self.last_doc = array('I')
+        self.df = array('I')
+        self.docs = {}
+        self.doc_numbers = {}
+        self.next_doc = 1
+        self.total_length = 0
+        self.dead_postings = 0
+        self.live_postings = 0
+        self._dirty_terms = set()
+        self._lock = threading.Lock()
+
+    def sync(self, articles, now=None):
+        """
+        Bring the index up to date with a snapshot's articles: index new and
+        changed ones, and evict those not seen within the retention period.
+        Returns (added, removed) counts.
+        """
+        now = now or time.time()
+        added = removed = 0
+        with self._lock:
+            for article in articles:
+                key = article.get('id') or article['url']
+                signature = _signature(article)
+                number = self.doc_numbers.get(key)
+                if number is not None:
+                    doc = self.docs[number]
+                    if doc.signature == signature:
+                        # Same text; bias scores and other stored fields may still have changed
+                        doc.article = project(article, self.stored_fields)
+                        doc.last_seen = now
+                        continue
+                    self._remove(number)
+                self._add(key, article, signature, now)
+                added += 1
+
+            cutoff = now - self.retention
+            expired = [number for number, doc in self.docs.items() if doc.last_seen < cutoff]
+            overflow = len(self.docs) - len(expired) - self.max_documents
+            if overflow > 0:
+                # Documents are kept in indexing order, so the oldest come first
+                expiring = set(expired)
+                kept = (number for number in self.docs if number not in expiring)
+                expired.extend(next(kept) for _ in range(overflow))
+            for number in expired:
+                self._remove(number)
+                removed += 1
+
+            if self.dead_postings > self.live_postings // 4:
+                self._compact()
+        return added, removed
+
+    def _add(self, key, article, signature, now):
+        frequencies = Counter()
+        for field, weight in FIELD_WEIGHTS:
+            text = article.get(field)
+            if not text or text == TEXT_NOT_AVAILABLE:
+                continue
+            for term in self.analyzer.terms(text):
+                frequencies[term] += weight
+
+        number = self.next_doc
+        self.next_doc += 1
+        terms = array('I')
+        for term, tf in frequencies.items():
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                term_id = self.vocab[term] = len(self.postings)
+                self.postings.append(bytearray())
+                self.last_doc.append(0)
+                self.df.append(0)
+            _encode(self.postings[term_id], number - self.last_doc[term_id])
+            _encode(self.postings[term_id], tf)
+            self.last_doc[term_id] = number
+            self.df[term_id] += 1
+            terms.append(term_id)
+
+        doc = _Document()
+        doc.key = key
+        doc.article = project(article, self.stored_fields)
+        doc.length = sum(frequencies.values())
+        doc.terms = terms
+        doc.signature = signature
+        doc.last_seen = now
+        self.docs[number] = doc
+        self.doc_numbers[key] = number
+        self.total_length += doc.length
+        self.live_postings += len(terms)
+
+    def _remove(self, number):
+        doc = self.docs.pop(number)
+        del self.doc_numbers[doc.key]
+        self.total_length -= doc.length
+        for term_id in doc.terms:
+            self.df[term_id] -= 1
+        self._dirty_terms.update(doc.terms)
+        self.live_postings -= len(doc.terms)
+        self.dead_postings += len(doc.terms)
+
+    def _compact(self):
+        """Rewrite the posting lists that still reference removed documents"""
+        for term_id in self._dirty_terms:
+            buf = bytearray()
+            last = 0
+            for number, tf in _decode(self.postings[term_id]):
+                if number in self.docs:
+                    _encode(buf, number - last)
+                    _encode(buf, tf)
+                    last = number
+            self.postings[term_id] = buf
+            self.last_doc[term_id] = last
+        self._dirty_terms.clear()
+        self.dead_postings = 0
+
+    def search(self, text):
+        """All matching articles as (article, score), best first"""
+        with self._lock:
+            if not self.docs:
+                return []
+            count = len(self.docs)
+            average_length = self.total_length / count or 1
+            scores = {}
+            for term in set(self.analyzer.terms(text)):
+                term_id = self.vocab.get(term)
+                if term_id is None or not self.df[term_id]:
+                    continue
+                df = self.df[term_id]
+                idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                for number, tf in _decode(self.postings[term_id]):
+                    doc = self.docs.get(number)
+                    if doc is None:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * doc.length / average_length)
+                    scores[number] = scores.get(number, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+            # Equal scores: newer documents first
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+            return [(self.docs[number].article, score) for number, score in ranked]
+
+    def query(self, params):
+        """
+        Rank and paginate matches for a SearchQuery.
+        Returns (results, total_matching, next_cursor), like ArticleIndex.query.
+        """
+        ranked = self.search(params.q)
+        start = 0
+        if params.cursor:
+            ids = [article.get('id') for article, _ in ranked]
+            try:
+                start = ids.index(params.cursor) + 1
+            except ValueError:
+                raise QueryError('Unknown or expired cursor')
+        page = ranked[start:start + params.limit]
+        results = [dict(article, score=round(score, 4)) for article, score in page]
+        more = start + params.limit < len(ranked)
+        next_cursor = page[-1][0].get('id') if page and more else None
+        return results, len(ranked), next_cursor
+
+    def stats(self):
+        with self._lock:
+            return {
+                'documents': len(self.docs),
+                'terms': sum(1 for df in self.df if df),
+                'postings': self.live_postings,
+                'posting_bytes': sum(len(buf) for buf in self.postings),
+            }
+
+
+class SearchQuery:
+    """Validated /api/search query parameters"""
+
+    def __init__(self, args):
+        self.q = (args.get('q') or '').strip()
+        if not self.q:
+            raise QueryError("'q' is required")
+        limit = args.get('limit')
+        if limit in (None, ''):
+            self.limit = DEFAULT_PAGE_SIZE
+        else:
+            try:
+                self.limit = int(limit)
+            except ValueError:
+                raise QueryError("'limit' must be a number")
+            if not 1 <= self.limit <= MAX_PAGE_SIZE:
+                raise QueryError(f"'limit' must be between 1 and {MAX_PAGE_SIZE}")
+        self.cursor = args.get('cursor') or None
@@ -0,0 +1,69 @@
+import gzip
+import json
+import os
+import tempfile
+import time
+
+SCHEMA_VERSION = 1
+
+
+class SnapshotStore:
+    """
+    Persists article snapshots as gzip-compressed JSON.
+    The file holds a small header (schema version, snapshot version,
+    creation time) and the articles, and is replaced atomically so a crash
+    mid-write never leaves a truncated snapshot behind.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def save(self, snapshot):
+        """Write a snapshot, replacing the previous file atomically"""
+        payload = {
+            'schema_version': SCHEMA_VERSION,
+            'version': snapshot.version,
+            'created_at': snapshot.created_at,
+            'saved_at': time.time(),
+            'articles': list(snapshot.articles),
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.snapshot-', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as raw:
+                with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6, mtime=0) as f:
+                    f.write(json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+                raw.flush()
+                os.fsync(raw.fileno())
+            # mkstemp creates the file private to the owner; snapshots are meant to be shared
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def load(self):
+        """
+        Read the stored snapshot as a dict with version, created_at and articles.
+        Returns None if there is no usable file.
+        """
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with gzip.open(self.path, 'rb') as f:
+                payload = json.loads(f.read().decode('utf-8'))
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable snapshot {self.path}: {e}")
+            return None
+        if payload.get('schema_version') != SCHEMA_VERSION:
+            print(f"Ignoring snapshot {self.path} with schema version {payload.get('schema_version')}")
+            return None
+        return payload
+
+
+def load_articles(path):
+    """Articles of a stored snapshot, for offline analysis and benchmarks"""
+    payload = SnapshotStore(path).load()
+    return payload['articles'] if payload else []
@@ -0,0 +1,155 @@
+import random
+import re
+import threading
+import zlib
+from collections import OrderedDict, defaultdict
+
+# Largest Mersenne prime below 2**64, modulus of the MinHash permutations
+_PRIME = (1 << 61) - 1
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+class StoryCluster:
+    """Articles telling the same story; results holds the analysis shared by all of them"""
+
+    __slots__ = ('id', 'members', 'results')
+
+    def __init__(self, cluster_id):
+        self.id = cluster_id
+        self.members = set()
+        self.results = {}
+
+
+class StoryClusters:
+    """
+    Groups near-duplicate articles into story clusters.
+    Each article's text is reduced to a MinHash signature of its word
+    shingles; the signature is split into bands and articles sharing any
+    band become candidates, so only a handful of comparisons are made per
+    article instead of one per indexed article. Candidates whose estimated
+    Jaccard similarity reaches the threshold join the same cluster, and the
+    first article of a cluster is its representative: its analysis results
+    are stored on the cluster and reused for the others.
+    """
+
+    def __init__(self, threshold=0.7, num_perm=128, bands=32, shingle_size=5, min_words=40,
+                 max_documents=5000, seed=1):
+        if num_perm % bands:
+            raise ValueError('num_perm must be a multiple of bands')
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.min_words = min_words
+        self.max_documents = max_documents
+        rng = random.Random(seed)
+        self._permutations = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+        self._signatures = OrderedDict()
+        self._clusters = {}
+        self._buckets = defaultdict(set)
+        self._lock = threading.Lock()
+        self.reused = 0
+
+    def signature(self, text):
+        """MinHash signature of the text's word shingles, or None if the text is too short"""
+        words = _WORD.findall((text or '').lower())
+        if len(words) < self.min_words:
+            return None
+        size = self.shingle_size
+        shingles = {zlib.crc32(' '.join(words[i:i + size]).encode('utf-8'))
+                    for i in range(len(words) - size + 1)}
+        return tuple(min((a * shingle + b) % _PRIME for shingle in shingles) & 0xffffffff
+                     for a, b in self._permutations)
+
+    def _bands(self, signature):
+        rows = self.rows
+        return [(band, hash(signature[band * rows:(band + 1) * rows])) for band in range(self.bands)]
+
+    def _similarity(self, first, second):
+        return sum(1 for x, y in zip(first, second) if x == y) / self.num_perm
+
+    def assign(self, key, text):
+        """
+        Put an article into a cluster and return the cluster.
+        Articles without enough text get a cluster of their own that is not indexed.
+        """
+        signature = self.signature(text)
+        with self._lock:
+            if key in self._signatures:
+                if self._signatures[key] == signature:
+                    self._signatures.move_to_end(key)
+                    return self._clusters[key]
+                self._remove(key)
+            if signature is None:
+                cluster = StoryCluster(key)
+                cluster.members.add(key)
+                return cluster
+
+            best, best_similarity = None, self.threshold
+            candidates = set()
+            for band in self._bands(signature):
+                candidates.update(self._buckets.get(band, ()))
+            for candidate in candidates:
+                similarity = self._similarity(signature, self._signatures[candidate])
+                if similarity >= best_similarity:
+                    best, best_similarity = candidate, similarity
+
+            cluster = self._clusters[best] if best else StoryCluster(key)
+            self._insert(key, signature, cluster)
+            while len(self._signatures) > self.max_documents:
+                self._remove(next(iter(self._signatures)))
+            return cluster
+
+    def shared_results(self, cluster, names):
+        """The cluster's stored results for names, or None if the representative has not stored them"""
+        if not all(name in cluster.results for name in names):
+            return None
+        self.reused += 1
+        return [cluster.results[name] for name in names]
+
+    def seed(self, articles, result_names=('bias_score', 'bias_types')):
+        """Re-register restored articles under their saved cluster ids"""
+        clusters = {}
+        with self._lock:
+            for article in articles:
+                key, cluster_id = article.get('id'), article.get('cluster_id')
+                if not key or not cluster_id or key in self._signatures:
+                    continue
+                signature = self.signature(article.get('full_text'))
+                if signature is None:
+                    continue
+                cluster = clusters.get(cluster_id)
+                if cluster is None:
+                    cluster = clusters[cluster_id] = StoryCluster(cluster_id)
+                for name in result_names:
+                    if name in article and name not in cluster.results:
+                        cluster.results[name] = article[name]
+                self._insert(key, signature, cluster)
+
+    def _insert(self, key, signature, cluster):
+        self._signatures[key] = signature
+        self._clusters[key] = cluster
+        cluster.members.add(key)
+        for band in self._bands(signature):
+            self._buckets[band].add(key)
+
+    def _remove(self, key):
+        signature = self._signatures.pop(key)
+        cluster = self._clusters.pop(key)
+        cluster.members.discard(key)
+        for band in self._bands(signature):
+            bucket = self._buckets[band]
+            bucket.discard(key)
+            if not bucket:
+                del self._buckets[band]
+
+    def stats(self):
+        with self._lock:
+            clusters = {id(cluster): cluster for cluster in self._clusters.values()}
+            return {
+                'documents': len(self._signatures),
+                'clusters': len(clusters),
+                'multi_article_clusters': sum(1 for cluster in clusters.values() if len(cluster.members) > 1),
+                'reused_results': self.reused,
+            }
@@ -0,0 +1,61 @@
+from werkzeug.datastructures import MultiDict
+
+from bias_store import MAX_CATEGORIES, BiasStore, TrendQuery
+
+NOW = 1790000000  # 2026-09-21
+
+
+def _article(ident, published_at, score=0.5):
+    return {'id': ident, 'publishedAt': published_at, 'source': 'The Hindu', 'category': 'India',
+            'bias_score': score, 'bias_types': ['Political']}
+
+
+def _today():
+    return NOW // 86400
+
+
+def test_bad_publication_dates_do_not_stretch_the_rollup(tmp_path):
+    store = BiasStore(str(tmp_path))
+    store.append([_article(f'a{i}', '2026-09-20') for i in range(40)], now=NOW)
+    store.append([_article('old', '1970-01-02'), _article('future', '9999-12-31'),
+                  _article('garbage', 'yesterday')], now=NOW)
+
+    days = store.column('day').tolist()
+    assert days[40:] == [_today()] * 3
+    assert store.rollup.days <= 3
+    assert store.rollup.nbytes < 1024 * 1024
+
+    total = store.trends(TrendQuery(MultiDict({'interval': 'total'})))
+    assert total[0]['points'][0]['count'] == 43
+
+
+def test_rollup_rebuilt_on_open_ignores_bad_dates(tmp_path):
+    store = BiasStore(str(tmp_path))
+    store.append([_article('a', '2026-09-20'), _article('b', '2026-09-21')], now=NOW)
+    # A row written before dates were checked
+    store._columns['day'][0] = 1
+    store._columns['day'].flush()
+
+    reopened = BiasStore(str(tmp_path))
+    assert reopened.rollup.days == 1
+    assert reopened.stats()['rows'] == 2
+
+
+def test_rollup_grows_with_occupied_cells_only(tmp_path):
+    store = BiasStore(str(tmp_path))
+    day = 86400
+    for d in range(300):
+        articles = [dict(_article(f'{d}-{c}', None), category=f'topic {d}-{c}') for c in range(10)]
+        store.append(articles, now=NOW - (300 - d) * day)
+
+    assert len(store.categories) == MAX_CATEGORIES + 1
+    assert store.rollup.size <= 3000
+    assert store.rollup.nbytes < 8 * 1024 * 1024
+
+    total = store.trends(TrendQuery(MultiDict({'interval': 'total'})))
+    assert total[0]['points'][0]['count'] == 3000
+    by_day = store.trends(TrendQuery(MultiDict({'interval': 'day'})))
+    assert len(by_day[0]['points']) == 300
+    by_category = store.trends(TrendQuery(MultiDict({'interval': 'total', 'group_by': 'category'})))
+    overflow = [series for series in by_category if series['group'] == '']
+    assert overflow[0]['points'][0]['count'] == 3000 - MAX_CATEGORIES
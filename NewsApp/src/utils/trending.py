@@ -0,0 +1,231 @@
+import math
+import threading
+import time
+import zlib
+from collections import Counter
+
+import numpy as np
+
+from article_index import QueryError, MAX_PAGE_SIZE
+
+# Decay half-life of each trending window, in seconds
+WINDOWS = {'1h': 3600, '6h': 6 * 3600, '24h': 24 * 3600}
+DEFAULT_WINDOW = '6h'
+_PRIME = (1 << 31) - 1
+# Forward-decay weights are rescaled before they get this large
+_MAX_EXPONENT = 50.0
+
+
+class CountMinSketch:
+    """
+    Approximate counts in a fixed depth x width table. Estimates never
+    undercount and overcount by at most about e / width of the total weight
+    with probability 1 - e ** -depth.
+    """
+
+    def __init__(self, width=4096, depth=4, seed=1):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.float64)
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=(depth, 1), dtype=np.int64)
+        self._b = rng.integers(0, _PRIME, size=(depth, 1), dtype=np.int64)
+
+    def _cells(self, keys):
+        hashes = np.fromiter((zlib.crc32(key.encode('utf-8')) for key in keys), dtype=np.int64, count=len(keys))
+        return (self._a * (hashes % _PRIME) + self._b) % _PRIME % self.width
+
+    def add(self, keys, weights):
+        cells = self._cells(keys)
+        for row in range(self.depth):
+            np.add.at(self.table[row], cells[row], weights)
+
+    def estimate(self, keys):
+        if not keys:
+            return np.zeros(0)
+        cells = self._cells(keys)
+        return self.table[np.arange(self.depth)[:, None], cells].min(axis=0)
+
+    def scale(self, factor):
+        self.table *= factor
+
+
+class HeavyHitters:
+    """
+    The capacity terms with the largest sketch estimates, plus the last
+    article seen for each. A term enters once its estimate beats the
+    smallest tracked one, which it then replaces.
+    """
+
+    def __init__(self, capacity=200):
+        self.capacity = capacity
+        self.counts = {}
+        self.examples = {}
+        self._floor = 0.0
+
+    def offer(self, key, count, example):
+        if key in self.counts:
+            # Counts only grow, so the floor can only become too low, which is safe
+            self.counts[key] = count
+            self.examples[key] = example
+            return
+        if len(self.counts) >= self.capacity:
+            if count <= self._floor:
+                return
+            smallest = min(self.counts, key=self.counts.get)
+            if self.counts[smallest] >= count:
+                self._floor = self.counts[smallest]
+                return
+            del self.counts[smallest]
+            del self.examples[smallest]
+        self.counts[key] = count
+        self.examples[key] = example
+        if len(self.counts) >= self.capacity:
+            self._floor = min(self.counts.values())
+
+    def scale(self, factor):
+        self.counts = {key: count * factor for key, count in self.counts.items()}
+        self._floor *= factor
+
+
+class DecayedWindow:
+    """
+    Exponentially decayed term counts with the given half-life, kept in a
+    count-min sketch. Forward decay: a term seen at time t is added with
+    weight 2 ** ((t - landmark) / half_life) and counts are divided by the
+    current weight when read, so nothing has to be decayed on update.
+    """
+
+    def __init__(self, half_life, width, depth, capacity, now):
+        self.half_life = half_life
+        self.rate = math.log(2) / half_life
+        self.landmark = now
+        self.sketch = CountMinSketch(width, depth)
+        self.top = HeavyHitters(capacity)
+
+    def weight(self, t):
+        return math.exp(self.rate * (t - self.landmark))
+
+    def add(self, counts, examples, t):
+        if self.rate * (t - self.landmark) > _MAX_EXPONENT:
+            factor = 1 / self.weight(t)
+            self.sketch.scale(factor)
+            self.top.scale(factor)
+            self.landmark = t
+        keys = list(counts)
+        weight = self.weight(t)
+        self.sketch.add(keys, np.array([counts[key] for key in keys], dtype=np.float64) * weight)
+        for key, estimate in zip(keys, self.sketch.estimate(keys).tolist()):
+            self.top.offer(key, estimate, examples[key])
+
+    def counts(self, keys, now):
+        """Decayed counts at time now"""
+        return self.sketch.estimate(keys) / self.weight(now)
+
+
+class TrendingTopics:
+    """
+    Streaming trending terms and bigrams over the articles of each refresh.
+    Each new article contributes its distinct title and description terms
+    once, so counts are (decayed) numbers of articles. Update cost is
+    proportional to the new terms and memory is fixed by the sketch size
+    and the heavy-hitter capacity, however many articles go through.
+    """
+
+    def __init__(self, terms=None, windows=None, width=4096, depth=4, capacity=200, now=None):
+        if terms is None:
+            from search_index import Analyzer
+            terms = Analyzer().terms
+        # text -> stemmed, stopword-free terms in order, the same as search terms
+        self.terms = terms
+        now = now or time.time()
+        self.windows = {name: DecayedWindow(half_life, width, depth, capacity, now)
+                        for name, half_life in (windows or WINDOWS).items()}
+        self.baseline = max(self.windows, key=lambda name: self.windows[name].half_life)
+        self.articles = 0
+        self.updated_at = None
+        self._lock = threading.Lock()
+
+    def article_terms(self, article):
+        terms = []
+        for field in ('title', 'description'):
+            words = self.terms(article.get(field) or '')
+            terms.extend(words)
+            terms.extend(f'{first} {second}' for first, second in zip(words, words[1:]))
+        return set(terms)
+
+    def update(self, articles, now=None):
+        """Count the terms of new articles"""
+        now = now or time.time()
+        counts = Counter()
+        examples = {}
+        for article in articles:
+            example = {'id': article.get('id'), 'title': article.get('title'), 'url': article.get('url')}
+            for term in self.article_terms(article):
+                counts[term] += 1
+                examples[term] = example
+            self.articles += 1
+        with self._lock:
+            if counts:
+                for window in self.windows.values():
+                    window.add(counts, examples, now)
+            self.updated_at = now
+        return len(counts)
+
+    def top(self, params, now=None):
+        """Trending terms of a window for a TrendingQuery"""
+        now = now or time.time()
+        with self._lock:
+            window = self.windows[params.window]
+            baseline = self.windows[self.baseline]
+            keys = [key for key in window.top.counts if params.kind == 'all'
+                    or (' ' in key) == (params.kind == 'bigram')]
+            counts = window.counts(keys, now)
+            # Rate in this window relative to the long-run rate; above 1 means rising
+            rates = counts * window.rate
+            baseline_rates = baseline.counts(keys, now) * baseline.rate
+            examples = [window.top.examples[key] for key in keys]
+
+        burst = rates / np.maximum(baseline_rates, 1e-12)
+        keep = counts >= params.min_count
+        order = np.argsort(-(burst if params.sort == 'burst' else counts)[keep], kind='stable')
+        selected = np.flatnonzero(keep)[order[:params.limit]]
+        return [{
+            'term': keys[i],
+            'kind': 'bigram' if ' ' in keys[i] else 'term',
+            'count': round(float(counts[i]), 2),
+            'burst': round(float(burst[i]), 2),
+            'example': examples[i],
+        } for i in selected.tolist()]
+
+    def stats(self):
+        return {
+            'articles': self.articles,
+            'updated_at': self.updated_at,
+            'tracked_terms': {name: len(window.top.counts) for name, window in self.windows.items()},
+        }
+
+
+class TrendingQuery:
+    """Validated /api/trending query parameters"""
+
+    KINDS = ('all', 'term', 'bigram')
+    SORTS = ('count', 'burst')
+
+    def __init__(self, args, windows=WINDOWS):
+        self.window = args.get('window') or DEFAULT_WINDOW
+        if self.window not in windows:
+            raise QueryError(f"'window' must be one of {', '.join(windows)}")
+        self.kind = args.get('kind') or 'all'
+        if self.kind not in self.KINDS:
+            raise QueryError(f"'kind' must be one of {', '.join(self.KINDS)}")
+        self.sort = args.get('sort') or 'count'
+        if self.sort not in self.SORTS:
+            raise QueryError(f"'sort' must be one of {', '.join(self.SORTS)}")
+        try:
+            self.limit = int(args.get('limit') or 20)
+            self.min_count = float(args.get('min_count') or 2)
+        except ValueError:
+            raise QueryError("'limit' and 'min_count' must be numbers")
+        if not 1 <= self.limit <= MAX_PAGE_SIZE:
+            raise QueryError(f"'limit' must be between 1 and {MAX_PAGE_SIZE}")
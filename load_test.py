@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""
+Load test and latency benchmark for the Python services.
+
+Starts the bias detection API (python_api/main.py), the summarization API
+(python_api/summarization.py) and the news API (NewsApp/src/utils/api_server.py)
+on side ports, with the news scrapers reading a generated replay archive
+instead of the live sites. Then sends a weighted mix of /analyze,
+/extractive_summary, /batch_summarize and /api/news requests at each
+concurrency level and reports latency percentiles, throughput and the CPU
+and memory use of every service.
+
+Usage:
+    python load_test.py --concurrency 1 4 16 --duration 20 --save-baseline load_baseline.json
+    python load_test.py --concurrency 1 4 16 --duration 20 --baseline load_baseline.json
+
+With --baseline, results are compared with a saved run and the exit code
+is 1 if any endpoint got slower or lost throughput beyond --tolerance.
+"""
+import argparse
+import base64
+import gzip
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+from start_services import BASE_DIR, OutputMultiplexer, ServiceManager, ServiceSpec, check_health
+
+NEWS_APP_DIR = BASE_DIR / "NewsApp" / "src" / "utils"
+DEFAULT_MIX = "analyze=4,extractive_summary=3,batch_summarize=1,news=4"
+# Sites the news API scrapes, served from the replay archive
+SITES = {
+    "Indian Express": "https://indianexpress.com/",
+    "The Hindu": "https://www.thehindu.com/",
+}
+
+
+# Article texts
+
+_SUBJECTS = ["The Chief Minister", "Opposition leaders", "The Reserve Bank", "Farmers' unions", "The Supreme Court",
+             "Union Home Minister", "Local residents", "The election commission", "Senior police officials",
+             "Industry groups", "The state government", "A spokesperson for the ministry", "Health experts",
+             "Women's rights activists", "Students", "The businessman", "The actress", "Economists"]
+_VERBS = ["announced", "criticised", "defended", "questioned", "welcomed", "rejected", "called for", "warned about",
+          "demanded", "promised", "slammed", "praised", "reviewed", "opposed", "backed"]
+_OBJECTS = ["the new policy on crop insurance", "the proposed amendment to the land bill", "rising fuel prices",
+            "the delay in monsoon relief", "the bridge collapse in the district", "the interest rate decision",
+            "the controversial remarks made at the rally", "the investigation into the scam",
+            "the plan to privatise the state utility", "the verdict in the long-running case",
+            "the crackdown on illegal mining", "the budget allocation for schools", "the water sharing dispute"]
+_DETAILS = ["on Monday", "after a two-hour meeting", "in a statement", "during a press conference in the capital",
+            "amid growing protests", "despite repeated warnings", "ahead of the assembly polls",
+            "citing official data", "in a strongly worded letter", "without giving details"]
+_COMMENTS = ["Everyone knows this is a disaster for ordinary families.",
+             "Obviously the decision was taken without consulting anyone.",
+             "The move was described as a shocking betrayal by critics.",
+             "Officials said the numbers were encouraging and the outlook was stable.",
+             "She is too emotional to lead the department, one member claimed.",
+             "He was praised as a strong and decisive leader by supporters.",
+             "Analysts said it was clearly the right step, though the data was mixed.",
+             "The devastating impact on small traders cannot be ignored.",
+             "Residents said the situation had improved slightly over the past week.",
+             "The report found no evidence of wrongdoing by the contractors."]
+
+
+def synthetic_articles(count, seed=0):
+    """News-like articles of 200 to 900 words, with some loaded and biased phrasing"""
+    rng = random.Random(seed)
+    categories = ["India", "World", "Business", "Politics", "Sports", "Technology", "Cities"]
+    articles = []
+    for number in range(count):
+        paragraphs = []
+        for _ in range(rng.randint(4, 12)):
+            sentences = []
+            for _ in range(rng.randint(2, 5)):
+                if rng.random() < 0.25:
+                    sentences.append(rng.choice(_COMMENTS))
+                else:
+                    sentences.append(f"{rng.choice(_SUBJECTS)} {rng.choice(_VERBS)} {rng.choice(_OBJECTS)} "
+                                     f"{rng.choice(_DETAILS)}.")
+            paragraphs.append(" ".join(sentences))
+        title = f"{rng.choice(_SUBJECTS)} {rng.choice(_VERBS)} {rng.choice(_OBJECTS)}"
+        articles.append({
+            "id": f"article-{number}",
+            "title": title[0].upper() + title[1:],
+            "description": paragraphs[0],
+            "text": "\n\n".join(paragraphs),
+            "category": rng.choice(categories),
+        })
+    return articles
+
+
+def load_corpus(path, limit):
+    """Articles from a JSONL file (optionally .gz) or a saved news snapshot"""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        if ".json" in path and ".jsonl" not in path:
+            records = json.load(f).get("articles", [])
+        else:
+            records = (json.loads(line) for line in f if line.strip())
+        articles = []
+        for record in records:
+            text = next((record[field] for field in ("full_text", "text", "content", "description")
+                         if record.get(field)), None)
+            if text:
+                articles.append({"id": record.get("id") or str(len(articles)), "title": record.get("title") or "",
+                                 "description": record.get("description") or text[:300], "text": text,
+                                 "category": record.get("category") or "General"})
+            if len(articles) >= limit:
+                break
+    return articles
+
+
+def build_archive(path, articles, per_site=30):
+    """Replay archive with a homepage and article pages for each scraped site"""
+    sys.path.insert(0, str(NEWS_APP_DIR))
+    from http_archive import save_archive
+    from html import escape
+
+    def record(url, html):
+        return {"url": url, "method": "GET", "status": 200,
+                "headers": {"Content-Type": "text/html; charset=utf-8"},
+                "body": base64.b64encode(html.encode("utf-8")).decode("ascii")}
+
+    records = []
+    published = time.strftime("%Y-%m-%dT%H:%M:%S+05:30")
+    for site_number, base_url in enumerate(SITES.values()):
+        links = []
+        for offset, article in enumerate(articles[site_number * per_site:(site_number + 1) * per_site]):
+            url = f"{base_url}article/{article['category'].lower()}/story-{site_number}-{offset}/"
+            links.append(f'<div class="story-card"><h3 class="title"><a href="{url}">{escape(article["title"])}</a>'
+                         f'</h3><p class="intro">{escape(article["description"][:200])}</p></div>')
+            body = "".join(f"<p>{escape(paragraph)}</p>" for paragraph in article["text"].split("\n\n"))
+            records.append(record(url, (
+                f'<html><head><title>{escape(article["title"])}</title>'
+                f'<meta name="description" content="{escape(article["description"][:200])}">'
+                f'<meta property="article:published_time" content="{published}"></head>'
+                f'<body><h1>{escape(article["title"])}</h1><span class="author">Staff Reporter</span>'
+                f'<div class="full-details article story-content">{body}</div></body></html>')))
+        records.append(record(base_url, f'<html><body>{"".join(links)}</body></html>'))
+    save_archive(path, records)
+
+
+# Traffic
+
+class Traffic:
+    """Builds the request for each endpoint of the mix"""
+
+    def __init__(self, urls, articles, batch_size=5):
+        self.urls = urls
+        self.articles = articles
+        self.batch_size = batch_size
+        self.categories = sorted({article["category"] for article in articles})
+
+    def request(self, endpoint, rng):
+        article = rng.choice(self.articles)
+        if endpoint == "analyze":
+            return "POST", f"{self.urls['bias']}/analyze", {"text": article["text"][:10000]}
+        if endpoint == "extractive_summary":
+            return "POST", f"{self.urls['summarization']}/extractive_summary", {"text": article["text"],
+                                                                                  "num_sentences": 3}
+        if endpoint == "batch_summarize":
+            batch = [{"title": a["title"], "description": a["text"][:1500]}
+                     for a in rng.sample(self.articles, min(self.batch_size, len(self.articles)))]
+            return "POST", f"{self.urls['summarization']}/batch_summarize", {"articles": batch, "num_sentences": 2}
+        if endpoint == "news":
+            params = "limit=20&fields=id,title,description,url,source,category,bias_score,bias_types"
+            if rng.random() < 0.5:
+                params += f"&category={rng.choice(self.categories)}"
+            return "GET", f"{self.urls['news']}/api/news?{params}", None
+        raise ValueError(f"Unknown endpoint {endpoint}")
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - {"analyze", "extractive_summary", "batch_summarize", "news"}
+    if unknown:
+        raise SystemExit(f"Unknown endpoints in --mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(q / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def run_level(traffic, mix, concurrency, duration, warmup, seed, timeout):
+    """Closed-loop load: concurrency workers sending requests back to back for duration seconds"""
+    endpoints, weights = zip(*mix.items())
+    samples = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    lock = threading.Lock()
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+
+    def worker(number):
+        rng = random.Random(seed * 1000 + number)
+        session = requests.Session()
+        while time.perf_counter() < stop_at:
+            endpoint = rng.choices(endpoints, weights)[0]
+            method, url, body = traffic.request(endpoint, rng)
+            sent = time.perf_counter()
+            try:
+                status = session.request(method, url, json=body, timeout=timeout).status_code
+            except requests.RequestException:
+                status = "error"
+            done = time.perf_counter()
+            if sent >= measure_from and done <= stop_at:
+                with lock:
+                    statuses[endpoint][status] += 1
+                    if status == 200:
+                        samples[endpoint].append((done - sent) * 1000)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(concurrency)))
+
+    results = {}
+    for endpoint in endpoints:
+        latencies = sorted(samples[endpoint])
+        counts = statuses[endpoint]
+        total = sum(counts.values())
+        results[endpoint] = {
+            "requests": total,
+            "ok": len(latencies),
+            "shed": counts.get(429, 0) + counts.get(503, 0),
+            "errors": total - len(latencies) - counts.get(429, 0) - counts.get(503, 0),
+            "throughput_rps": round(len(latencies) / duration, 2),
+            **{f"p{q}_ms": round(percentile(latencies, q), 2) if latencies else None for q in (50, 95, 99)},
+        }
+    return results
+
+
+# Resource use
+
+class ProcessSampler:
+    """CPU time and resident memory of the service processes (psutil, or /proc on Linux)"""
+
+    def __init__(self, processes, interval=0.5):
+        self.processes = processes
+        self.interval = interval
+        self.peak_rss = {}
+        self._running = False
+        try:
+            import psutil
+            self._psutil = psutil
+        except ImportError:
+            self._psutil = None
+
+    def _read(self, pid):
+        """(cpu seconds, rss bytes), or None if unavailable"""
+        try:
+            if self._psutil:
+                process = self._psutil.Process(pid)
+                times = process.cpu_times()
+                return times.user + times.system, process.memory_info().rss
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            ticks = os.sysconf("SC_CLK_TCK")
+            cpu = (int(fields[11]) + int(fields[12])) / ticks
+            return cpu, int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+        except Exception:
+            # Process gone, or no psutil and no /proc
+            return None
+
+    def start(self):
+        self.peak_rss = {}
+        self._start = {name: self._read(pid) for name, pid in self.processes.items()}
+        self._started_at = time.perf_counter()
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while self._running:
+            for name, pid in self.processes.items():
+                reading = self._read(pid)
+                if reading:
+                    self.peak_rss[name] = max(self.peak_rss.get(name, 0), reading[1])
+            time.sleep(self.interval)
+
+    def stop(self):
+        self._running = False
+        self._thread.join()
+        wall = time.perf_counter() - self._started_at
+        usage = {}
+        for name, pid in self.processes.items():
+            start, end = self._start.get(name), self._read(pid)
+            if not start or not end:
+                usage[name] = None
+                continue
+            usage[name] = {
+                "cpu_percent": round(100 * (end[0] - start[0]) / wall, 1),
+                "rss_mb": round(end[1] / 2 ** 20, 1),
+                "peak_rss_mb": round(max(self.peak_rss.get(name, 0), end[1]) / 2 ** 20, 1),
+            }
+        return usage
+
+
+# Baseline comparison
+
+def compare(results, baseline, tolerance, noise_ms=5.0):
+    """Regressions of results against baseline, as printable strings"""
+    regressions = []
+    for level, endpoints in results["levels"].items():
+        for endpoint, now in endpoints["endpoints"].items():
+            before = baseline.get("levels", {}).get(level, {}).get("endpoints", {}).get(endpoint)
+            if not before:
+                continue
+            for key in ("p50_ms", "p95_ms", "p99_ms"):
+                if now[key] is None or before[key] is None:
+                    continue
+                if now[key] > before[key] * (1 + tolerance) and now[key] - before[key] > noise_ms:
+                    regressions.append(f"c={level} {endpoint} {key}: {before[key]} -> {now[key]}")
+            if now["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+                regressions.append(f"c={level} {endpoint} throughput_rps: "
+                                   f"{before['throughput_rps']} -> {now['throughput_rps']}")
+            failed_before = (before["errors"] + before["shed"]) / max(before["requests"], 1)
+            failed_now = (now["errors"] + now["shed"]) / max(now["requests"], 1)
+            if failed_now > failed_before + 0.01:
+                regressions.append(f"c={level} {endpoint} failed share: {failed_before:.1%} -> {failed_now:.1%}")
+    return regressions
+
+
+def print_level(concurrency, level):
+    print(f"\nConcurrency {concurrency}")
+    print(f"  {'endpoint':<20} {'requests':>8} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'shed':>6} {'errors':>6}")
+    for endpoint, row in level["endpoints"].items():
+        print(f"  {endpoint:<20} {row['requests']:>8} {row['throughput_rps']:>8} {str(row['p50_ms']):>8} "
+              f"{str(row['p95_ms']):>8} {str(row['p99_ms']):>8} {row['shed']:>6} {row['errors']:>6}")
+    for name, usage in level.get("services", {}).items():
+        if usage:
+            print(f"  {name:<20} cpu {usage['cpu_percent']:>6}%  rss {usage['rss_mb']:>7} MB  "
+                  f"peak {usage['peak_rss_mb']:>7} MB")
+
+
+# Services
+
+class LogFileOutput(OutputMultiplexer):
+    """Child output goes to a log file so it does not mix with the report"""
+
+    def __init__(self, path):
+        super().__init__()
+        self._file = open(path, "a", encoding="utf-8")
+        self._file_lock = threading.Lock()
+
+    def emit(self, prefix, line):
+        with self._file_lock:
+            self._file.write(f"[{prefix}] {line}\n")
+            self._file.flush()
+
+
+def service_specs(args, workdir, archive):
+    python = sys.executable
+    common = {"FLASK_DEBUG": "0"}
+    return [
+        ServiceSpec("bias", [python, "main.py"], BASE_DIR / "python_api",
+                    f"http://127.0.0.1:{args.bias_port}/health",
+                    env={**common, "BIAS_API_PORT": str(args.bias_port)}, ready_timeout=120),
+        ServiceSpec("summarization", [python, "summarization.py"], BASE_DIR / "python_api",
+                    f"http://127.0.0.1:{args.summarization_port}/health",
+                    env={**common, "SUMMARIZATION_API_PORT": str(args.summarization_port)}, ready_timeout=300),
+        ServiceSpec("news", [python, "api_server.py"], NEWS_APP_DIR,
+                    f"http://127.0.0.1:{args.news_port}/api/health",
+                    env={**common, "NEWS_API_PORT": str(args.news_port), "NEWS_REPLAY_ARCHIVE": str(archive),
+                         "NEWS_SNAPSHOT_PATH": str(workdir / "news_snapshot.json.gz"),
+                         "NEWS_BIAS_STORE_PATH": str(workdir / "bias_store"),
+                         "NEWS_INGEST_ANALYSIS": "1" if args.ingest_analysis else "0"},
+                    ready_timeout=300),
+    ]
+
+
+def start_services(specs, log_path):
+    manager = ServiceManager(specs, max_restarts=0, output=LogFileOutput(log_path))
+    for service in manager.services:
+        manager.start_service(service)
+    while any(service.state == "starting" for service in manager.services):
+        time.sleep(0.5)
+        for service in manager.services:
+            if service.state == "starting" and service.process.poll() is not None:
+                service.state = "failed"
+    failed = [service.spec.name for service in manager.services if service.state != "ready"]
+    if failed:
+        manager.stop_all_services()
+        raise SystemExit(f"Services did not start: {', '.join(failed)} (see {log_path})")
+    return manager
+
+
+def wait_for_articles(news_url, timeout=120):
+    """The news API serves nothing until its first refresh from the archive is merged"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{news_url}/api/health", timeout=2).json().get("articles_cached"):
+                return True
+        except (requests.RequestException, ValueError):
+            pass
+        time.sleep(1)
+    return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test and latency benchmark for the Python services")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="levels to run")
+    parser.add_argument("--duration", type=float, default=20, help="measured seconds per level")
+    parser.add_argument("--warmup", type=float, default=3, help="unmeasured seconds before each level")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="endpoint weights, e.g. analyze=1,news=2")
+    parser.add_argument("--corpus", help="JSONL (.gz) articles or a news snapshot; default: generated text")
+    parser.add_argument("--articles", type=int, default=200, help="articles to generate or load")
+    parser.add_argument("--timeout", type=float, default=60, help="client timeout per request")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bias-port", type=int, default=18000)
+    parser.add_argument("--summarization-port", type=int, default=15000)
+    parser.add_argument("--news-port", type=int, default=15001)
+    parser.add_argument("--ingest-analysis", action="store_true",
+                        help="let the news API summarize and analyse articles at ingest")
+    parser.add_argument("--no-start", action="store_true",
+                        help="use services that are already running on the given ports")
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="compare with a JSON file saved by --save-baseline")
+    parser.add_argument("--save-baseline", help="save results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown (default 20%%)")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    articles = load_corpus(args.corpus, args.articles) if args.corpus else synthetic_articles(args.articles, args.seed)
+    urls = {
+        "bias": f"http://127.0.0.1:{args.bias_port}",
+        "summarization": f"http://127.0.0.1:{args.summarization_port}",
+        "news": f"http://127.0.0.1:{args.news_port}",
+    }
+
+    workdir = Path(tempfile.mkdtemp(prefix="load_test_"))
+    manager = None
+    processes = {}
+    if not args.no_start:
+        archive = workdir / "replay.jsonl.gz"
+        build_archive(archive, articles)
+        print(f"Starting services (logs in {workdir / 'services.log'})...")
+        manager = start_services(service_specs(args, workdir, archive), workdir / "services.log")
+        processes = {service.spec.name: service.process.pid for service in manager.services}
+    elif not all(check_health(url) for url in (f"{urls['bias']}/health", f"{urls['summarization']}/health",
+                                               f"{urls['news']}/api/health")):
+        raise SystemExit("Services are not running on the given ports")
+
+    try:
+        if "news" in mix and not wait_for_articles(urls["news"]):
+            raise SystemExit("The news API has no articles; check the replay archive")
+        traffic = Traffic(urls, articles)
+        results = {"mix": mix, "duration": args.duration, "articles": len(articles),
+                   "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "levels": {}}
+        for concurrency in args.concurrency:
+            sampler = ProcessSampler(processes)
+            sampler.start()
+            endpoints = run_level(traffic, mix, concurrency, args.duration, args.warmup, args.seed, args.timeout)
+            level = {"endpoints": endpoints, "services": sampler.stop()}
+            results["levels"][str(concurrency)] = level
+            print_level(concurrency, level)
+    finally:
+        if manager:
+            manager.stop_all_services()
+    # Kept when something fails, for the service logs
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(results, indent=2))
+        print(f"\nBaseline saved to {args.save_baseline}")
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        if regressions:
+            print(f"\nRegressions against {args.baseline}:")
+            for regression in regressions:
+                print(f"  • {regression}")
+            return 1
+        print(f"\nNo regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
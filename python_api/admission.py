@@ -0,0 +1,348 @@
+"""
+Admission control for the analysis APIs.
+
+Each controlled endpoint gets a fixed number of concurrent slots and a
+bounded FIFO queue. Requests that would overflow the queue are rejected
+with 429, and requests whose deadline has passed or cannot be met given
+the current queue are rejected with 503, both with a Retry-After estimated
+from recent service times. Clients pass their deadline in the X-Deadline
+header, either as an absolute Unix time in seconds or relative ("500ms",
+"2s"); it is kept in a context variable so later stages of the same request
+in this process can check it too. It is not forwarded anywhere, since no
+service calls another over HTTP.
+"""
+import asyncio
+import contextvars
+import json
+import math
+import threading
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager, contextmanager
+
+from tracing import span
+
+DEADLINE_HEADER = 'X-Deadline'
+
+_deadline = contextvars.ContextVar('deadline', default=None)
+
+
+class Overloaded(Exception):
+    """A request shed by admission control or stopped by its deadline"""
+
+    def __init__(self, reason, status_code=503, retry_after=1, endpoint=None):
+        super().__init__(f"Request rejected ({reason})" + (f" by {endpoint}" if endpoint else ""))
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    def headers(self):
+        return {'Retry-After': str(self.retry_after)}
+
+
+class DeadlineExceeded(Overloaded):
+    def __init__(self, retry_after=1, endpoint=None):
+        super().__init__('deadline', 503, retry_after, endpoint)
+
+
+def parse_deadline(value, now=None):
+    """Absolute deadline (Unix seconds) from an X-Deadline header value, or None"""
+    if not value:
+        return None
+    value = value.strip().lower()
+    now = now or time.time()
+    try:
+        if value.endswith('ms'):
+            return now + float(value[:-2]) / 1000
+        if value.endswith('s'):
+            return now + float(value[:-1])
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{DEADLINE_HEADER} must be a Unix time in seconds or a duration like '500ms' or '2s'")
+
+
+def current_deadline():
+    return _deadline.get()
+
+
+def time_left(default=None):
+    """Seconds until the current request's deadline (at least 0), or default when there is none"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return default
+    left = max(deadline - time.time(), 0.0)
+    return left if default is None else min(left, default)
+
+
+def check_deadline(deadline=None):
+    """Raise DeadlineExceeded if the given (or current) deadline has passed"""
+    deadline = _deadline.get() if deadline is None else deadline
+    if deadline is not None and time.time() >= deadline:
+        raise DeadlineExceeded()
+
+
+class _Waiter:
+    __slots__ = ('wake', 'granted')
+
+    def __init__(self, wake):
+        self.wake = wake
+        self.granted = False
+
+
+class AdmissionController:
+    """
+    Concurrency limit plus bounded FIFO wait queue for one endpoint, usable
+    from threads (acquire) and from asyncio (acquire_async). A finishing
+    request hands its slot straight to the oldest waiter.
+    """
+
+    def __init__(self, name, max_concurrent=4, max_queue=16, max_wait=10.0):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        # Longest a request without a deadline waits for a slot
+        self.max_wait = max_wait
+        self.running = 0
+        self.admitted = 0
+        self.completed = 0
+        self.peak_queued = 0
+        self.shed = Counter()
+        # Exponentially weighted mean service time, seconds
+        self.service_time = 1.0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def queued(self):
+        return len(self._waiters)
+
+    def expected_wait(self):
+        return self.queued * self.service_time / self.max_concurrent
+
+    def retry_after(self):
+        return max(1, math.ceil((self.queued + 1) * self.service_time / self.max_concurrent))
+
+    def _shed(self, reason):
+        self.shed[reason] += 1
+        status_code = 429 if reason == 'queue_full' else 503
+        return Overloaded(reason, status_code, self.retry_after(), self.name)
+
+    def _enter(self, deadline, wake):
+        """Take a free slot (returns None) or join the queue (returns the waiter); called with the lock held"""
+        now = time.time()
+        if deadline is not None and now >= deadline:
+            raise self._shed('deadline')
+        if self.running < self.max_concurrent and not self._waiters:
+            self.running += 1
+            self.admitted += 1
+            return None
+        if len(self._waiters) >= self.max_queue:
+            raise self._shed('queue_full')
+        if deadline is not None and now + self.expected_wait() > deadline:
+            raise self._shed('deadline')
+        waiter = _Waiter(wake)
+        self._waiters.append(waiter)
+        self.peak_queued = max(self.peak_queued, len(self._waiters))
+        return waiter
+
+    def _wait_timeout(self, deadline):
+        timeout = self.max_wait
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.time())
+        return max(timeout, 0.0)
+
+    def _abandon(self, waiter, reason):
+        """Leave the queue after a timeout; returns False if a slot was granted meanwhile"""
+        with self._lock:
+            if waiter.granted:
+                return False
+            self._waiters.remove(waiter)
+            raise self._shed(reason)
+
+    def _started(self, deadline):
+        # The deadline may have passed while waiting for the slot
+        if deadline is not None and time.time() >= deadline:
+            self.release()
+            with self._lock:
+                raise self._shed('deadline')
+
+    def acquire(self, deadline=None):
+        event = threading.Event()
+        with self._lock:
+            waiter = self._enter(deadline, event.set)
+        if waiter is None:
+            return
+        if not event.wait(self._wait_timeout(deadline)):
+            self._abandon(waiter, 'deadline' if deadline is not None and time.time() >= deadline else 'timeout')
+        self._started(deadline)
+
+    async def acquire_async(self, deadline=None):
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+
+        with self._lock:
+            waiter = self._enter(deadline, wake)
+        if waiter is None:
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(granted), self._wait_timeout(deadline))
+        except asyncio.TimeoutError:
+            self._abandon(waiter, 'deadline' if deadline is not None and time.time() >= deadline else 'timeout')
+        except asyncio.CancelledError:
+            # Client went away while queued
+            try:
+                self._abandon(waiter, 'cancelled')
+            except Overloaded:
+                pass
+            else:
+                self.release()
+            raise
+        self._started(deadline)
+
+    def release(self, service_time=None):
+        with self._lock:
+            if service_time is not None:
+                self.completed += 1
+                self.service_time += 0.2 * (service_time - self.service_time)
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                self.admitted += 1
+                waiter.wake()
+            else:
+                self.running -= 1
+
+    @contextmanager
+    def slot(self, deadline=None):
+        self.acquire(deadline)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - start)
+
+    @asynccontextmanager
+    async def slot_async(self, deadline=None):
+        await self.acquire_async(deadline)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - start)
+
+    def stats(self):
+        return {
+            'running': self.running,
+            'queued': self.queued,
+            'peak_queued': self.peak_queued,
+            'max_concurrent': self.max_concurrent,
+            'max_queue': self.max_queue,
+            'admitted': self.admitted,
+            'completed': self.completed,
+            'shed': dict(self.shed),
+            'mean_service_ms': round(self.service_time * 1000, 1),
+        }
+
+
+def admission_stats(controllers):
+    return {path: controller.stats() for path, controller in controllers.items()}
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware: admits requests to controlled paths before their body is
+    read, and sets the X-Deadline deadline for every request.
+    """
+
+    def __init__(self, app, controllers):
+        self.app = app
+        self.controllers = controllers
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        header = next((value.decode('latin-1') for name, value in scope['headers']
+                       if name == DEADLINE_HEADER.lower().encode()), None)
+        try:
+            deadline = parse_deadline(header)
+        except ValueError as e:
+            await self._respond(send, 400, str(e))
+            return
+
+        controller = self.controllers.get(scope['path'])
+        token = _deadline.set(deadline)
+        try:
+            if controller is None:
+                await self.app(scope, receive, send)
+                return
+            try:
+                with span('admission.wait', endpoint=controller.name, queued=controller.queued):
+                    await controller.acquire_async(deadline)
+            except Overloaded as e:
+                await self._respond(send, e.status_code, str(e), e.headers())
+                return
+            start = time.perf_counter()
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                controller.release(time.perf_counter() - start)
+        finally:
+            _deadline.reset(token)
+
+    async def _respond(self, send, status_code, detail, headers=None):
+        body = json.dumps({'detail': detail}).encode()
+        raw_headers = [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+        raw_headers += [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+        await send({'type': 'http.response.start', 'status': status_code, 'headers': raw_headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+
+def install_fastapi(app, controllers):
+    """Admission control for a FastAPI app; controllers maps paths to AdmissionControllers"""
+    from fastapi.responses import JSONResponse
+
+    async def overloaded_handler(request, exc):
+        return JSONResponse({'detail': str(exc)}, status_code=exc.status_code, headers=exc.headers())
+
+    app.add_middleware(AdmissionMiddleware, controllers=controllers)
+    app.add_exception_handler(Overloaded, overloaded_handler)
+
+
+def install_flask(app, controllers):
+    """Admission control for a (threaded) Flask app; controllers maps paths to AdmissionControllers"""
+    from flask import g, jsonify, request
+
+    def rejected(exc):
+        response = jsonify({'error': str(exc)})
+        response.status_code = exc.status_code
+        response.headers.update(exc.headers())
+        return response
+
+    @app.before_request
+    def admit():
+        try:
+            deadline = parse_deadline(request.headers.get(DEADLINE_HEADER))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        g.deadline_token = _deadline.set(deadline)
+        controller = controllers.get(request.path)
+        if controller is not None:
+            with span('admission.wait', endpoint=controller.name, queued=controller.queued):
+                controller.acquire(deadline)
+            g.admission = (controller, time.perf_counter())
+
+    @app.teardown_request
+    def leave(exc=None):
+        admission = g.pop('admission', None)
+        if admission:
+            controller, start = admission
+            controller.release(time.perf_counter() - start)
+        token = g.pop('deadline_token', None)
+        if token is not None:
+            _deadline.reset(token)
+
+    app.register_error_handler(Overloaded, rejected)
@@ -0,0 +1,321 @@
+"""
+Composite analysis service: summarization and bias detection in one ASGI app.
+The summarizers and the bias detector run in-process, so a complete article
+analysis is a single request that tokenizes the text once. The endpoints of
+the Flask summarization API and of the FastAPI bias API are served here as
+thin wrappers around the same engines.
+"""
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from nltk.tokenize import sent_tokenize
+from pydantic import BaseModel, Field
+import uvicorn
+
+from summarizer import NewsScraperSummarizer, TransformerSummarizer, word_tokens
+from bias_analysis import overall_bias_score, token_cache
+from admission import AdmissionController, Overloaded, admission_stats, check_deadline, install_fastapi
+import sampling_profiler
+import tracing
+import bias_api
+from bias_api import BiasAnalysisResponse, TextAnalysisRequest, detector
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class TransformerEngine:
+    """Loads BART on first use (or in the background at startup) instead of at import"""
+
+    def __init__(self):
+        self._summarizer = None
+        self._lock = threading.Lock()
+        self.state = "not loaded"
+
+    def get(self):
+        with self._lock:
+            if self._summarizer is None:
+                self.state = "loading"
+                self._summarizer = TransformerSummarizer()
+                self.state = "loaded" if self._summarizer.summarizer else "unavailable"
+            return self._summarizer
+
+    def summarize(self, text, max_length=130, min_length=30):
+        return self.get().summarize(text, max_length, min_length)
+
+
+basic_summarizer = NewsScraperSummarizer()
+transformer = TransformerEngine()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    if os.environ.get('ANALYSIS_PRELOAD_TRANSFORMER', '1') != '0':
+        threading.Thread(target=transformer.get, daemon=True).start()
+    yield
+
+
+app = FastAPI(
+    title="News Analysis Service",
+    description="Summarization and bias detection for news articles in one service",
+    version="1.0.0",
+    lifespan=lifespan
+)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# Same limits as the separate services; the transformer runs one summary at a time
+admission = {
+    "/complete-analysis": AdmissionController("/complete-analysis", max_concurrent=4, max_queue=32),
+    "/analyze": AdmissionController("/analyze", max_concurrent=4, max_queue=32),
+    "/extractive_summary": AdmissionController("/extractive_summary", max_concurrent=4, max_queue=32),
+    "/transformer_summary": AdmissionController("/transformer_summary", max_concurrent=1, max_queue=4, max_wait=30),
+    "/scrape_article": AdmissionController("/scrape_article", max_concurrent=8, max_queue=32),
+    "/article_stats": AdmissionController("/article_stats", max_concurrent=4, max_queue=32),
+    "/batch_summarize": AdmissionController("/batch_summarize", max_concurrent=2, max_queue=8),
+}
+install_fastapi(app, admission)
+# Added after admission control so that queueing shows up in the trace
+tracing.install_fastapi(app)
+# GET /debug/profile, off unless PROFILE_TOKEN is set
+sampling_profiler.install_fastapi(app)
+
+
+class CompleteAnalysisRequest(BaseModel):
+    url: Optional[str] = None
+    text: Optional[str] = Field(default=None, max_length=100000)
+    num_sentences: int = Field(default=3, ge=1, le=20)
+    analysis_types: List[str] = Field(default=["all"])
+    transformer_summary: bool = False
+    max_length: int = Field(default=130, ge=10, le=512)
+    min_length: int = Field(default=30, ge=5, le=256)
+
+
+def analyze_article(text: str, request: CompleteAnalysisRequest) -> dict:
+    """Summary, statistics and bias results from a single tokenization of the text"""
+    timings = {}
+    start = time.perf_counter()
+    sentences = sent_tokenize(text)
+    words = word_tokens(sentences)
+    tokens = detector.tokenize(text, sentences)
+    timings['tokenize'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    summary = basic_summarizer.extractive_summarize(text, request.num_sentences, sentences=sentences)
+    stats = basic_summarizer.get_article_stats(text, sentences=sentences, words=words)
+    timings['summary'] = time.perf_counter() - start
+
+    check_deadline()
+    start = time.perf_counter()
+    bias_results = detector.analyze(text, request.analysis_types, tokens=tokens)
+    timings['bias'] = time.perf_counter() - start
+
+    result = {
+        'summary': summary,
+        'stats': stats,
+        'bias': {
+            'overall_bias_score': round(overall_bias_score(bias_results), 3),
+            'bias_results': [asdict(bias_result) for bias_result in bias_results],
+        },
+        'word_count': len(text.split()),
+    }
+    if request.transformer_summary:
+        check_deadline()
+        start = time.perf_counter()
+        result['transformer_summary'] = transformer.summarize(text, request.max_length, request.min_length)
+        timings['transformer_summary'] = time.perf_counter() - start
+    result['timings_ms'] = {stage: round(seconds * 1000, 2) for stage, seconds in timings.items()}
+    return result
+
+
+@app.post("/complete-analysis")
+async def complete_analysis(request: CompleteAnalysisRequest):
+    """Scrape a URL or take text, and return summary, statistics and bias results together"""
+    start = time.perf_counter()
+    if not request.text and not request.url:
+        raise HTTPException(status_code=400, detail="Either 'url' or 'text' is required")
+
+    text = request.text
+    if not text:
+        text = await run_in_threadpool(basic_summarizer.scrape_article, request.url)
+        if text is None:
+            raise HTTPException(status_code=400, detail="Failed to scrape article")
+
+    try:
+        result = await run_in_threadpool(analyze_article, text, request)
+    except Overloaded:
+        raise
+    except Exception as e:
+        logger.error(f"Error in complete analysis: {e}")
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+    result.update({
+        'url': request.url,
+        'timestamp': datetime.now().isoformat(),
+        'processing_time_ms': round((time.perf_counter() - start) * 1000, 2),
+    })
+    return result
+
+
+# Bias detection API endpoints, same handlers as main.py
+@app.post("/analyze", response_model=BiasAnalysisResponse)
+async def analyze_bias(request: TextAnalysisRequest):
+    """Analyze text for various types of bias"""
+    return await bias_api.analyze_bias(request)
+
+
+@app.get("/bias-types")
+async def get_bias_types():
+    """Get available bias detection types"""
+    return bias_api.bias_types()
+
+
+# Summarization API endpoints, same request and response bodies as summarization.py
+
+async def json_body(request: Request) -> dict:
+    try:
+        data = await request.json()
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def error(message, status_code):
+    return JSONResponse({'error': message}, status_code=status_code)
+
+
+@app.post("/extractive_summary")
+async def extractive_summary(request: Request):
+    data = await json_body(request)
+    if 'text' not in data:
+        return error('Text is required', 400)
+    summary = await run_in_threadpool(basic_summarizer.extractive_summarize, data.get('text', ''),
+                                      data.get('num_sentences', 3))
+    return {'summary': summary}
+
+
+@app.post("/transformer_summary")
+async def transformer_summary(request: Request):
+    data = await json_body(request)
+    if 'text' not in data:
+        return error('Text is required', 400)
+
+    def summarize(text, max_length, min_length):
+        check_deadline()
+        summary = transformer.summarize(text, max_length, min_length)
+        # BART cannot be interrupted; a summary finished past the deadline is not sent
+        check_deadline()
+        return summary
+
+    summary = await run_in_threadpool(summarize, data.get('text', ''),
+                                      data.get('max_length', 130), data.get('min_length', 30))
+    return {'summary': summary}
+
+
+@app.post("/scrape_article")
+async def scrape_article(request: Request):
+    data = await json_body(request)
+    if 'url' not in data:
+        return error('URL is required', 400)
+    article_text = await run_in_threadpool(basic_summarizer.scrape_article, data.get('url', ''))
+    if article_text is None:
+        return error('Failed to scrape article', 400)
+    return {'article_text': article_text}
+
+
+@app.post("/article_stats")
+async def article_stats(request: Request):
+    data = await json_body(request)
+    if 'text' not in data:
+        return error('Text is required', 400)
+    stats = await run_in_threadpool(basic_summarizer.get_article_stats, data.get('text', ''))
+    return {'stats': stats}
+
+
+@app.post("/batch_summarize")
+async def batch_summarize(request: Request):
+    data = await json_body(request)
+    num_sentences = data.get('num_sentences', 3)
+
+    def summarize_all(articles):
+        check_deadline()
+        return [dict(article, summary=basic_summarizer.extractive_summarize(article.get('description', ''),
+                                                                            num_sentences=num_sentences))
+                for article in articles]
+
+    try:
+        summarized_articles = await run_in_threadpool(summarize_all, data.get('articles', []))
+        return {'success': True, 'summarized_articles': summarized_articles}
+    except Overloaded:
+        raise
+    except Exception as e:
+        logger.error(f"Error in batch_summarize: {e}")
+        return {'success': False, 'error': str(e)}
+
+
+@app.get("/health")
+async def health_check():
+    """Health check endpoint"""
+    return {
+        "status": "healthy",
+        "service": "analysis-service",
+        "timestamp": datetime.now().isoformat(),
+        "engines": {
+            "extractive_summarizer": "loaded",
+            "bias_detector": "loaded",
+            "transformer_summarizer": transformer.state,
+        },
+        "admission": admission_stats(admission),
+        "tracing": tracing.tracer.stats(),
+        "token_cache": token_cache.stats()
+    }
+
+
+@app.get("/")
+async def root():
+    """Root endpoint with API information"""
+    return {
+        "message": "News Analysis Service",
+        "version": "1.0.0",
+        "endpoints": {
+            "complete_analysis": "POST /complete-analysis - Summary, statistics and bias for a URL or text",
+            "analyze": "POST /analyze - Analyze text for bias",
+            "bias_types": "GET /bias-types - Get available bias detection types",
+            "extractive_summary": "POST /extractive_summary - Generate extractive summary",
+            "transformer_summary": "POST /transformer_summary - Generate transformer-based summary",
+            "scrape_article": "POST /scrape_article - Scrape article from URL",
+            "article_stats": "POST /article_stats - Get article statistics",
+            "batch_summarize": "POST /batch_summarize - Summarize article descriptions",
+            "health": "GET /health - Health check",
+            "traces": "GET /debug/traces - Recently sampled request traces",
+            "profile": "GET /debug/profile - CPU or allocation profile as collapsed stacks (needs PROFILE_TOKEN)",
+            "docs": "GET /docs - API documentation"
+        }
+    }
+
+
+if __name__ == "__main__":
+    uvicorn.run(
+        "analysis_service:app",
+        host="0.0.0.0",
+        port=int(os.environ.get('ANALYSIS_SERVICE_PORT', 8001)),
+        reload=False,
+        workers=1,
+        loop="asyncio"
+    )
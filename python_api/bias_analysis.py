@@ -0,0 +1,274 @@
+import asyncio
+import os
+import re
+import time
+from typing import List, Optional
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+
+from textblob import TextBlob
+import nltk
+from nltk.corpus import stopwords
+from nltk.tokenize import word_tokenize, sent_tokenize
+
+from admission import DeadlineExceeded, check_deadline
+from tracing import bind, traced
+from token_cache import TokenCache
+
+# Download required NLTK data
+def download_nltk_resources():
+    """Download all required NLTK resources"""
+    resources = [
+        ('tokenizers/punkt', 'punkt'),
+        ('tokenizers/punkt_tab', 'punkt_tab'),
+        ('corpora/stopwords', 'stopwords')
+    ]
+    
+    for resource_path, resource_name in resources:
+        try:
+            nltk.data.find(resource_path)
+        except LookupError:
+            print(f"Downloading NLTK resource: {resource_name}")
+            nltk.download(resource_name, quiet=True)
+
+# Initialize NLTK resources
+download_nltk_resources()
+
+# Thread pool for CPU-intensive tasks
+executor = ThreadPoolExecutor(max_workers=4)
+
+# Tokenizations shared by every BiasDetector, within TOKEN_CACHE_BYTES
+token_cache = TokenCache(max_bytes=int(os.environ.get('TOKEN_CACHE_BYTES', 32 * 1024 * 1024)))
+
+@dataclass
+class BiasResult:
+    bias_type: str
+    confidence: float
+    evidence: List[str]
+    suggestions: List[str]
+    severity: str  # low, medium, high
+
+class BiasDetector:
+    def __init__(self):
+        self.stop_words = set(stopwords.words('english'))
+        
+        # Bias lexicons
+        self.gender_bias_terms = {
+            'male_coded': ['aggressive', 'ambitious', 'analytical', 'assertive', 'athletic',
+                          'competitive', 'confident', 'decisive', 'determined', 'independent',
+                          'leader', 'logical', 'objective', 'outspoken', 'persistent'],
+            'female_coded': ['collaborative', 'committed', 'compassionate', 'considerate',
+                           'cooperative', 'dependable', 'enthusiastic', 'interpersonal',
+                           'loyal', 'pleasant', 'polite', 'responsible', 'sensitive',
+                           'supportive', 'sympathetic', 'trustworthy', 'understanding']
+        }
+        
+        self.racial_bias_indicators = [
+            'urban', 'articulate', 'clean', 'well-spoken', 'exotic', 'ethnic',
+            'diverse', 'minority', 'disadvantaged', 'inner-city'
+        ]
+        
+        self.age_bias_terms = [
+            'young', 'old', 'senior', 'junior', 'experienced', 'fresh',
+            'mature', 'veteran', 'seasoned', 'energetic', 'digital native'
+        ]
+        
+        self.confirmation_bias_phrases = [
+            'obviously', 'clearly', 'everyone knows', 'it\'s common sense',
+            'without a doubt', 'undeniably', 'certainly', 'definitely'
+        ]
+        
+        self.loaded_language = [
+            'terrorist', 'extremist', 'radical', 'fanatic', 'militant',
+            'thug', 'criminal', 'suspect', 'alleged', 'controversial'
+        ]
+
+    def preprocess_text(self, text: str) -> tuple:
+        """tokenize(text), cached by content in token_cache"""
+        return token_cache.get(text, self.tokenize, self.clean_text)
+
+    @staticmethod
+    def clean_text(text: str) -> str:
+        """Lowercased text with punctuation removed and whitespace collapsed"""
+        text_clean = re.sub(r'[^\w\s]', ' ', text.lower())
+        return ' '.join(text_clean.split())
+
+    @traced('nltk.tokenize')
+    def tokenize(self, text: str, sentences: Optional[List[str]] = None) -> tuple:
+        """Filtered words, sentences and cleaned text; pass sentences to reuse an existing sentence split"""
+        text_clean = self.clean_text(text)
+        
+        # Tokenize; the cleaned text has no punctuation, so it needs no sentence split
+        words = word_tokenize(text_clean, preserve_line=True)
+        if sentences is None:
+            sentences = sent_tokenize(text)
+        
+        # Remove stop words
+        filtered_words = [w for w in words if w not in self.stop_words]
+        
+        return tuple(filtered_words), tuple(sentences), text_clean
+
+    @traced('detect.gender')
+    def detect_gender_bias(self, text: str, tokens: Optional[tuple] = None) -> BiasResult:
+        """Detect gender-coded language bias"""
+        filtered_words, _, _ = tokens or self.preprocess_text(text)
+        
+        male_score = sum(1 for word in filtered_words if word in self.gender_bias_terms['male_coded'])
+        female_score = sum(1 for word in filtered_words if word in self.gender_bias_terms['female_coded'])
+        
+        total_coded = male_score + female_score
+        if total_coded == 0:
+            return BiasResult("gender", 0.0, [], [], "low")
+        
+        bias_ratio = abs(male_score - female_score) / total_coded
+        confidence = min(bias_ratio * 2, 1.0)  # Scale to 0-1
+        
+        evidence = []
+        if male_score > female_score:
+            evidence.append(f"Male-coded terms detected: {male_score}")
+            bias_direction = "male-coded"
+        else:
+            evidence.append(f"Female-coded terms detected: {female_score}")
+            bias_direction = "female-coded"
+        
+        severity = "high" if confidence > 0.7 else "medium" if confidence > 0.4 else "low"
+        
+        suggestions = [
+            "Consider using gender-neutral language",
+            f"Replace {bias_direction} terms with neutral alternatives",
+            "Review job descriptions for inclusive language"
+        ]
+        
+        return BiasResult("gender", confidence, evidence, suggestions, severity)
+
+    @traced('detect.confirmation')
+    def detect_confirmation_bias(self, text: str, tokens: Optional[tuple] = None) -> BiasResult:
+        """Detect confirmation bias indicators"""
+        # clean_text lowercases, so the tokens of text itself are shared with the other detectors
+        _, sentences, text_clean = tokens or self.preprocess_text(text)
+        
+        bias_phrases_found = []
+        for phrase in self.confirmation_bias_phrases:
+            if phrase in text_clean:
+                bias_phrases_found.append(phrase)
+        
+        confidence = min(len(bias_phrases_found) * 0.3, 1.0)
+        
+        evidence = [f"Confirmation bias phrase: '{phrase}'" for phrase in bias_phrases_found]
+        
+        severity = "high" if confidence > 0.6 else "medium" if confidence > 0.3 else "low"
+        
+        suggestions = [
+            "Use more tentative language (e.g., 'may', 'could', 'appears')",
+            "Provide evidence for strong claims",
+            "Consider alternative viewpoints"
+        ]
+        
+        return BiasResult("confirmation", confidence, evidence, suggestions, severity)
+
+    @traced('detect.racial')
+    def detect_racial_bias(self, text: str, tokens: Optional[tuple] = None) -> BiasResult:
+        """Detect potential racial bias indicators"""
+        filtered_words, _, _ = tokens or self.preprocess_text(text)
+        
+        bias_indicators_found = [word for word in filtered_words if word in self.racial_bias_indicators]
+        
+        confidence = min(len(bias_indicators_found) * 0.4, 1.0)
+        
+        evidence = [f"Potentially biased term: '{word}'" for word in bias_indicators_found]
+        
+        severity = "high" if confidence > 0.6 else "medium" if confidence > 0.3 else "low"
+        
+        suggestions = [
+            "Review context of racial/ethnic descriptors",
+            "Consider if descriptors are necessary",
+            "Use person-first language"
+        ]
+        
+        return BiasResult("racial", confidence, evidence, suggestions, severity)
+
+    @traced('detect.loaded_language')
+    def detect_loaded_language(self, text: str, tokens: Optional[tuple] = None) -> BiasResult:
+        """Detect emotionally loaded language"""
+        filtered_words, _, _ = tokens or self.preprocess_text(text)
+        
+        loaded_words_found = [word for word in filtered_words if word in self.loaded_language]
+        
+        confidence = min(len(loaded_words_found) * 0.5, 1.0)
+        
+        evidence = [f"Loaded term: '{word}'" for word in loaded_words_found]
+        
+        severity = "high" if confidence > 0.7 else "medium" if confidence > 0.4 else "low"
+        
+        suggestions = [
+            "Use neutral, factual language",
+            "Replace loaded terms with objective descriptions",
+            "Consider the emotional impact of word choices"
+        ]
+        
+        return BiasResult("loaded_language", confidence, evidence, suggestions, severity)
+
+    @traced('detect.sentiment')
+    def detect_sentiment_bias(self, text: str, tokens: Optional[tuple] = None) -> BiasResult:
+        """Detect extreme sentiment that might indicate bias"""
+        blob = TextBlob(text)
+        polarity = abs(blob.sentiment.polarity)
+        subjectivity = blob.sentiment.subjectivity
+        
+        # High subjectivity + extreme polarity suggests potential bias
+        confidence = (polarity * subjectivity)
+        
+        evidence = [
+            f"Sentiment polarity: {blob.sentiment.polarity:.2f}",
+            f"Subjectivity: {subjectivity:.2f}"
+        ]
+        
+        severity = "high" if confidence > 0.7 else "medium" if confidence > 0.4 else "low"
+        
+        suggestions = [
+            "Consider more balanced language",
+            "Include multiple perspectives",
+            "Use objective, factual statements"
+        ]
+        
+        return BiasResult("sentiment", confidence, evidence, suggestions, severity)
+
+    def _detectors(self, analysis_types):
+        if "all" in analysis_types:
+            analysis_types = ["gender", "confirmation", "racial", "loaded_language", "sentiment"]
+        detectors = {
+            "gender": self.detect_gender_bias,
+            "confirmation": self.detect_confirmation_bias,
+            "racial": self.detect_racial_bias,
+            "loaded_language": self.detect_loaded_language,
+            "sentiment": self.detect_sentiment_bias,
+        }
+        return [detectors[name] for name in detectors if name in analysis_types]
+
+    def analyze(self, text: str, analysis_types: List[str] = ("all",),
+                tokens: Optional[tuple] = None) -> List[BiasResult]:
+        """Synchronous analysis for in-process callers; tokens is the result of tokenize(text)"""
+        return [detect(text, tokens) for detect in self._detectors(analysis_types)]
+
+    async def analyze_text(self, text: str, analysis_types: List[str],
+                           deadline: Optional[float] = None) -> List[BiasResult]:
+        """Main analysis function with async processing; deadline is a Unix time"""
+        def run(detect):
+            # Detectors still queued in the executor when the deadline passes are skipped
+            check_deadline(deadline)
+            return detect(text)
+
+        # Run bias detection methods in parallel, each carrying the request's trace into its thread
+        loop = asyncio.get_event_loop()
+        tasks = [loop.run_in_executor(executor, bind(run), detect) for detect in self._detectors(analysis_types)]
+        timeout = None if deadline is None else max(deadline - time.time(), 0)
+        try:
+            results = await asyncio.wait_for(asyncio.gather(*tasks), timeout)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded()
+        return results
+
+
+def overall_bias_score(results: List[BiasResult]) -> float:
+    """Mean confidence over the bias types analysed"""
+    return sum(result.confidence for result in results) / len(results) if results else 0.0
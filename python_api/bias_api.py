@@ -0,0 +1,79 @@
+"""
+The bias detection endpoints' models, detector and handlers, shared by the
+bias API (main.py) and the composite analysis service (analysis_service.py),
+which each wrap them in routes of their own.
+"""
+from dataclasses import asdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+from pydantic import BaseModel, Field
+
+from bias_analysis import BiasDetector, overall_bias_score
+from admission import Overloaded, current_deadline
+
+BIAS_TYPES = {
+    "gender": "Detects gender-coded language that may bias against certain genders",
+    "confirmation": "Identifies language that assumes agreement or presents opinion as fact",
+    "racial": "Flags potentially problematic racial/ethnic descriptors",
+    "loaded_language": "Detects emotionally charged or prejudicial terms",
+    "sentiment": "Analyzes extreme sentiment that might indicate bias",
+    "all": "Runs all available bias detection types"
+}
+
+
+class TextAnalysisRequest(BaseModel):
+    text: str = Field(..., min_length=1, max_length=10000)
+    analysis_types: Optional[List[str]] = Field(default=["all"])
+    language: Optional[str] = Field(default="en")
+
+
+class BiasAnalysisResponse(BaseModel):
+    text_id: str
+    timestamp: str
+    overall_bias_score: float
+    bias_results: List[Dict]
+    word_count: int
+    processing_time_ms: float
+
+
+# One detector per process, shared by every app that imports this module
+detector = BiasDetector()
+
+
+async def analyze_bias(request: TextAnalysisRequest) -> BiasAnalysisResponse:
+    """Analyze text for various types of bias"""
+    start_time = datetime.now()
+
+    try:
+        # Generate unique ID for this analysis
+        text_id = f"analysis_{hash(request.text)}_{int(start_time.timestamp())}"
+
+        # Perform bias analysis
+        bias_results = await detector.analyze_text(request.text, request.analysis_types, current_deadline())
+
+        # Calculate overall bias score
+        overall_score = overall_bias_score(bias_results)
+
+        # Calculate processing time
+        processing_time = (datetime.now() - start_time).total_seconds() * 1000
+
+        return BiasAnalysisResponse(
+            text_id=text_id,
+            timestamp=start_time.isoformat(),
+            overall_bias_score=round(overall_score, 3),
+            bias_results=[asdict(result) for result in bias_results],
+            word_count=len(request.text.split()),
+            processing_time_ms=round(processing_time, 2)
+        )
+
+    except Overloaded:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+
+def bias_types():
+    """Available bias detection types"""
+    return {"available_types": list(BIAS_TYPES), "descriptions": BIAS_TYPES}
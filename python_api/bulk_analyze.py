@@ -0,0 +1,275 @@
+"""
+Offline bias and summary analysis of an archived article corpus.
+
+Reads JSONL (plain, .gz, .bz2 or .xz), analyses each article's text with
+BiasDetector and NewsScraperSummarizer in a process pool, and streams the
+results to a JSONL file in input order. Progress is checkpointed after every
+written chunk, so re-running the same command resumes where it stopped.
+
+Usage:
+    python bulk_analyze.py archive.jsonl.gz results.jsonl --workers 8
+"""
+import argparse
+import bz2
+import gzip
+import json
+import logging
+import lzma
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import asdict
+from itertools import islice
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+OPENERS = {'.gz': gzip.GzipFile, '.bz2': bz2.BZ2File, '.xz': lzma.LZMAFile}
+DEFAULT_TEXT_FIELDS = ('full_text', 'text', 'content', 'description')
+DEFAULT_ID_FIELDS = ('id', 'url')
+
+
+class CorpusReader:
+    """Line iterator over a possibly compressed file that knows how far into the file it is"""
+
+    def __init__(self, path):
+        self.path = path
+        self.size = os.path.getsize(path)
+        self._raw = open(path, 'rb')
+        opener = OPENERS.get(os.path.splitext(path)[1].lower())
+        self._stream = opener(fileobj=self._raw) if opener else self._raw
+
+    def __iter__(self):
+        return iter(self._stream)
+
+    @property
+    def position(self):
+        """Bytes of the (compressed) file read so far"""
+        return self._raw.tell()
+
+    def close(self):
+        self._stream.close()
+        self._raw.close()
+
+
+# Worker process state, created once per process by init_worker
+_engines = {}
+
+
+def init_worker(num_sentences, analysis_types, text_fields, id_fields):
+    from nltk.tokenize import sent_tokenize
+    from bias_analysis import BiasDetector, overall_bias_score
+    from summarizer import NewsScraperSummarizer
+    _engines.update(
+        detector=BiasDetector(),
+        summarizer=NewsScraperSummarizer(),
+        sent_tokenize=sent_tokenize,
+        overall_bias_score=overall_bias_score,
+        num_sentences=num_sentences,
+        analysis_types=analysis_types,
+        text_fields=text_fields,
+        id_fields=id_fields,
+    )
+
+
+def analyze_record(line_number, line):
+    """Analyse one JSONL line; failures become records with an 'error' field"""
+    result = {'line': line_number}
+    try:
+        article = json.loads(line)
+        result['id'] = next((article[field] for field in _engines['id_fields'] if article.get(field)), None)
+        text = next((article[field] for field in _engines['text_fields'] if article.get(field)), None)
+        if not text:
+            result['error'] = 'no text'
+            return result
+
+        detector, summarizer = _engines['detector'], _engines['summarizer']
+        # One sentence split, shared by the summary and the bias detectors
+        sentences = _engines['sent_tokenize'](text)
+        tokens = detector.tokenize(text, sentences)
+        bias_results = detector.analyze(text, _engines['analysis_types'], tokens=tokens)
+        result.update(
+            summary=summarizer.extractive_summarize(text, _engines['num_sentences'], sentences=sentences),
+            overall_bias_score=round(_engines['overall_bias_score'](bias_results), 3),
+            bias_results=[asdict(bias_result) for bias_result in bias_results],
+            word_count=len(text.split()),
+        )
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+def analyze_chunk(first_line, lines):
+    """Worker entry point: analyse a chunk, returning its output as one JSONL string and the error count"""
+    results = [analyze_record(first_line + offset, line) for offset, line in enumerate(lines)]
+    errors = sum(1 for result in results if 'error' in result)
+    return ''.join(json.dumps(result, ensure_ascii=False) + '\n' for result in results), errors
+
+
+class Checkpoint:
+    """Input lines fully written and the output size at that point, saved atomically"""
+
+    def __init__(self, path, input_path):
+        self.path = path
+        self.input_path = os.path.abspath(input_path)
+        self.lines_done = 0
+        self.output_bytes = 0
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path) as f:
+            state = json.load(f)
+        if state.get('input') != self.input_path:
+            raise SystemExit(f"Checkpoint {self.path} belongs to {state.get('input')}; "
+                             f"use --restart to start over")
+        self.lines_done = state['lines_done']
+        self.output_bytes = state['output_bytes']
+        return True
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'input': self.input_path, 'lines_done': self.lines_done,
+                       'output_bytes': self.output_bytes, 'saved_at': time.time()}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+class Progress:
+    """Throughput and ETA from the share of the input file consumed"""
+
+    def __init__(self, reader, interval):
+        self.reader = reader
+        self.interval = interval
+        self.start = time.time()
+        self.start_position = None
+        self.records = 0
+        self.errors = 0
+        self.last_report = self.start
+
+    def update(self, records, errors, force=False):
+        self.records += records
+        self.errors += errors
+        now = time.time()
+        if not force and now - self.last_report < self.interval:
+            return
+        self.last_report = now
+        elapsed = max(now - self.start, 1e-9)
+        position = self.reader.position
+        if self.start_position is None:
+            self.start_position = position
+        done = position - self.start_position
+        remaining = self.reader.size - position
+        eta = remaining * elapsed / done if done > 0 else None
+        logger.info(f"{self.records} articles ({self.errors} errors), {self.records / elapsed:.1f} articles/s, "
+                    f"{100 * position / max(self.reader.size, 1):.1f}% of input"
+                    + (f", ETA {eta / 60:.1f} min" if eta is not None else ""))
+
+
+def chunks(lines, first_line, size):
+    """Yield (first_line_number, [lines]) chunks"""
+    while True:
+        chunk = list(islice(lines, size))
+        if not chunk:
+            return
+        yield first_line, chunk
+        first_line += len(chunk)
+
+
+def run(args):
+    checkpoint = Checkpoint(args.checkpoint or args.output + '.checkpoint', args.input)
+    resumed = False if args.restart else checkpoint.load()
+    if resumed:
+        logger.info(f"Resuming after line {checkpoint.lines_done}")
+
+    # Drop anything written after the last checkpoint (a chunk that was being written)
+    output = open(args.output, 'ab' if resumed else 'wb')
+    output.truncate(checkpoint.output_bytes)
+    output.seek(checkpoint.output_bytes)
+
+    reader = CorpusReader(args.input)
+    lines = iter(reader)
+    for _ in islice(lines, checkpoint.lines_done):
+        pass
+    progress = Progress(reader, args.progress_interval)
+    progress.start_position = reader.position
+
+    # At most max_pending chunks are in flight or waiting to be written, which
+    # keeps memory use independent of corpus size
+    max_pending = args.max_pending or args.workers * 2
+    pending = {}
+    completed = {}
+    next_to_write = checkpoint.lines_done
+    source = chunks(lines, checkpoint.lines_done, args.chunk_size)
+
+    executor = ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=init_worker,
+        initargs=(args.num_sentences, args.analysis_types, args.text_fields, args.id_fields),
+    )
+    try:
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) + len(completed) < max_pending:
+                item = next(source, None)
+                if item is None:
+                    exhausted = True
+                    break
+                first_line, chunk = item
+                pending[executor.submit(analyze_chunk, first_line, chunk)] = (first_line, len(chunk))
+            if not pending and not completed:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                first_line, count = pending.pop(future)
+                completed[first_line] = (count, future.result())
+
+            # Write finished chunks in input order, checkpointing after each
+            while next_to_write in completed:
+                count, (text, errors) = completed.pop(next_to_write)
+                output.write(text.encode('utf-8'))
+                output.flush()
+                next_to_write += count
+                checkpoint.lines_done = next_to_write
+                checkpoint.output_bytes = output.tell()
+                checkpoint.save()
+                progress.update(count, errors)
+    except KeyboardInterrupt:
+        logger.info(f"Interrupted; {checkpoint.lines_done} lines are done, run again to resume")
+        executor.shutdown(wait=False, cancel_futures=True)
+        return 130
+    finally:
+        output.close()
+        reader.close()
+    executor.shutdown()
+
+    progress.update(0, 0, force=True)
+    logger.info(f"Finished: {checkpoint.lines_done} lines, results in {args.output}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bias and summary analysis of a JSONL article corpus')
+    parser.add_argument('input', help='JSONL file, optionally .gz, .bz2 or .xz compressed')
+    parser.add_argument('output', help='JSONL results file (appended to when resuming)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=int, default=64, help='articles per task sent to a worker')
+    parser.add_argument('--max-pending', type=int, default=None,
+                        help='chunks in flight or awaiting output (default: 2 x workers)')
+    parser.add_argument('--num-sentences', type=int, default=3)
+    parser.add_argument('--analysis-types', nargs='+', default=['all'])
+    parser.add_argument('--text-fields', nargs='+', default=list(DEFAULT_TEXT_FIELDS),
+                        help='article fields to analyse, first non-empty one wins')
+    parser.add_argument('--id-fields', nargs='+', default=list(DEFAULT_ID_FIELDS))
+    parser.add_argument('--checkpoint', help='checkpoint file (default: <output>.checkpoint)')
+    parser.add_argument('--restart', action='store_true', help='ignore an existing checkpoint')
+    parser.add_argument('--progress-interval', type=float, default=10, help='seconds between progress lines')
+    return run(parser.parse_args(argv))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+HTML parsing for the summarizer and, through analysis_bridge, the news
+scrapers: a BeautifulSoup backend chosen once from the argument,
+NEWS_HTML_PARSER or the fastest installed.
+"""
+import os
+import re
+import logging
+from bs4 import BeautifulSoup, SoupStrainer
+
+logger = logging.getLogger(__name__)
+
+# Parser backends in order of preference; 'lxml' is C-backed and much
+# faster than the pure Python 'html.parser'.
+PARSER_BACKENDS = ['lxml', 'html.parser']
+
+# Set NEWS_HTML_PARSER to 'lxml' or 'html.parser' to force a backend,
+# or leave it unset / 'auto' to use the fastest one installed.
+PARSER_ENV_VAR = 'NEWS_HTML_PARSER'
+
+_HEAD_END = re.compile(rb'</head\s*>', re.I)
+_backend_available = {}
+
+
+def backend_available(backend):
+    """Check whether a BeautifulSoup tree builder is installed"""
+    if backend not in _backend_available:
+        try:
+            BeautifulSoup('', backend)
+            _backend_available[backend] = True
+        except Exception:
+            _backend_available[backend] = False
+    return _backend_available[backend]
+
+
+def available_backends():
+    """List the installed parser backends, fastest first"""
+    return [backend for backend in PARSER_BACKENDS if backend_available(backend)]
+
+
+def resolve_backend(backend=None):
+    """Pick the parser backend from the argument, the environment or the fastest installed"""
+    backend = backend or os.environ.get(PARSER_ENV_VAR, 'auto')
+    if backend != 'auto':
+        if backend_available(backend):
+            return backend
+        logger.warning(f"HTML parser backend '{backend}' is not installed, falling back")
+    for candidate in PARSER_BACKENDS:
+        if backend_available(candidate):
+            return candidate
+    return 'html.parser'
+
+
+class HTMLParser:
+    """Builds BeautifulSoup trees with a configurable backend"""
+
+    def __init__(self, backend=None):
+        self.backend = resolve_backend(backend)
+        logger.info(f"Using HTML parser backend: {self.backend}")
+
+    def parse(self, content, parse_only=None):
+        """Parse a page, optionally keeping only the tags matched by parse_only"""
+        return BeautifulSoup(content, self.backend, parse_only=parse_only)
+
+    def parse_head(self, content):
+        """Parse only the <meta> tags before </head>, for pages read for their metadata alone"""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        match = _HEAD_END.search(content)
+        if match:
+            content = content[:match.end()]
+        return self.parse(content, parse_only=SoupStrainer('meta'))
@@ -0,0 +1,213 @@
+"""
+On-demand profiling for the services.
+
+GET /debug/profile?seconds=30 samples the stacks of every thread for that
+long (mode=cpu) or diffs two tracemalloc snapshots taken that far apart
+(mode=alloc), and returns collapsed stacks, one "frame;frame;frame count"
+line per stack, for flamegraph.pl, speedscope or inferno. Nothing runs
+until a profile is asked for, so it can stay installed in production.
+
+The endpoint is off unless PROFILE_TOKEN is set, and requests must send
+the token in X-Profile-Token. One profile runs at a time.
+"""
+import hmac
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+TOKEN_HEADER = 'X-Profile-Token'
+MODES = ('cpu', 'alloc')
+MAX_SECONDS = 120
+MAX_ALLOC_FRAMES = 64
+
+# Innermost frames of threads that are only waiting: locks, queues, selectors, sockets
+_IDLE = {
+    ('threading.py', 'wait'), ('threading.py', '_wait_for_tstate_lock'),
+    ('selectors.py', 'select'), ('socket.py', 'accept'), ('socket.py', 'readinto'),
+    ('thread.py', '_worker'), ('socketserver.py', 'serve_forever'),
+}
+
+
+class ProfileError(Exception):
+    """A profile request that cannot be served, with its HTTP status"""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class ProfileRequest:
+    """Validated /debug/profile query parameters"""
+
+    def __init__(self, args):
+        self.mode = args.get('mode') or 'cpu'
+        if self.mode not in MODES:
+            raise ProfileError(f"'mode' must be one of {', '.join(MODES)}")
+        try:
+            self.seconds = float(args.get('seconds') or 10)
+            self.interval = float(args.get('interval_ms') or 10) / 1000
+            self.frames = int(args.get('frames') or 25)
+        except ValueError:
+            raise ProfileError("'seconds', 'interval_ms' and 'frames' must be numbers")
+        if not 0 < self.seconds <= MAX_SECONDS:
+            raise ProfileError(f"'seconds' must be between 0 and {MAX_SECONDS}")
+        if not 0.001 <= self.interval <= 1:
+            raise ProfileError("'interval_ms' must be between 1 and 1000")
+        if not 1 <= self.frames <= MAX_ALLOC_FRAMES:
+            raise ProfileError(f"'frames' must be between 1 and {MAX_ALLOC_FRAMES}")
+        self.idle = args.get('idle') in ('1', 'true')
+
+
+def collapse(stacks):
+    """Collapsed stack lines from a Counter of frame tuples, heaviest first"""
+    return ''.join(f"{';'.join(stack)} {count}\n" for stack, count in stacks.most_common())
+
+
+def _thread_label(name):
+    # ThreadPoolExecutor-0_3 and ThreadPoolExecutor-0_1 are the same kind of thread
+    return re.sub(r'[-_]?\d+', '', name).strip() or 'thread'
+
+
+class StackSampler:
+    """Samples the Python stacks of all other threads every interval seconds"""
+
+    def __init__(self, interval=0.01, idle=False):
+        self.interval = interval
+        self.idle = idle
+        self.stacks = Counter()
+        self.samples = 0
+        self._labels = {}
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            name = getattr(code, 'co_qualname', code.co_name)
+            label = self._labels[code] = f'{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+        return label
+
+    def sample(self, skip):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == skip:
+                continue
+            code = frame.f_code
+            if not self.idle and (os.path.basename(code.co_filename), code.co_name) in _IDLE:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(_thread_label(names.get(ident, 'thread')))
+            self.stacks[tuple(reversed(stack))] += 1
+        self.samples += 1
+
+    def run(self, seconds):
+        me = threading.get_ident()
+        end = time.perf_counter() + seconds
+        next_sample = time.perf_counter()
+        while next_sample < end:
+            self.sample(me)
+            next_sample += self.interval
+            time.sleep(max(next_sample - time.perf_counter(), 0))
+        return self.stacks
+
+
+def allocations(seconds, frames=25):
+    """Bytes allocated and still alive after seconds, by allocation stack"""
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start(frames)
+    try:
+        before = tracemalloc.take_snapshot()
+        time.sleep(seconds)
+        after = tracemalloc.take_snapshot()
+    finally:
+        if started:
+            tracemalloc.stop()
+    # Leave out the snapshots' own bookkeeping
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    stacks = Counter()
+    for diff in after.filter_traces(ignore).compare_to(before.filter_traces(ignore), 'traceback'):
+        if diff.size_diff > 0:
+            stacks[tuple(f'{os.path.basename(frame.filename)}:{frame.lineno}'
+                         for frame in diff.traceback)] += diff.size_diff
+    return stacks
+
+
+class Profiler:
+    """Runs one profile at a time"""
+
+    def __init__(self, token=None):
+        self.token = token
+        self.profiles = 0
+        self._lock = threading.Lock()
+
+    def authorize(self, token):
+        if not self.token:
+            raise ProfileError('Profiling is disabled; set PROFILE_TOKEN to enable it', 404)
+        if not token or not hmac.compare_digest(token, self.token):
+            raise ProfileError(f'Missing or wrong {TOKEN_HEADER}', 403)
+
+    def run(self, params):
+        """Collapsed stacks and response headers for a ProfileRequest; blocks for params.seconds"""
+        if not self._lock.acquire(blocking=False):
+            raise ProfileError('A profile is already running', 409)
+        try:
+            start = time.perf_counter()
+            if params.mode == 'cpu':
+                sampler = StackSampler(params.interval, params.idle)
+                stacks = sampler.run(params.seconds)
+                info = {'X-Profile-Samples': str(sampler.samples)}
+            else:
+                stacks = allocations(params.seconds, params.frames)
+                info = {'X-Profile-Bytes': str(sum(stacks.values()))}
+            self.profiles += 1
+        finally:
+            self._lock.release()
+        filename = f"profile-{params.mode}-{time.strftime('%Y%m%d-%H%M%S')}.collapsed"
+        info.update({
+            'X-Profile-Duration': f'{time.perf_counter() - start:.3f}',
+            'Content-Disposition': f'attachment; filename="{filename}"',
+        })
+        return collapse(stacks), info
+
+
+profiler = Profiler(os.environ.get('PROFILE_TOKEN'))
+
+
+def install_fastapi(app):
+    """GET /debug/profile for a FastAPI app"""
+    from fastapi import Request
+    from fastapi.concurrency import run_in_threadpool
+    from fastapi.responses import JSONResponse, PlainTextResponse
+
+    @app.get("/debug/profile")
+    async def debug_profile(request: Request):
+        """Collapsed stacks of a CPU or allocation profile (needs PROFILE_TOKEN)"""
+        try:
+            profiler.authorize(request.headers.get(TOKEN_HEADER))
+            params = ProfileRequest(request.query_params)
+            # Sample from a worker thread, so that the event loop is profiled too
+            text, headers = await run_in_threadpool(profiler.run, params)
+        except ProfileError as e:
+            return JSONResponse({'detail': str(e)}, status_code=e.status_code)
+        return PlainTextResponse(text, headers=headers)
+
+
+def install_flask(app):
+    """GET /debug/profile for a (threaded) Flask app"""
+    from flask import Response, jsonify, request
+
+    @app.route('/debug/profile', methods=['GET'])
+    def debug_profile():
+        """Collapsed stacks of a CPU or allocation profile (needs PROFILE_TOKEN)"""
+        try:
+            profiler.authorize(request.headers.get(TOKEN_HEADER))
+            text, headers = profiler.run(ProfileRequest(request.args))
+        except ProfileError as e:
+            return jsonify({'error': str(e)}), e.status_code
+        return Response(text, mimetype='text/plain', headers=headers)
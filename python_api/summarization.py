@@ -1,259 +1,34 @@
-import requests
-from bs4 import BeautifulSoup
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize, sent_tokenize
-from nltk.stem import PorterStemmer
-from collections import Counter
-import re
-from textstat import flesch_reading_ease
-import heapq
-import sys
 import logging
+import os
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from datetime import datetime
+from summarizer import NewsScraperSummarizer, TransformerSummarizer
+from admission import AdmissionController, Overloaded, admission_stats, check_deadline, install_flask
+import sampling_profiler
+import tracing
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def download_nltk_data():
-    """Download required NLTK data with error handling"""
-    try:
-        nltk.download('punkt', quiet=True)
-        nltk.download('stopwords', quiet=True)
-        logger.info("NLTK data downloaded successfully")
-    except Exception as e:
-        logger.error(f"Error downloading NLTK data: {e}")
-        sys.exit(1)
-
-# Download NLTK data at startup
-download_nltk_data()
-
-class NewsScraperSummarizer:
-    def __init__(self):
-        try:
-            self.stop_words = set(stopwords.words('english'))
-            self.stemmer = PorterStemmer()
-            logger.info("NewsScraperSummarizer initialized successfully")
-        except Exception as e:
-            logger.error(f"Error initializing NewsScraperSummarizer: {e}")
-            raise
-    
-    def scrape_article(self, url):
-        """Scrape article content from URL"""
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=15)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style", "nav", "header", "footer"]):
-                script.decompose()
-            
-            # Try to find article content (common selectors)
-            article_selectors = [
-                'article', '.article-content', '.post-content', 
-                '.entry-content', '.content', 'main', '.story-body',
-                '.article-body', '.post-body', '.entry-body'
-            ]
-            
-            article_text = ""
-            for selector in article_selectors:
-                content = soup.select_one(selector)
-                if content:
-                    article_text = content.get_text()
-                    break
-            
-            if not article_text:
-                # Fallback: get all paragraphs
-                paragraphs = soup.find_all('p')
-                article_text = ' '.join([p.get_text() for p in paragraphs if len(p.get_text().strip()) > 50])
-            
-            if not article_text:
-                article_text = soup.get_text()
-            
-            # Clean the text
-            article_text = re.sub(r'\s+', ' ', article_text).strip()
-            
-            if not article_text:
-                logger.warning(f"No text content found at URL: {url}")
-                return None
-                
-            logger.info(f"Successfully scraped article from {url}")
-            return article_text
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Network error while scraping article: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"Error scraping article: {e}")
-            return None
-    
-    def preprocess_text(self, text):
-        """Clean and preprocess text"""
-        try:
-            # Remove special characters and digits
-            text = re.sub(r'[^a-zA-Z\s]', '', text)
-            # Convert to lowercase
-            text = text.lower()
-            # Tokenize
-            words = word_tokenize(text)
-            # Remove stopwords and stem
-            words = [self.stemmer.stem(word) for word in words if word not in self.stop_words]
-            return words
-        except Exception as e:
-            logger.error(f"Error preprocessing text: {e}")
-            return []
-    
-    def calculate_sentence_scores(self, sentences, word_freq):
-        """Calculate scores for sentences based on word frequency"""
-        try:
-            sentence_scores = {}
-            
-            for sentence in sentences:
-                words = self.preprocess_text(sentence)
-                score = 0
-                word_count = 0
-                
-                for word in words:
-                    if word in word_freq:
-                        score += word_freq[word]
-                        word_count += 1
-                
-                if word_count > 0:
-                    sentence_scores[sentence] = score / word_count
-            
-            return sentence_scores
-        except Exception as e:
-            logger.error(f"Error calculating sentence scores: {e}")
-            return {}
-    
-    def extractive_summarize(self, text, num_sentences=3):
-        """Create extractive summary using frequency-based approach"""
-        try:
-            if not text:
-                logger.warning("No text provided for summarization")
-                return "No text to summarize"
-            
-            # Tokenize into sentences
-            sentences = sent_tokenize(text)
-            
-            if len(sentences) <= num_sentences:
-                logger.info("Text is already shorter than requested summary length")
-                return text
-            
-            # Calculate word frequencies
-            words = self.preprocess_text(text)
-            word_freq = Counter(words)
-            
-            if not word_freq:
-                logger.warning("No valid words found in text")
-                return text
-            
-            # Normalize frequencies
-            max_freq = max(word_freq.values())
-            for word in word_freq:
-                word_freq[word] = word_freq[word] / max_freq
-            
-            # Calculate sentence scores
-            sentence_scores = self.calculate_sentence_scores(sentences, word_freq)
-            
-            if not sentence_scores:
-                logger.warning("Could not calculate sentence scores")
-                return text
-            
-            # Get top sentences
-            top_sentences = heapq.nlargest(num_sentences, sentence_scores, key=sentence_scores.get)
-            
-            # Maintain original order
-            summary_sentences = []
-            for sentence in sentences:
-                if sentence in top_sentences:
-                    summary_sentences.append(sentence)
-            
-            summary = ' '.join(summary_sentences)
-            logger.info(f"Generated summary of {len(summary.split())} words")
-            return summary
-            
-        except Exception as e:
-            logger.error(f"Error in extractive summarization: {e}")
-            return text
-    
-    def get_article_stats(self, text):
-        """Get basic statistics about the article"""
-        try:
-            if not text:
-                logger.warning("No text provided for statistics")
-                return {}
-            
-            sentences = sent_tokenize(text)
-            words = word_tokenize(text)
-            
-            stats = {
-                'word_count': len(words),
-                'sentence_count': len(sentences),
-                'avg_sentence_length': len(words) / len(sentences) if sentences else 0,
-                'reading_ease': flesch_reading_ease(text)
-            }
-            
-            logger.info("Successfully calculated article statistics")
-            return stats
-            
-        except Exception as e:
-            logger.error(f"Error calculating article statistics: {e}")
-            return {}
-
-class TransformerSummarizer:
-    def __init__(self):
-        try:
-            from transformers import pipeline
-            self.summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-            logger.info("TransformerSummarizer initialized successfully")
-        except ImportError:
-            logger.warning("Transformers library not installed. Install with: pip install transformers torch")
-            self.summarizer = None
-        except Exception as e:
-            logger.error(f"Error initializing TransformerSummarizer: {e}")
-            self.summarizer = None
-    
-    def summarize(self, text, max_length=130, min_length=30):
-        """Summarize using BART model"""
-        try:
-            if not self.summarizer:
-                logger.warning("Transformers library not available")
-                return "Transformers library not available"
-            
-            if len(text.split()) < 50:
-                logger.info("Text too short for summarization")
-                return text
-            
-            # Split long text into chunks if needed
-            max_chunk_length = 1024
-            chunks = [text[i:i+max_chunk_length] for i in range(0, len(text), max_chunk_length)]
-            
-            summaries = []
-            for chunk in chunks:
-                if len(chunk.split()) > 30:  # Only summarize substantial chunks
-                    summary = self.summarizer(chunk, max_length=max_length, min_length=min_length, do_sample=False)
-                    summaries.append(summary[0]['summary_text'])
-            
-            final_summary = ' '.join(summaries)
-            logger.info(f"Generated transformer summary of {len(final_summary.split())} words")
-            return final_summary
-            
-        except Exception as e:
-            logger.error(f"Error in transformer summarization: {e}")
-            return "Error in summarization"
-
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
+# Per-endpoint concurrency and wait queue limits; BART runs one summary at a time
+admission = {
+    '/extractive_summary': AdmissionController('/extractive_summary', max_concurrent=4, max_queue=32),
+    '/transformer_summary': AdmissionController('/transformer_summary', max_concurrent=1, max_queue=4, max_wait=30),
+    '/scrape_article': AdmissionController('/scrape_article', max_concurrent=8, max_queue=32),
+    '/article_stats': AdmissionController('/article_stats', max_concurrent=4, max_queue=32),
+    '/batch_summarize': AdmissionController('/batch_summarize', max_concurrent=2, max_queue=8),
+}
+# Tracing first, so that its trace is open while admission control queues the request
+tracing.install_flask(app)
+install_flask(app, admission)
+# GET /debug/profile, off unless PROFILE_TOKEN is set
+sampling_profiler.install_flask(app)
+
 # Initialize summarizers once
 basic_summarizer = NewsScraperSummarizer()
 transformer_summarizer = TransformerSummarizer()
@@ -285,8 +60,11 @@ def transformer_summary():
         max_length = data.get('max_length', 130)
         min_length = data.get('min_length', 30)
         
+        check_deadline()
         summary = transformer_summarizer.summarize(text, max_length, min_length)
         return jsonify({'summary': summary})
+    except Overloaded:
+        raise
     except Exception as e:
         logger.error(f"Error in transformer_summary endpoint: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -305,6 +83,8 @@ def scrape_article():
             return jsonify({'error': 'Failed to scrape article'}), 400
         
         return jsonify({'article_text': article_text})
+    except Overloaded:
+        raise
     except Exception as e:
         logger.error(f"Error in scrape_article endpoint: {e}")
         return jsonify({'error': 'Internal server error'}), 500
@@ -332,6 +112,7 @@ def batch_summarize():
         summarizer = NewsScraperSummarizer()
         summarized_articles = []
         for article in articles:
+            check_deadline()
             description = article.get('description', '')
             summary = summarizer.extractive_summarize(description, num_sentences=num_sentences)
             summarized_article = dict(article)
@@ -341,6 +122,8 @@ def batch_summarize():
             'success': True,
             'summarized_articles': summarized_articles
         })
+    except Overloaded:
+        raise
     except Exception as e:
         logger.error(f"Error in batch_summarize: {e}")
         return jsonify({'success': False, 'error': str(e)})
@@ -350,7 +133,9 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'service': 'summarization-api',
-        'timestamp': datetime.now().isoformat()
+        'timestamp': datetime.now().isoformat(),
+        'admission': admission_stats(admission),
+        'tracing': tracing.tracer.stats()
     })
 
 @app.route('/', methods=['GET'])
@@ -363,9 +148,13 @@ def root():
             'POST /transformer_summary': 'Generate transformer-based summary',
             'POST /scrape_article': 'Scrape article from URL',
             'POST /article_stats': 'Get article statistics',
-            'GET /health': 'Health check'
+            'GET /health': 'Health check',
+            'GET /debug/traces': 'Recently sampled request traces',
+            'GET /debug/profile': 'CPU or allocation profile as collapsed stacks (needs PROFILE_TOKEN)'
         }
     })
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000, debug=True)
\ No newline at end of file
+    # FLASK_DEBUG=0 turns off the debugger and reloader, e.g. for load tests
+    app.run(host="0.0.0.0", port=int(os.environ.get('SUMMARIZATION_API_PORT', 5000)),
+            debug=os.environ.get('FLASK_DEBUG', '1') != '0')
\ No newline at end of file
@@ -0,0 +1,275 @@
+import requests
+import nltk
+from nltk.corpus import stopwords
+from nltk.tokenize import word_tokenize, sent_tokenize
+from nltk.stem import PorterStemmer
+from collections import Counter
+import re
+from textstat import flesch_reading_ease
+import heapq
+import sys
+import logging
+from page_parser import HTMLParser
+from admission import check_deadline, time_left
+from tracing import span, traced
+
+logger = logging.getLogger(__name__)
+
+def download_nltk_data():
+    """Download required NLTK data with error handling"""
+    try:
+        for resource_path, resource_name in [('tokenizers/punkt', 'punkt'), ('corpora/stopwords', 'stopwords')]:
+            try:
+                nltk.data.find(resource_path)
+            except LookupError:
+                nltk.download(resource_name, quiet=True)
+        logger.info("NLTK data downloaded successfully")
+    except Exception as e:
+        logger.error(f"Error downloading NLTK data: {e}")
+        sys.exit(1)
+
+# Download NLTK data at startup
+download_nltk_data()
+
+def word_tokens(sentences):
+    """word_tokenize of a text, from its sentences (word_tokenize splits sentences itself)"""
+    return [word for sentence in sentences for word in word_tokenize(sentence, preserve_line=True)]
+
+class NewsScraperSummarizer:
+    def __init__(self, parser_backend=None, session=None):
+        try:
+            self.stop_words = set(stopwords.words('english'))
+            self.stemmer = PorterStemmer()
+            self.parser = HTMLParser(parser_backend)
+            # Anything with a requests-style get(), e.g. a replay session for offline runs
+            self.session = session or requests
+            logger.info("NewsScraperSummarizer initialized successfully")
+        except Exception as e:
+            logger.error(f"Error initializing NewsScraperSummarizer: {e}")
+            raise
+    
+    @traced('scrape_article')
+    def scrape_article(self, url):
+        """Scrape article content from URL"""
+        check_deadline()
+        try:
+            headers = {
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            }
+            # Never wait past the request's deadline
+            with span('scrape_article.fetch', url=url) as fetch:
+                response = self.session.get(url, headers=headers, timeout=time_left(15))
+                fetch.set(status=response.status_code, bytes=len(response.content))
+                response.raise_for_status()
+            
+            with span('scrape_article.parse'):
+                soup = self.parser.parse(response.content)
+            
+            # Remove script and style elements
+            for script in soup(["script", "style", "nav", "header", "footer"]):
+                script.decompose()
+            
+            # Try to find article content (common selectors)
+            article_selectors = [
+                'article', '.article-content', '.post-content', 
+                '.entry-content', '.content', 'main', '.story-body',
+                '.article-body', '.post-body', '.entry-body'
+            ]
+            
+            article_text = ""
+            for selector in article_selectors:
+                content = soup.select_one(selector)
+                if content:
+                    article_text = content.get_text()
+                    break
+            
+            if not article_text:
+                # Fallback: get all paragraphs
+                paragraphs = soup.find_all('p')
+                article_text = ' '.join([p.get_text() for p in paragraphs if len(p.get_text().strip()) > 50])
+            
+            if not article_text:
+                article_text = soup.get_text()
+            
+            # Clean the text
+            article_text = re.sub(r'\s+', ' ', article_text).strip()
+            
+            if not article_text:
+                logger.warning(f"No text content found at URL: {url}")
+                return None
+                
+            logger.info(f"Successfully scraped article from {url}")
+            return article_text
+            
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Network error while scraping article: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Error scraping article: {e}")
+            return None
+    
+    def preprocess_text(self, text, keep_digits=False):
+        """Clean and preprocess text; keep_digits keeps numbers such as years (used by the news search)"""
+        try:
+            # Remove special characters and, unless kept, digits
+            text = re.sub(r'[^a-zA-Z0-9\s]' if keep_digits else r'[^a-zA-Z\s]', '', text)
+            # Convert to lowercase
+            text = text.lower()
+            # Tokenize; only letters and whitespace are left, so no sentence split is needed
+            words = word_tokenize(text, preserve_line=True)
+            # Remove stopwords and stem
+            words = [self.stemmer.stem(word) for word in words if word not in self.stop_words]
+            return words
+        except Exception as e:
+            logger.error(f"Error preprocessing text: {e}")
+            return []
+    
+    def calculate_sentence_scores(self, sentences, word_freq, sentence_words=None):
+        """Calculate scores for sentences based on word frequency"""
+        try:
+            sentence_scores = {}
+            
+            for index, sentence in enumerate(sentences):
+                words = sentence_words[index] if sentence_words else self.preprocess_text(sentence)
+                score = 0
+                word_count = 0
+                
+                for word in words:
+                    if word in word_freq:
+                        score += word_freq[word]
+                        word_count += 1
+                
+                if word_count > 0:
+                    sentence_scores[sentence] = score / word_count
+            
+            return sentence_scores
+        except Exception as e:
+            logger.error(f"Error calculating sentence scores: {e}")
+            return {}
+    
+    @traced('extractive_summarize')
+    def extractive_summarize(self, text, num_sentences=3, sentences=None):
+        """
+        Create extractive summary using frequency-based approach.
+        Pass sentences (sent_tokenize(text)) to reuse a sentence split done elsewhere.
+        """
+        try:
+            if not text:
+                logger.warning("No text provided for summarization")
+                return "No text to summarize"
+            
+            # Tokenize into sentences
+            if sentences is None:
+                with span('sent_tokenize'):
+                    sentences = sent_tokenize(text)
+            
+            if len(sentences) <= num_sentences:
+                logger.info("Text is already shorter than requested summary length")
+                return text
+            
+            # Preprocess each sentence once; the words of the whole text are their concatenation
+            sentence_words = [self.preprocess_text(sentence) for sentence in sentences]
+            word_freq = Counter(word for words in sentence_words for word in words)
+            
+            if not word_freq:
+                logger.warning("No valid words found in text")
+                return text
+            
+            # Normalize frequencies
+            max_freq = max(word_freq.values())
+            for word in word_freq:
+                word_freq[word] = word_freq[word] / max_freq
+            
+            # Calculate sentence scores
+            sentence_scores = self.calculate_sentence_scores(sentences, word_freq, sentence_words)
+            
+            if not sentence_scores:
+                logger.warning("Could not calculate sentence scores")
+                return text
+            
+            # Get top sentences
+            top_sentences = heapq.nlargest(num_sentences, sentence_scores, key=sentence_scores.get)
+            
+            # Maintain original order
+            summary_sentences = []
+            for sentence in sentences:
+                if sentence in top_sentences:
+                    summary_sentences.append(sentence)
+            
+            summary = ' '.join(summary_sentences)
+            logger.info(f"Generated summary of {len(summary.split())} words")
+            return summary
+            
+        except Exception as e:
+            logger.error(f"Error in extractive summarization: {e}")
+            return text
+    
+    def get_article_stats(self, text, sentences=None, words=None):
+        """Get basic statistics about the article, optionally from an existing tokenization"""
+        try:
+            if not text:
+                logger.warning("No text provided for statistics")
+                return {}
+            
+            if sentences is None:
+                sentences = sent_tokenize(text)
+            if words is None:
+                words = word_tokens(sentences)
+            
+            stats = {
+                'word_count': len(words),
+                'sentence_count': len(sentences),
+                'avg_sentence_length': len(words) / len(sentences) if sentences else 0,
+                'reading_ease': flesch_reading_ease(text)
+            }
+            
+            logger.info("Successfully calculated article statistics")
+            return stats
+            
+        except Exception as e:
+            logger.error(f"Error calculating article statistics: {e}")
+            return {}
+
+class TransformerSummarizer:
+    def __init__(self):
+        try:
+            from transformers import pipeline
+            self.summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
+            logger.info("TransformerSummarizer initialized successfully")
+        except ImportError:
+            logger.warning("Transformers library not installed. Install with: pip install transformers torch")
+            self.summarizer = None
+        except Exception as e:
+            logger.error(f"Error initializing TransformerSummarizer: {e}")
+            self.summarizer = None
+    
+    @traced('transformer_summarize')
+    def summarize(self, text, max_length=130, min_length=30):
+        """Summarize using BART model"""
+        try:
+            if not self.summarizer:
+                logger.warning("Transformers library not available")
+                return "Transformers library not available"
+            
+            if len(text.split()) < 50:
+                logger.info("Text too short for summarization")
+                return text
+            
+            # Split long text into chunks if needed
+            max_chunk_length = 1024
+            chunks = [text[i:i+max_chunk_length] for i in range(0, len(text), max_chunk_length)]
+            
+            summaries = []
+            for chunk in chunks:
+                if len(chunk.split()) > 30:  # Only summarize substantial chunks
+                    with span('transformer_summarize.chunk', chars=len(chunk)):
+                        summary = self.summarizer(chunk, max_length=max_length, min_length=min_length, do_sample=False)
+                    summaries.append(summary[0]['summary_text'])
+            
+            final_summary = ' '.join(summaries)
+            logger.info(f"Generated transformer summary of {len(final_summary.split())} words")
+            return final_summary
+            
+        except Exception as e:
+            logger.error(f"Error in transformer summarization: {e}")
+            return "Error in summarization"
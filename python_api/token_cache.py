@@ -0,0 +1,184 @@
+"""
+Shared tokenization cache for the bias detectors.
+
+Entries are keyed by a hash of the text, so any BiasDetector (and any
+caller passing equal text) shares them, and the cache never holds on to
+a detector. The filtered words of each text are kept as IDs into one
+interned vocabulary in an array('I'), and its sentences as offsets into
+the text, which the caller has anyway on a hit; the cleaned text is
+recomputed. That is several times smaller than tuples of strings, and
+the cache is bounded by an approximate byte budget rather than a count.
+"""
+import hashlib
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+
+# Rough per-entry cost of the key, the arrays and the OrderedDict node
+_ENTRY_OVERHEAD = 250
+# Rough cost of a vocabulary slot on top of the word itself
+_WORD_OVERHEAD = 100
+
+
+def text_key(text):
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+class Vocabulary:
+    """Interned words and their integer IDs"""
+
+    def __init__(self):
+        self.ids = {}
+        self.words = []
+        self.nbytes = 0
+
+    def __len__(self):
+        return len(self.words)
+
+    def encode(self, words):
+        ids = self.ids
+        encoded = array('I')
+        for word in words:
+            word_id = ids.get(word)
+            if word_id is None:
+                word_id = ids[word] = len(self.words)
+                self.words.append(sys.intern(word))
+                self.nbytes += sys.getsizeof(word) + _WORD_OVERHEAD
+            encoded.append(word_id)
+        return encoded
+
+    def decode(self, ids):
+        words = self.words
+        return tuple(words[word_id] for word_id in ids)
+
+
+def sentence_spans(text, sentences):
+    """Start and end offsets of each sentence in text, or None if one is not a substring in order"""
+    spans = array('I')
+    pos = 0
+    for sentence in sentences:
+        start = text.find(sentence, pos)
+        if start < 0:
+            return None
+        pos = start + len(sentence)
+        spans.extend((start, pos))
+    return spans
+
+
+class _Entry:
+    __slots__ = ('length', 'word_ids', 'sentences', 'nbytes')
+
+    def __init__(self, length, word_ids, sentences):
+        self.length = length
+        self.word_ids = word_ids
+        # Offsets (array) or, for the odd tokenizer output that is not a substring, the strings
+        self.sentences = sentences
+        if isinstance(sentences, array):
+            sentence_bytes = sentences.itemsize * len(sentences)
+        else:
+            sentence_bytes = sum(sys.getsizeof(sentence) for sentence in sentences)
+        self.nbytes = _ENTRY_OVERHEAD + word_ids.itemsize * len(word_ids) + sentence_bytes
+
+    def sentences_of(self, text):
+        if not isinstance(self.sentences, array):
+            return self.sentences
+        spans = self.sentences
+        return tuple(text[spans[i]:spans[i + 1]] for i in range(0, len(spans), 2))
+
+
+class TokenCache:
+    """
+    LRU cache of (filtered words, sentences, cleaned text) tokenizations
+    within max_bytes, counting the vocabulary. Concurrent misses on the
+    same text tokenize it once; the other callers wait for the result.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Vocabulary restarts, once it outgrows half the budget
+        self.resets = 0
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._vocab = Vocabulary()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def get(self, text, tokenize, clean):
+        """
+        tokenize(text) -> (words, sentences, text_clean), from the cache when
+        possible; clean(text) recomputes text_clean on a hit.
+        """
+        key = text_key(text)
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry.length == len(text):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    words = self._vocab.decode(entry.word_ids)
+                    break
+                entry = None
+                pending = self._pending.get(key)
+                if pending is None:
+                    self.misses += 1
+                    done = self._pending[key] = threading.Event()
+                    break
+            # Someone else is tokenizing the same text
+            pending.wait()
+        if entry is not None:
+            return words, entry.sentences_of(text), clean(text)
+
+        try:
+            tokens = tokenize(text)
+            self._store(key, text, tokens)
+            return tokens
+        finally:
+            with self._lock:
+                del self._pending[key]
+            done.set()
+
+    def _store(self, key, text, tokens):
+        words, sentences, _ = tokens
+        spans = sentence_spans(text, sentences)
+        with self._lock:
+            entry = _Entry(len(text), self._vocab.encode(words), tuple(sentences) if spans is None else spans)
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old.nbytes
+            self._entries[key] = entry
+            self.nbytes += entry.nbytes
+            while self._entries and self.nbytes + self._vocab.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                self.evictions += 1
+            # Word IDs are only valid for their vocabulary, so a restart empties the cache
+            if self._vocab.nbytes > self.max_bytes // 2:
+                self._reset()
+                self.resets += 1
+
+    def _reset(self):
+        self._entries.clear()
+        self._vocab = Vocabulary()
+        self.nbytes = 0
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.nbytes + self._vocab.nbytes,
+            'max_bytes': self.max_bytes,
+            'vocabulary': len(self._vocab),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            'evictions': self.evictions,
+            'resets': self.resets,
+        }
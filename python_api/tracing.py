@@ -0,0 +1,289 @@
+"""
+Lightweight request tracing.
+
+Every request gets an ID (X-Request-ID, taken from the caller if it sends
+one and echoed in the response). A sampled request also records spans: named, timed
+sections such as the scrape fetch, HTML parsing, tokenization, the
+transformer or each bias detector, nested by the code that opens them.
+Finished traces go to an in-process ring buffer served at /debug/traces
+and, if TRACE_FILE is set, to that file as one JSON line per span.
+
+Sampling is TRACE_SAMPLE_RATE (0 by default); a request can ask for it
+with X-Trace-Sampled: 1. When a request is not sampled, span() and
+@traced cost one context variable lookup.
+"""
+import contextvars
+import functools
+import itertools
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+SAMPLED_HEADER = 'X-Trace-Sampled'
+
+_request_id = contextvars.ContextVar('request_id', default=None)
+# (Trace, current span id) while a sampled trace is active
+_active = contextvars.ContextVar('trace_span', default=None)
+
+
+class Trace:
+    """Spans of one sampled request or job"""
+
+    def __init__(self, trace_id, name):
+        self.trace_id = trace_id
+        self.name = name
+        self.started_at = time.time()
+        self.duration_ms = None
+        self.spans = []
+        self._ids = itertools.count(1)
+
+    def next_id(self):
+        return next(self._ids)
+
+    def to_dict(self):
+        return {'trace_id': self.trace_id, 'name': self.name, 'started_at': self.started_at,
+                'duration_ms': self.duration_ms, 'spans': sorted(self.spans, key=lambda span: span['start'])}
+
+
+class Span:
+    """Times a block and records it on the active trace; set() adds attributes"""
+
+    __slots__ = ('trace', 'parent_id', 'span_id', 'name', 'attrs', 'start', 'token', '_perf')
+
+    def __init__(self, trace, parent_id, name, attrs):
+        self.trace = trace
+        self.parent_id = parent_id
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.span_id = self.trace.next_id()
+        self.token = _active.set((self.trace, self.span_id))
+        self.start = time.time()
+        self._perf = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._perf
+        _active.reset(self.token)
+        record = {'trace_id': self.trace.trace_id, 'span_id': self.span_id, 'parent_id': self.parent_id,
+                  'name': self.name, 'start': self.start, 'duration_ms': round(duration * 1000, 3),
+                  'thread': threading.current_thread().name}
+        if self.attrs:
+            record['attrs'] = self.attrs
+        if exc_type is not None:
+            record['error'] = f'{exc_type.__name__}: {exc}'
+        self.trace.spans.append(record)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name, **attrs):
+    """Span around a block, if the current request is being traced"""
+    active = _active.get()
+    if active is None:
+        return _NOOP
+    return Span(active[0], active[1], name, attrs)
+
+
+def traced(name=None):
+    """Decorator: record every call of the function as a span"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            active = _active.get()
+            if active is None:
+                return func(*args, **kwargs)
+            with Span(active[0], active[1], span_name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def bind(func):
+    """func running in a copy of the current context, to carry the trace into another thread"""
+    if _active.get() is None and _request_id.get() is None:
+        return func
+    return functools.partial(contextvars.copy_context().run, func)
+
+
+def current_request_id():
+    return _request_id.get()
+
+
+class Tracer:
+    """Sampling decisions and export of finished traces"""
+
+    def __init__(self, sample_rate=0.0, buffer_size=100, path=None):
+        self.sample_rate = sample_rate
+        self.path = path
+        self.traces = deque(maxlen=buffer_size)
+        self.sampled = 0
+        self._lock = threading.Lock()
+
+    def should_sample(self, header=None):
+        if header in ('1', 'true'):
+            return True
+        if header in ('0', 'false'):
+            return False
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def finish(self, trace):
+        with self._lock:
+            self.sampled += 1
+            self.traces.append(trace)
+            if self.path:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    for record in trace.spans:
+                        f.write(json.dumps(record, default=str) + '\n')
+
+    def recent(self, limit=20, request_id=None):
+        with self._lock:
+            traces = [trace for trace in reversed(self.traces) if request_id in (None, trace.trace_id)]
+        return [trace.to_dict() for trace in traces[:limit]]
+
+    def stats(self):
+        return {'sample_rate': self.sample_rate, 'sampled': self.sampled, 'buffered': len(self.traces),
+                'file': self.path}
+
+
+tracer = Tracer(
+    sample_rate=float(os.environ.get('TRACE_SAMPLE_RATE', 0)),
+    buffer_size=int(os.environ.get('TRACE_BUFFER_SIZE', 100)),
+    path=os.environ.get('TRACE_FILE'),
+)
+
+
+class start_trace:
+    """
+    Context manager for a request or background job: sets the request ID and,
+    when sampled, records a root span and exports the trace at the end.
+    """
+
+    def __init__(self, name, request_id=None, sampled=None, **attrs):
+        self.request_id = request_id or uuid.uuid4().hex[:16]
+        self.sampled = tracer.should_sample() if sampled is None else sampled
+        self.name = name
+        self.attrs = attrs
+        self.trace = None
+        self.root = _NOOP
+
+    def set(self, **attrs):
+        self.root.set(**attrs)
+
+    def __enter__(self):
+        self._id_token = _request_id.set(self.request_id)
+        if self.sampled:
+            self._perf = time.perf_counter()
+            self.trace = Trace(self.request_id, self.name)
+            self._active_token = _active.set((self.trace, None))
+            self.root = Span(self.trace, None, self.name, dict(self.attrs))
+            self.root.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.trace is not None:
+            self.root.__exit__(exc_type, exc, tb)
+            _active.reset(self._active_token)
+            self.trace.duration_ms = round((time.perf_counter() - self._perf) * 1000, 3)
+            tracer.finish(self.trace)
+        _request_id.reset(self._id_token)
+        return False
+
+
+def _skip(path):
+    return path.startswith('/debug/')
+
+
+class TracingMiddleware:
+    """ASGI middleware: a trace per request, with X-Request-ID echoed in the response"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or _skip(scope['path']):
+            await self.app(scope, receive, send)
+            return
+        headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+        sampled = headers.get(SAMPLED_HEADER.lower())
+        with start_trace(f"{scope['method']} {scope['path']}", headers.get(REQUEST_ID_HEADER.lower()),
+                         tracer.should_sample(sampled)) as trace:
+            async def send_with_id(message):
+                if message['type'] == 'http.response.start':
+                    trace.set(status=message['status'])
+                    message.setdefault('headers', [])
+                    message['headers'] = list(message['headers']) + [
+                        (REQUEST_ID_HEADER.lower().encode(), trace.request_id.encode())]
+                await send(message)
+
+            await self.app(scope, receive, send_with_id)
+
+
+def install_fastapi(app):
+    """Tracing and GET /debug/traces for a FastAPI app"""
+    app.add_middleware(TracingMiddleware)
+
+    @app.get("/debug/traces")
+    async def debug_traces(limit: int = 20, request_id: str = None):
+        """Recently sampled traces, newest first"""
+        return {'tracing': tracer.stats(), 'traces': tracer.recent(limit, request_id)}
+
+
+def install_flask(app):
+    """Tracing and GET /debug/traces for a Flask app"""
+    from flask import g, jsonify, request
+
+    @app.before_request
+    def begin_trace():
+        if _skip(request.path):
+            return
+        g.trace = start_trace(f'{request.method} {request.path}', request.headers.get(REQUEST_ID_HEADER),
+                              tracer.should_sample(request.headers.get(SAMPLED_HEADER)))
+        g.trace.__enter__()
+
+    @app.after_request
+    def add_request_id(response):
+        trace = g.get('trace')
+        if trace is not None:
+            trace.set(status=response.status_code)
+            response.headers[REQUEST_ID_HEADER] = trace.request_id
+        return response
+
+    @app.teardown_request
+    def end_trace(exc=None):
+        trace = g.pop('trace', None)
+        if trace is not None:
+            trace.__exit__(type(exc) if exc else None, exc, None)
+
+    @app.route('/debug/traces', methods=['GET'])
+    def debug_traces():
+        """Recently sampled traces, newest first"""
+        limit = request.args.get('limit', 20, type=int)
+        return jsonify({'tracing': tracer.stats(),
+                        'traces': tracer.recent(limit, request.args.get('request_id'))})
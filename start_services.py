@@ -1,162 +1,324 @@
 #!/usr/bin/env python3
 """
 Integrated Services Startup Script
-Starts all backend services for the news analysis application
+Starts all backend services for the news analysis application in parallel,
+waits for each one's health endpoint, and restarts services that crash.
 """
 
-import subprocess
-import time
-import sys
 import os
+import selectors
+import shutil
 import signal
+import subprocess
+import sys
 import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Dict, List, Optional
+
+BASE_DIR = Path(__file__).parent
+
+# Child output and supervisor messages come from several threads
+_print_lock = threading.RLock()
+
+
+def log(message=""):
+    with _print_lock:
+        print(message, flush=True)
+
+
+@dataclass
+class ServiceSpec:
+    """How to run one service and how to tell that it is ready"""
+    name: str
+    command: List[str]
+    cwd: Path
+    health_url: str
+    env: Dict[str, str] = field(default_factory=dict)
+    # Seconds to wait for the health endpoint before the start counts as failed
+    ready_timeout: float = 120
+    # Names of services that must be ready before this one starts
+    depends_on: List[str] = field(default_factory=list)
+
+
+SERVICES = [
+    ServiceSpec("Bias Detection API", [sys.executable, "main.py"], BASE_DIR / "python_api",
+                "http://localhost:8000/health", ready_timeout=60),
+    # Loading BART can take minutes on a cold start
+    ServiceSpec("Summarization API", [sys.executable, "summarization.py"], BASE_DIR / "python_api",
+                "http://localhost:5000/health", ready_timeout=300),
+    ServiceSpec("Node.js Backend", [shutil.which("npm") or "npm", "start"], BASE_DIR / "backend",
+                "http://localhost:3000/", env={"PORT": "3000"}, ready_timeout=60),
+]
+
+
+class Service:
+    """Runtime state of one supervised service"""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.process = None
+        self.state = "pending"  # pending, starting, ready, backoff, failed, stopped
+        self.started_at = None
+        self.ready_at = None
+        self.time_to_ready = None
+        # Restarts over the supervisor's lifetime, for reporting
+        self.restarts = 0
+        # Consecutive failures; reset once the service has stayed up for stable_after seconds
+        self.failures = 0
+        self.restart_at = None
+
+
+class OutputMultiplexer:
+    """
+    Prints the stdout and stderr of every child, prefixed with its name.
+    On POSIX one thread serves all pipes through a selector; on Windows,
+    where select() does not work on pipes, each pipe gets a reader thread.
+    Either way both streams are always drained, so no child blocks on a full pipe.
+    """
 
-class ServiceManager:
     def __init__(self):
-        self.processes = []
+        self.use_selector = os.name != "nt"
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._running = True
+        if self.use_selector:
+            self._selector = selectors.DefaultSelector()
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+
+    def emit(self, prefix, line):
+        log(f"[{prefix}] {line}")
+
+    def add(self, name, process):
+        streams = [(process.stdout, name), (process.stderr, f"{name}:err")]
+        if self.use_selector:
+            # Registered by the selector thread on its next pass
+            with self._pending_lock:
+                self._pending.extend(streams)
+        else:
+            for stream, prefix in streams:
+                threading.Thread(target=self._drain, args=(stream, prefix), daemon=True).start()
+
+    def stop(self):
+        self._running = False
+
+    def _drain(self, stream, prefix):
+        for raw in iter(stream.readline, b""):
+            self.emit(prefix, raw.decode("utf-8", errors="replace").rstrip())
+        stream.close()
+
+    def _loop(self):
+        while self._running:
+            with self._pending_lock:
+                pending, self._pending = self._pending, []
+            for stream, prefix in pending:
+                os.set_blocking(stream.fileno(), False)
+                self._selector.register(stream, selectors.EVENT_READ, [prefix, b""])
+
+            if not self._selector.get_map():
+                time.sleep(0.2)
+                continue
+            for key, _ in self._selector.select(timeout=0.2):
+                prefix, buffer = key.data
+                try:
+                    chunk = os.read(key.fd, 65536)
+                except BlockingIOError:
+                    continue
+                except OSError:
+                    chunk = b""
+                if not chunk:
+                    # EOF: flush a last unterminated line and forget the pipe
+                    if buffer:
+                        self.emit(prefix, buffer.decode("utf-8", errors="replace").rstrip())
+                    self._selector.unregister(key.fileobj)
+                    key.fileobj.close()
+                    continue
+                *lines, key.data[1] = (buffer + chunk).split(b"\n")
+                for line in lines:
+                    self.emit(prefix, line.decode("utf-8", errors="replace").rstrip())
+
+
+def check_health(url, timeout=2):
+    """True if the URL answers with a 2xx status"""
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return 200 <= response.status < 300
+    except (urllib.error.URLError, OSError, ValueError):
+        return False
+
+
+class ServiceManager:
+    def __init__(self, specs=None, backoff_base=1.0, backoff_max=60.0, max_restarts=5, stable_after=30,
+                 poll_interval=0.5, output=None):
+        self.services = [Service(spec) for spec in (specs or SERVICES)]
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # Consecutive restarts allowed before a service is given up on
+        self.max_restarts = max_restarts
+        # A service that stays up this long after becoming ready has its backoff and restart limit reset
+        self.stable_after = stable_after
+        self.poll_interval = poll_interval
+        self.output = output or OutputMultiplexer()
         self.running = True
-        
-    def start_service(self, name, command, cwd=None, env=None):
-        """Start a service in a subprocess"""
+        self._lock = threading.Lock()
+        self._reported = False
+        self._launched_at = None
+
+    def start_service(self, service):
+        """Start a service in a subprocess and begin polling its health endpoint"""
+        spec = service.spec
         try:
-            print(f"🚀 Starting {name}...")
-            
-            # Set up environment
+            log(f"🚀 Starting {spec.name}...")
             service_env = os.environ.copy()
-            if env:
-                service_env.update(env)
-            
-            # Start process
-            process = subprocess.Popen(
-                command,
-                shell=True,
-                cwd=cwd,
+            service_env["PYTHONUNBUFFERED"] = "1"
+            service_env.update(spec.env)
+            service.process = subprocess.Popen(
+                spec.command,
+                cwd=spec.cwd,
                 env=service_env,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
+                stdin=subprocess.DEVNULL,
             )
-            
-            self.processes.append((name, process))
-            print(f"✅ {name} started with PID: {process.pid}")
-            return process
-            
         except Exception as e:
-            print(f"❌ Failed to start {name}: {e}")
+            log(f"❌ Failed to start {spec.name}: {e}")
+            self._schedule_restart(service, str(e))
             return None
-    
-    def monitor_process(self, name, process):
-        """Monitor a process and print its output"""
-        while self.running and process.poll() is None:
-            try:
-                output = process.stdout.readline()
-                if output:
-                    print(f"[{name}] {output.strip()}")
-            except:
-                break
-    
+
+        service.state = "starting"
+        service.started_at = time.monotonic()
+        service.ready_at = None
+        self.output.add(spec.name, service.process)
+        log(f"✅ {spec.name} started with PID: {service.process.pid}")
+        threading.Thread(target=self._wait_ready, args=(service, service.process), daemon=True).start()
+        return service.process
+
+    def _wait_ready(self, service, process):
+        spec = service.spec
+        deadline = service.started_at + spec.ready_timeout
+        while self.running and service.process is process and process.poll() is None:
+            if check_health(spec.health_url):
+                with self._lock:
+                    service.state = "ready"
+                    service.ready_at = time.monotonic()
+                    service.time_to_ready = service.ready_at - service.started_at
+                log(f"🟢 {spec.name} ready in {service.time_to_ready:.1f}s ({spec.health_url})")
+                return
+            if time.monotonic() > deadline:
+                log(f"⚠️  {spec.name} not ready after {spec.ready_timeout:.0f}s, restarting it")
+                self._terminate(service)
+                return
+            time.sleep(self.poll_interval)
+
+    def _schedule_restart(self, service, reason):
+        if service.failures >= self.max_restarts:
+            service.state = "failed"
+            log(f"❌ {service.spec.name} failed ({reason}); giving up after {service.failures} restarts in a row")
+            return
+        delay = min(self.backoff_max, self.backoff_base * 2 ** service.failures)
+        service.failures += 1
+        service.restarts += 1
+        service.state = "backoff"
+        service.restart_at = time.monotonic() + delay
+        log(f"🔁 {service.spec.name} {reason}; restarting in {delay:.0f}s (restart {service.restarts})")
+
+    def _ready_to_launch(self, service):
+        by_name = {other.spec.name: other for other in self.services}
+        return all(by_name[name].state == "ready" for name in service.spec.depends_on if name in by_name)
+
+    def supervise_once(self):
+        """One pass of the supervisor loop: launch, restart and health-track services"""
+        now = time.monotonic()
+        for service in self.services:
+            with self._lock:
+                state = service.state
+            if state == "pending" and self._ready_to_launch(service):
+                self.start_service(service)
+            elif state == "backoff" and now >= service.restart_at:
+                self.start_service(service)
+            elif state in ("starting", "ready") and service.process.poll() is not None:
+                self._schedule_restart(service, f"exited with code {service.process.returncode}")
+            elif state == "ready" and service.failures and now - service.ready_at > self.stable_after:
+                service.failures = 0
+
+        if not self._reported and all(service.state in ("ready", "failed") for service in self.services):
+            self._reported = True
+            self.print_summary()
+
     def start_all_services(self):
-        """Start all required services"""
-        print("🎯 Starting Integrated News Analysis Services...")
-        print("=" * 50)
-        
-        # Get current directory
-        base_dir = Path(__file__).parent
-        
-        # 1. Start Python Bias Detection API (FastAPI)
-        bias_api_dir = base_dir / "python_api"
-        bias_process = self.start_service(
-            "Bias Detection API",
-            "python main.py",
-            cwd=bias_api_dir
-        )
-        
-        if bias_process:
-            bias_thread = threading.Thread(
-                target=self.monitor_process,
-                args=("Bias API", bias_process)
-            )
-            bias_thread.daemon = True
-            bias_thread.start()
-        
-        # Wait a bit for the first service to start
-        time.sleep(3)
-        
-        # 2. Start Python Summarization API (Flask)
-        summarization_process = self.start_service(
-            "Summarization API",
-            "python summarization.py",
-            cwd=bias_api_dir
-        )
-        
-        if summarization_process:
-            summary_thread = threading.Thread(
-                target=self.monitor_process,
-                args=("Summary API", summarization_process)
-            )
-            summary_thread.daemon = True
-            summary_thread.start()
-        
-        # Wait a bit for the second service to start
-        time.sleep(3)
-        
-        # 3. Start Node.js Backend
-        backend_dir = base_dir / "backend"
-        backend_process = self.start_service(
-            "Node.js Backend",
-            "npm start",
-            cwd=backend_dir
-        )
-        
-        if backend_process:
-            backend_thread = threading.Thread(
-                target=self.monitor_process,
-                args=("Backend", backend_process)
-            )
-            backend_thread.daemon = True
-            backend_thread.start()
-        
-        print("\n" + "=" * 50)
-        print("🎉 All services started!")
-        print("\n📋 Service URLs:")
-        print("   • Bias Detection API: http://localhost:8000")
-        print("   • Summarization API:  http://localhost:5000")
-        print("   • Integrated Backend: http://localhost:3000")
-        print("\n🔗 API Endpoints:")
-        print("   • GET  http://localhost:3000/api/news")
-        print("   • POST http://localhost:3000/api/article/summarize")
-        print("   • POST http://localhost:3000/api/article/bias-analysis")
-        print("   • POST http://localhost:3000/api/article/complete-analysis")
-        print("\n⏹️  Press Ctrl+C to stop all services")
-        print("=" * 50)
-    
+        """Start all required services; independent services start in parallel"""
+        log("🎯 Starting Integrated News Analysis Services...")
+        log("=" * 50)
+        self._launched_at = time.monotonic()
+        self.supervise_once()
+
+    def print_summary(self):
+        log("\n" + "=" * 50)
+        total = time.monotonic() - self._launched_at
+        log(f"🎉 Services settled in {total:.1f}s")
+        log("\n⏱️  Time to ready:")
+        for service in self.services:
+            if service.state == "ready":
+                log(f"   • {service.spec.name}: {service.time_to_ready:.1f}s"
+                      f"{f' after {service.restarts} restart(s)' if service.restarts else ''}")
+            else:
+                log(f"   • {service.spec.name}: not ready ({service.state})")
+        log("\n📋 Service URLs:")
+        log("   • Bias Detection API: http://localhost:8000")
+        log("   • Summarization API:  http://localhost:5000")
+        log("   • Integrated Backend: http://localhost:3000")
+        log("\n🔗 API Endpoints:")
+        log("   • GET  http://localhost:3000/api/news")
+        log("   • POST http://localhost:3000/api/article/summarize")
+        log("   • POST http://localhost:3000/api/article/bias-analysis")
+        log("   • POST http://localhost:3000/api/article/complete-analysis")
+        log("\n⏹️  Press Ctrl+C to stop all services")
+        log("=" * 50)
+
+    def run(self):
+        self.start_all_services()
+        while self.running:
+            time.sleep(self.poll_interval)
+            self.supervise_once()
+
+    def _terminate(self, service):
+        process = service.process
+        if process is None or process.poll() is not None:
+            return
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            log(f"⚠️  Force killing {service.spec.name}...")
+            process.kill()
+            process.wait()
+
     def stop_all_services(self):
         """Stop all running services"""
-        print("\n🛑 Stopping all services...")
+        log("\n🛑 Stopping all services...")
         self.running = False
-        
-        for name, process in self.processes:
+
+        for service in self.services:
+            if service.process is None or service.process.poll() is not None:
+                continue
             try:
-                print(f"🛑 Stopping {name} (PID: {process.pid})...")
-                process.terminate()
-                
-                # Wait for graceful shutdown
-                try:
-                    process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    print(f"⚠️  Force killing {name}...")
-                    process.kill()
-                    process.wait()
-                
-                print(f"✅ {name} stopped")
-                
+                log(f"🛑 Stopping {service.spec.name} (PID: {service.process.pid})...")
+                self._terminate(service)
+                service.state = "stopped"
+                log(f"✅ {service.spec.name} stopped")
             except Exception as e:
-                print(f"❌ Error stopping {name}: {e}")
-        
-        print("🎯 All services stopped")
+                log(f"❌ Error stopping {service.spec.name}: {e}")
+
+        self.output.stop()
+        log("🎯 All services stopped")
+
+
+service_manager: Optional[ServiceManager] = None
+
 
 def signal_handler(signum, frame):
     """Handle Ctrl+C signal"""
@@ -165,25 +327,20 @@ def signal_handler(signum, frame):
         service_manager.stop_all_services()
     sys.exit(0)
 
+
 if __name__ == "__main__":
     # Set up signal handler
     signal.signal(signal.SIGINT, signal_handler)
-    
+
     # Create service manager
     service_manager = ServiceManager()
-    
+
     try:
-        # Start all services
-        service_manager.start_all_services()
-        
-        # Keep the main thread alive
-        while service_manager.running:
-            time.sleep(1)
-            
+        service_manager.run()
     except KeyboardInterrupt:
         print("\n🛑 Keyboard interrupt received")
         service_manager.stop_all_services()
     except Exception as e:
         print(f"❌ Error: {e}")
         service_manager.stop_all_services()
-        sys.exit(1) 
\ No newline at end of file
+        sys.exit(1)